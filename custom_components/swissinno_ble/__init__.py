@@ -1,26 +1,96 @@
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.bluetooth import (
+    BluetoothScanningMode,
+    async_register_callback,
+)
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from .const import DATA_COORDINATOR, DOMAIN
+from .const import (
+    ADVERTISEMENT_MATCHER,
+    CONF_PROCESSING_TICK,
+    DATA_COORDINATOR,
+    DATA_DISPATCHER,
+    DATA_RESET_ENGINE,
+    DATA_STATS,
+    DATA_STORE,
+    DEFAULT_PROCESSING_TICK,
+    DOMAIN,
+)
 from .coordinator import TrapObservationCoordinator
-
-
+from .dispatcher import AdvertisementDispatcher
+from .reset import ResetCharacteristicCache, ResetEngine
+from .services import async_setup_services, async_unload_services
+from .stats import HotPathStats
+from .store import TrapStateStore
+
+PLATFORMS = ["binary_sensor", "sensor", "button"]
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up SWISSINNO BLE integration."""
-    hass.data.setdefault(DOMAIN, {})[DATA_COORDINATOR] = (
-        TrapObservationCoordinator()
+    coordinator = TrapObservationCoordinator()
+    stats = HotPathStats()
+    dispatcher = AdvertisementDispatcher(
+        hass,
+        coordinator,
+        stats,
+        entry.options.get(CONF_PROCESSING_TICK, DEFAULT_PROCESSING_TICK),
+    )
+    reset_characteristics = ResetCharacteristicCache()
+    store = TrapStateStore(hass, coordinator, reset_characteristics)
+    reset_engine = ResetEngine(
+        hass,
+        cache=reset_characteristics,
+        source_preference=coordinator.connectable_sources,
     )
-    await hass.config_entries.async_forward_entry_setups(
-        entry, ["binary_sensor", "sensor", "button"]
-    )
-    return True
-
-
+    hass.data.setdefault(DOMAIN, {}).update(
+        {
+            DATA_COORDINATOR: coordinator,
+            DATA_DISPATCHER: dispatcher,
+            DATA_RESET_ENGINE: reset_engine,
+            DATA_STATS: stats,
+            DATA_STORE: store,
+        }
+    )
+
+    # Restore the last known trap state before the platforms register, so
+    # entities come up with their previous values instead of unknown.
+    await store.async_restore()
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(coordinator.register_listener(store.async_schedule_save))
+
+    # Register one Bluetooth callback for all platforms. Home Assistant replays
+    # cached advertisements synchronously here; the coordinator keeps them for
+    # any listener that registers later.
+    entry.async_on_unload(
+        async_register_callback(
+            hass,
+            dispatcher.async_process,
+            ADVERTISEMENT_MATCHER,
+            BluetoothScanningMode.PASSIVE,
+        )
+    )
+    dispatcher.async_start()
+    entry.async_on_unload(dispatcher.async_stop)
+    entry.async_on_unload(reset_engine.async_stop)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    async_setup_services(hass, entry)
+    return True
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the integration when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a SWISSINNO BLE config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(
-        entry, ["binary_sensor", "sensor", "button"]
-    )
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data.pop(DOMAIN, None)
+        async_unload_services(hass)
+        data = hass.data.pop(DOMAIN, {})
+        if (dispatcher := data.get(DATA_DISPATCHER)) is not None:
+            await dispatcher.async_stop_capture()
+        if (store := data.get(DATA_STORE)) is not None:
+            await store.async_save()
     return unload_ok
@@ -0,0 +1,81 @@
+"""Batch entity creation for SWISSINNO BLE platforms."""
+
+from __future__ import annotations
+
+from asyncio import Handle
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .stats import HotPathStats
+
+AddEntitiesCallback = Callable[..., None]
+
+
+class EntityBatcher:
+    """Collect new entities and add them once per event loop iteration.
+
+    Home Assistant replays cached advertisements synchronously while the
+    platforms register, so many traps can appear in a single iteration.
+    Adding them together keeps startup cost proportional to the number of
+    batches instead of the number of traps.
+    """
+
+    __slots__ = ("_async_add_entities", "_handle", "_hass", "_kwargs", "_pending")
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        async_add_entities: AddEntitiesCallback,
+        **kwargs: Any,
+    ) -> None:
+        self._hass = hass
+        self._async_add_entities = async_add_entities
+        self._kwargs = kwargs
+        self._pending: list[Any] = []
+        self._handle: Handle | None = None
+
+    @callback
+    def add(self, entities: Iterable[Any]) -> None:
+        """Queue entities to be added on the next loop iteration."""
+        self._pending.extend(entities)
+        if self._pending and self._handle is None:
+            self._handle = self._hass.loop.call_soon(self.async_flush)
+
+    @callback
+    def async_flush(self) -> None:
+        """Add all queued entities now."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._pending:
+            return
+        entities, self._pending = self._pending, []
+        self._async_add_entities(entities, **self._kwargs)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop queued entities when the platform unloads."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._pending.clear()
+
+
+class BatchedEntityMixin:
+    """State writes for entities that may still be queued in an ``EntityBatcher``.
+
+    Queued entities have no ``hass`` yet and publish their state when added.
+    """
+
+    hass: HomeAssistant | None
+    _stats: HotPathStats
+
+    @callback
+    def _async_write_state(self) -> None:
+        """Write and count the state once the entity has been added."""
+        if self.hass is None:
+            return
+        self._stats.state_writes += 1
+        self.async_write_ha_state()
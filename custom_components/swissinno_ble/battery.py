@@ -8,12 +8,22 @@ from math import isfinite
 class BatteryStabilizer:
     """Publish a battery value only after consecutive matching readings."""
 
+    __slots__ = ("_candidate", "_candidate_count", "_required_samples", "_tolerance")
+
     def __init__(self, *, required_samples: int = 2, tolerance: float = 0.05) -> None:
         self._required_samples = required_samples
         self._tolerance = tolerance
-        self._candidate: float | None = None
+        self._candidate = None
         self._candidate_count = 0
 
+    @property
+    def confirmed(self) -> bool:
+        """Return whether repeating the last reading would publish it again."""
+        return (
+            self._candidate is not None
+            and self._candidate_count >= self._required_samples
+        )
+
     def update(self, value: float | None) -> float | None:
         """Return a stable value, or None while a new value is unconfirmed."""
         if value is None or not isfinite(value) or value <= 0:
@@ -1,116 +1,116 @@
-"""Button platform for SWISSINNO BLE traps."""
-
-import logging
-
-from homeassistant.components.bluetooth import (
-    BluetoothScanningMode,
-    BluetoothServiceInfoBleak,
-    async_register_callback,
-)
-from homeassistant.components.button import ButtonEntity
-from homeassistant.config_entries import ConfigEntry
+"""Button platform for SWISSINNO BLE traps."""
+
+import logging
+
+from homeassistant.components.button import ButtonEntity
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.entity import DeviceInfo
-
+
+from .batch import EntityBatcher
 from .const import (
-    CONNECTABLE_ADVERTISEMENT_MATCHER,
+    CONF_RESET_CONFIRM_TIMEOUT,
+    DATA_COORDINATOR,
+    DATA_RESET_ENGINE,
+    DEFAULT_RESET_CONFIRM_TIMEOUT,
     DOMAIN,
-    MANUFACTURER_ID,
-    entity_unique_id,
-    legacy_unique_ids,
-    normalized_address,
 )
-from .decoder import decode_frame, supports_remote_reset
-from .reset import async_reset_trap
-
-_LOGGER = logging.getLogger(__name__)
-
-
-async def async_setup_entry(
-    hass: HomeAssistant, entry: ConfigEntry, async_add_entities
-):
-    """Set up Reset Trap buttons."""
-    _LOGGER.info("SWISSINNO BLE: Setting up Reset Trap buttons")
-
+from .coordinator import TrapObservation, TrapObservationCoordinator
+from .identity import TrapIdentity
+from .migration import async_migrate_legacy_unique_id
+from .reset import ResetEngine
+from .verification import async_reset_and_confirm
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities
+):
+    """Set up Reset Trap buttons."""
+    _LOGGER.info("SWISSINNO BLE: Setting up Reset Trap buttons")
+
     buttons = {}
     entity_registry = er.async_get(hass)
-
-    @callback
-    def detection_callback(service_info: BluetoothServiceInfoBleak, change):
-        manufacturer_data = service_info.manufacturer_data
-
-        if MANUFACTURER_ID not in manufacturer_data:
-            return
-
-        payload = manufacturer_data[MANUFACTURER_ID]
-        frame = decode_frame(payload)
-        if frame is None or not supports_remote_reset(payload):
+    coordinator: TrapObservationCoordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+    reset_engine: ResetEngine = hass.data[DOMAIN][DATA_RESET_ENGINE]
+    confirm_timeout = entry.options.get(
+        CONF_RESET_CONFIRM_TIMEOUT, DEFAULT_RESET_CONFIRM_TIMEOUT
+    )
+    batcher = EntityBatcher(hass, async_add_entities)
+
+    @callback
+    def add_button(trap_id: str, observation: TrapObservation) -> None:
+        # Resetting requires a GATT connection, so only offer the button once
+        # a connectable scanner has seen a trap family that supports it.
+        if (
+            trap_id in buttons
+            or not observation.available
+            or not observation.connectable
+            or not observation.supports_reset
+        ):
             return
-
-        address = service_info.address
-        trap_id = normalized_address(address)
+
+        identity = coordinator.identity(trap_id)
 
         # Versions before 1.0.16 used changing advertisement bytes in the
-        # reset button unique ID. Migrate the currently discoverable ID.
-        unique_id = entity_unique_id(address, "reset")
-        if not entity_registry.async_get_entity_id("button", DOMAIN, unique_id):
-            for legacy_unique_id in legacy_unique_ids(
-                frame.legacy_trap_ids, "reset"
-            ):
-                legacy_entity_id = entity_registry.async_get_entity_id(
-                    "button", DOMAIN, legacy_unique_id
-                )
-                if legacy_entity_id:
-                    entity_registry.async_update_entity(
-                        legacy_entity_id, new_unique_id=unique_id
-                    )
-                    break
-
-        if trap_id in buttons:
-            return
-
-        _LOGGER.info(
-            "SWISSINNO BLE: Adding Reset Trap button for %s (%s)",
-            trap_id,
-            address,
-        )
-
-        button = SwissinnoResetButton(hass, address, trap_id)
-        buttons[trap_id] = button
-
-        async_add_entities([button])
-
-    cancel = async_register_callback(
-        hass,
-        detection_callback,
-        CONNECTABLE_ADVERTISEMENT_MATCHER,
-        BluetoothScanningMode.PASSIVE,
-    )
-
-    entry.async_on_unload(cancel)
-
-
+        # reset button unique ID. Migrate the currently discoverable ID once,
+        # before the MAC-based button is added.
+        async_migrate_legacy_unique_id(
+            entity_registry,
+            "button",
+            identity.legacy_trap_ids,
+            identity.reset_unique_id,
+            "reset",
+        )
+
+        _LOGGER.info(
+            "SWISSINNO BLE: Adding Reset Trap button for %s (%s)",
+            trap_id,
+            identity.address,
+        )
+
+        button = SwissinnoResetButton(
+            coordinator, reset_engine, identity, confirm_timeout
+        )
+        buttons[trap_id] = button
+        batcher.add([button])
+
+    entry.async_on_unload(batcher.async_cancel)
+    entry.async_on_unload(coordinator.register_listener(add_button))
+
+
 class SwissinnoResetButton(ButtonEntity):
     """Button to reset a SWISSINNO trap."""
 
     _attr_has_entity_name = True
     _attr_translation_key = "reset_trap"
 
-    def __init__(self, hass: HomeAssistant, address: str, trap_id: str):
-        self._hass = hass
-        self._address = address
-        self._trap_id = trap_id
-
-        self._attr_unique_id = entity_unique_id(trap_id, "reset")
+    def __init__(
+        self,
+        coordinator: TrapObservationCoordinator,
+        reset_engine: ResetEngine,
+        identity: TrapIdentity,
+        confirm_timeout: float,
+    ):
+        self._coordinator = coordinator
+        self._reset_engine = reset_engine
+        self._confirm_timeout = confirm_timeout
+        self._address = identity.address
+        self._trap_id = identity.trap_id
+
+        self._attr_unique_id = identity.reset_unique_id
         self._attr_icon = "mdi:restart"
-
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, trap_id)},
-            name=f"SWISSINNO Trap {trap_id}",
-            manufacturer="SWISSINNO",
-            model="BLE Trap",
-        )
+        self._attr_device_info = identity.device_info
 
     async def async_press(self) -> None:
-        await async_reset_trap(self._hass, self._address)
+        # Resets are queued per adapter, so pressing many buttons at once does
+        # not exhaust the connection slots of the Bluetooth proxies. The press
+        # only succeeds once the trap advertises ready again.
+        await async_reset_and_confirm(
+            self._coordinator,
+            self._reset_engine,
+            self._trap_id,
+            self._address,
+            self._confirm_timeout,
+        )
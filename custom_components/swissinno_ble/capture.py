@@ -0,0 +1,183 @@
+"""Record matched advertisements to a compact append-only capture file."""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import time
+
+from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from homeassistant.core import HomeAssistant, callback
+
+from .const import MANUFACTURER_ID
+
+CAPTURE_MAGIC = b"SWBLECAP"
+CAPTURE_VERSION = 1
+_HEADER = struct.Struct("<8sB")
+# Timestamp, RSSI, flags, address length, source length, payload length.
+_RECORD = struct.Struct("<dbBBBB")
+_NO_RSSI = -128
+_FLAG_CONNECTABLE = 0x01
+_FLAG_PAYLOAD = 0x02
+_FLAG_TEXT_ADDRESS = 0x04
+
+# Records are appended from the executor once this much is buffered.
+FLUSH_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class CapturedAdvertisement:
+    """One recorded advertisement, shaped like ``BluetoothServiceInfoBleak``."""
+
+    timestamp: float
+    address: str
+    source: str
+    rssi: int | None
+    connectable: bool
+    manufacturer_data: dict[int, bytes] = field(default_factory=dict)
+
+
+def capture_header() -> bytes:
+    """Return the bytes that start every capture file."""
+    return _HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION)
+
+
+def encode_advertisement(
+    timestamp: float,
+    address: str,
+    source: str,
+    rssi: int | None,
+    connectable: bool,
+    payload: bytes | None,
+) -> bytes:
+    """Return one capture record.
+
+    MAC addresses are stored as six bytes; other addresses, such as the UUIDs
+    reported on macOS, are stored as text.
+    """
+    flags = _FLAG_CONNECTABLE if connectable else 0
+    if payload is not None:
+        flags |= _FLAG_PAYLOAD
+    else:
+        payload = b""
+    try:
+        packed_address = bytes.fromhex(address.replace(":", ""))
+    except ValueError:
+        packed_address = b""
+    if len(packed_address) != 6:
+        flags |= _FLAG_TEXT_ADDRESS
+        packed_address = address.encode()
+    packed_source = source.encode()
+    return (
+        _RECORD.pack(
+            timestamp,
+            _NO_RSSI if rssi is None else max(_NO_RSSI + 1, min(127, rssi)),
+            flags,
+            len(packed_address),
+            len(packed_source),
+            len(payload),
+        )
+        + packed_address
+        + packed_source
+        + payload
+    )
+
+
+def iter_capture(data: bytes) -> Iterator[CapturedAdvertisement]:
+    """Yield the advertisements of a capture file's contents.
+
+    Raises ``ValueError`` for a foreign file. A record cut short by an
+    interrupted write ends the iteration.
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Not a SWISSINNO BLE capture")
+    magic, version = _HEADER.unpack_from(data)
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+        raise ValueError("Not a SWISSINNO BLE capture")
+
+    view = memoryview(data)
+    offset = _HEADER.size
+    while offset + _RECORD.size <= len(data):
+        timestamp, rssi, flags, address_len, source_len, payload_len = (
+            _RECORD.unpack_from(data, offset)
+        )
+        offset += _RECORD.size
+        end = offset + address_len + source_len + payload_len
+        if end > len(data):
+            return
+        address_bytes = view[offset : offset + address_len]
+        if flags & _FLAG_TEXT_ADDRESS:
+            address = str(address_bytes, "utf-8")
+        else:
+            address = ":".join(f"{byte:02X}" for byte in address_bytes)
+        offset += address_len
+        source = str(view[offset : offset + source_len], "utf-8")
+        offset += source_len
+        payload = bytes(view[offset:end])
+        offset = end
+        yield CapturedAdvertisement(
+            timestamp=timestamp,
+            address=address,
+            source=source,
+            rssi=None if rssi == _NO_RSSI else rssi,
+            connectable=bool(flags & _FLAG_CONNECTABLE),
+            manufacturer_data=(
+                {MANUFACTURER_ID: payload} if flags & _FLAG_PAYLOAD else {}
+            ),
+        )
+
+
+def read_capture(path: str | Path) -> list[CapturedAdvertisement]:
+    """Return every advertisement in a capture file."""
+    return list(iter_capture(Path(path).read_bytes()))
+
+
+class AdvertisementRecorder:
+    """Append matched advertisements to a capture file.
+
+    Records are encoded on the event loop and buffered; file writes happen in
+    the executor, so recording costs the hot path one encode per packet.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str | Path) -> None:
+        self._hass = hass
+        self.path = Path(path)
+        self.count = 0
+        self._buffer = bytearray(capture_header())
+        self._lock = asyncio.Lock()
+        self._flush_scheduled = False
+
+    @callback
+    def record(self, service_info: BluetoothServiceInfoBleak) -> None:
+        """Buffer one advertisement."""
+        self._buffer += encode_advertisement(
+            time(),
+            service_info.address,
+            service_info.source,
+            service_info.rssi,
+            service_info.connectable,
+            service_info.manufacturer_data.get(MANUFACTURER_ID),
+        )
+        self.count += 1
+        if len(self._buffer) >= FLUSH_SIZE and not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._hass.async_create_background_task(
+                self.async_flush(), "swissinno_ble capture flush"
+            )
+
+    async def async_flush(self) -> None:
+        """Append everything buffered so far to the file."""
+        async with self._lock:
+            self._flush_scheduled = False
+            if not self._buffer:
+                return
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            await self._hass.async_add_executor_job(self._append, data)
+
+    def _append(self, data: bytes) -> None:
+        with self.path.open("ab") as file:
+            file.write(data)
@@ -1,9 +1,28 @@
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
-
-from .const import DOMAIN
+from homeassistant.helpers.selector import (
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
+)
+
+from .const import (
+    CONF_PROCESSING_TICK,
+    CONF_RESET_CONFIRM_TIMEOUT,
+    CONF_RSSI_DEADBAND,
+    CONF_RSSI_MIN_INTERVAL,
+    CONF_RSSI_SMOOTHING,
+    DEFAULT_PROCESSING_TICK,
+    DEFAULT_RESET_CONFIRM_TIMEOUT,
+    DEFAULT_RSSI_DEADBAND,
+    DEFAULT_RSSI_MIN_INTERVAL,
+    DEFAULT_RSSI_SMOOTHING,
+    DOMAIN,
+)
+from .rssi import RSSI_SMOOTHING_MODES
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -17,6 +36,14 @@ class SwissinnoBLEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Return the options flow for this handler."""
+        return SwissinnoBLEOptionsFlow(config_entry)
+
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
     ) -> config_entries.ConfigFlowResult:
@@ -46,3 +73,58 @@ class SwissinnoBLEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=CONFIG_SCHEMA,
             errors=errors,
         )
+
+
+class SwissinnoBLEOptionsFlow(config_entries.OptionsFlow):
+    """Handle SWISSINNO BLE options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Configure signal strength, processing tick, and reset confirmation."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_RSSI_DEADBAND,
+                        default=options.get(CONF_RSSI_DEADBAND, DEFAULT_RSSI_DEADBAND),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=30)),
+                    vol.Required(
+                        CONF_RSSI_MIN_INTERVAL,
+                        default=options.get(
+                            CONF_RSSI_MIN_INTERVAL, DEFAULT_RSSI_MIN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                    vol.Required(
+                        CONF_RSSI_SMOOTHING,
+                        default=options.get(
+                            CONF_RSSI_SMOOTHING, DEFAULT_RSSI_SMOOTHING
+                        ),
+                    ): SelectSelector(
+                        SelectSelectorConfig(
+                            options=list(RSSI_SMOOTHING_MODES),
+                            mode=SelectSelectorMode.DROPDOWN,
+                            translation_key=CONF_RSSI_SMOOTHING,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_RESET_CONFIRM_TIMEOUT,
+                        default=options.get(
+                            CONF_RESET_CONFIRM_TIMEOUT, DEFAULT_RESET_CONFIRM_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=600)),
+                    vol.Required(
+                        CONF_PROCESSING_TICK,
+                        default=options.get(
+                            CONF_PROCESSING_TICK, DEFAULT_PROCESSING_TICK
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=60)),
+                }
+            ),
+        )
@@ -1,5 +1,20 @@
 DOMAIN = "swissinno_ble"
 DATA_COORDINATOR = "coordinator"
+DATA_DISPATCHER = "dispatcher"
+DATA_RESET_ENGINE = "reset_engine"
+DATA_STATS = "stats"
+DATA_STORE = "store"
+
+CONF_PROCESSING_TICK = "processing_tick"
+CONF_RESET_CONFIRM_TIMEOUT = "reset_confirm_timeout"
+CONF_RSSI_DEADBAND = "rssi_deadband"
+CONF_RSSI_MIN_INTERVAL = "rssi_min_interval"
+CONF_RSSI_SMOOTHING = "rssi_smoothing"
+DEFAULT_PROCESSING_TICK = 0
+DEFAULT_RESET_CONFIRM_TIMEOUT = 30
+DEFAULT_RSSI_DEADBAND = 3
+DEFAULT_RSSI_MIN_INTERVAL = 60
+DEFAULT_RSSI_SMOOTHING = "none"
 
 MANUFACTURER_ID = 3003
 SERVICE_UUID = "0000fcd6-0000-1000-8000-00805f9b34fb"
@@ -14,11 +29,6 @@ ADVERTISEMENT_MATCHER = {
     "connectable": False,
 }
 
-CONNECTABLE_ADVERTISEMENT_MATCHER = {
-    **ADVERTISEMENT_MATCHER,
-    "connectable": True,
-}
-
 
 def normalized_address(address: str) -> str:
     """Return a stable identifier derived from a Bluetooth address."""
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import asyncio
+from collections.abc import Callable, ItemsView
 from dataclasses import dataclass, replace
+from time import monotonic, time
+from typing import TYPE_CHECKING, TypeVar
 
+if TYPE_CHECKING:
+    from .identity import TrapIdentity
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class TrapObservation:
     """Values decoded from one real Bluetooth advertisement."""
 
@@ -14,23 +20,182 @@ class TrapObservation:
     battery_v: float | None
     legacy_trap_ids: tuple[str, ...]
     available: bool = True
+    address: str | None = None
+    tripped: bool | None = None
+    family: str | None = None
+    supports_reset: bool = False
+    connectable: bool = False
+    last_seen: float | None = None
+    restored: bool = False
+    source: str | None = None
 
 
 ObservationListener = Callable[[str, TrapObservation], None]
+ChangeListener = Callable[[str, TrapObservation, int], None]
+
+# Fields reported to change listeners, as bit flags.
+CHANGED_RSSI = 1
+CHANGED_BATTERY = 2
+CHANGED_AVAILABLE = 4
+CHANGED_TRIPPED = 8
+CHANGED_ALL = CHANGED_RSSI | CHANGED_BATTERY | CHANGED_AVAILABLE | CHANGED_TRIPPED
+# Subscribe to updates that change none of the fields, e.g. repeated readings.
+UNCHANGED = 16
+
+_T = TypeVar("_T")
+
+# Per-scanner RSSI older than this no longer says which scanner is nearest.
+SOURCE_RSSI_MAX_AGE = 300.0
+
+# A trap is unavailable after missing this many of its usual advertisements,
+# within bounds. The upper bound matches Home Assistant's fallback timeout,
+# which also applies until a trap's interval has been learned.
+MISSED_ADVERTISEMENTS = 5
+MIN_UNAVAILABLE_TIMEOUT = 30.0
+MAX_UNAVAILABLE_TIMEOUT = 900.0
+INTERVAL_MIN_SAMPLES = 3
+
+# Gains of the smoothed interval and its mean deviation, as in TCP's RTO.
+_INTERVAL_GAIN = 0.125
+_DEVIATION_GAIN = 0.25
+# Scanners relaying the same advertisement are not a shorter interval.
+_DUPLICATE_GAP = 0.1
+
+
+class AdvertisementInterval:
+    """Learn how often a trap advertises and when it is overdue."""
+
+    __slots__ = ("deviation", "interval", "last_seen", "restored", "samples")
+
+    def __init__(self, last_seen: float, *, restored: bool = False) -> None:
+        self.last_seen = last_seen
+        self.restored = restored
+        self.interval = 0.0
+        self.deviation = 0.0
+        self.samples = 0
+
+    def record(self, now: float) -> None:
+        """Add one advertisement received at monotonic time ``now``."""
+        sample = now - self.last_seen
+        if sample < _DUPLICATE_GAP:
+            return
+        self.last_seen = now
+        if self.restored or sample > self.timeout():
+            # A restart or an outage says nothing about the interval.
+            self.restored = False
+            return
+        if self.samples:
+            # Average the first samples so the interval settles quickly.
+            gain = max(_INTERVAL_GAIN, 1 / (self.samples + 1))
+            self.deviation += _DEVIATION_GAIN * (
+                abs(sample - self.interval) - self.deviation
+            )
+            self.interval += gain * (sample - self.interval)
+        else:
+            self.interval = sample
+            self.deviation = sample / 2
+        self.samples += 1
+
+    def timeout(self) -> float:
+        """Return the seconds without advertisements before unavailability."""
+        if self.samples < INTERVAL_MIN_SAMPLES:
+            return MAX_UNAVAILABLE_TIMEOUT
+        timeout = MISSED_ADVERTISEMENTS * self.interval + 4 * self.deviation
+        return min(MAX_UNAVAILABLE_TIMEOUT, max(MIN_UNAVAILABLE_TIMEOUT, timeout))
 
 
 class TrapObservationCoordinator:
-    """Cache observations and replay them to late platform listeners."""
+    """Cache observations and replay them to late platform listeners.
+
+    Listener tuples are replaced on registration and removal instead of being
+    copied on every update, so fan-out allocates nothing per advertisement
+    and listeners may unsubscribe while being called.
+    """
 
     def __init__(self) -> None:
         self._latest: dict[str, TrapObservation] = {}
-        self._listeners: set[ObservationListener] = set()
+        self._listeners: tuple[ObservationListener, ...] = ()
+        self._trap_listeners: dict[str, tuple[ObservationListener, ...]] = {}
+        self._change_listeners: tuple[tuple[int, ChangeListener], ...] = ()
+        self._identities: dict[str, TrapIdentity] = {}
+        self._identities_by_address: dict[str, TrapIdentity] = {}
+        self._source_rssi: dict[str, dict[str, tuple[int, float]]] = {}
+        self._intervals: dict[str, AdvertisementInterval] = {}
+        self._waiters: dict[str, int] = {}
+
+    def add_identity(self, identity: TrapIdentity) -> None:
+        """Remember a trap identity built on first sight."""
+        self._identities[identity.trap_id] = identity
+        self._identities_by_address[identity.address] = identity
+
+    def identity(self, trap_id: str) -> TrapIdentity | None:
+        """Return the identity of a known trap."""
+        return self._identities.get(trap_id)
+
+    def observation(self, trap_id: str) -> TrapObservation | None:
+        """Return the latest observation of a known trap."""
+        return self._latest.get(trap_id)
+
+    def identity_for_address(self, address: str) -> TrapIdentity | None:
+        """Return the identity of a trap by its reported Bluetooth address."""
+        return self._identities_by_address.get(address)
+
+    def restore(self, identity: TrapIdentity, observation: TrapObservation) -> None:
+        """Seed a trap from persisted state before any listener registers."""
+        self.add_identity(identity)
+        self._latest[identity.trap_id] = observation
+        if observation.available and observation.last_seen is not None:
+            # Expire the restored state on the trap's original schedule.
+            age = max(0.0, time() - observation.last_seen)
+            self._intervals[identity.trap_id] = AdvertisementInterval(
+                monotonic() - age, restored=True
+            )
+
+    def observations(self) -> ItemsView[str, TrapObservation]:
+        """Return the latest observation of every known trap."""
+        return self._latest.items()
+
+    def connectable_sources(self, address: str) -> list[str]:
+        """Return connectable scanners that recently heard a trap, nearest first."""
+        identity = self._identities_by_address.get(address)
+        if identity is None or not (
+            sources := self._source_rssi.get(identity.trap_id)
+        ):
+            return []
+        oldest = monotonic() - SOURCE_RSSI_MAX_AGE
+        recent = [
+            (rssi, source) for source, (rssi, seen) in sources.items() if seen >= oldest
+        ]
+        return [source for _rssi, source in sorted(recent, reverse=True)]
 
     def update(self, trap_id: str, observation: TrapObservation) -> None:
         """Store and publish an observation."""
+        previous = self._latest.get(trap_id)
         self._latest[trap_id] = observation
-        for listener in tuple(self._listeners):
+        if observation.available and not observation.restored:
+            now = monotonic()
+            if (interval := self._intervals.get(trap_id)) is None:
+                self._intervals[trap_id] = AdvertisementInterval(now)
+            else:
+                interval.record(now)
+            if (
+                observation.connectable
+                and observation.source is not None
+                and observation.rssi is not None
+            ):
+                if (sources := self._source_rssi.get(trap_id)) is None:
+                    sources = self._source_rssi[trap_id] = {}
+                sources[observation.source] = (observation.rssi, now)
+        for listener in self._listeners:
             listener(trap_id, observation)
+        if trap_id in self._trap_listeners:
+            for listener in self._trap_listeners[trap_id]:
+                listener(trap_id, observation)
+        if self._change_listeners:
+            changed = _changed_fields(previous, observation) or UNCHANGED
+            for fields, change_listener in self._change_listeners:
+                if changed & fields:
+                    change_listener(trap_id, observation, changed)
 
     def set_unavailable(self, trap_id: str) -> None:
         """Mark a previously observed trap unavailable."""
@@ -38,13 +203,157 @@ class TrapObservationCoordinator:
             return
         self.update(trap_id, replace(observation, available=False))
 
+    def expire_overdue(
+        self, last_seen: Callable[[str], float | None] | None = None
+    ) -> list[str]:
+        """Mark traps unavailable that missed their adaptive timeout.
+
+        Home Assistant only calls back when an advertisement's content changes.
+        ``last_seen`` returns the monotonic time it last heard an address at
+        all, so a trap repeating the same advertisement is not expired, and a
+        trap that comes back repeating its last one is available again.
+        """
+        now = monotonic()
+        overdue = []
+        returned = []
+        for trap_id, interval in self._intervals.items():
+            available = self._latest[trap_id].available
+            if (
+                last_seen is not None
+                and (identity := self._identities.get(trap_id)) is not None
+                and (seen := last_seen(identity.address)) is not None
+                and seen - interval.last_seen >= _DUPLICATE_GAP
+            ):
+                if not available:
+                    returned.append(trap_id)
+                    continue
+                interval.record(seen)
+            if available and now - interval.last_seen > interval.timeout():
+                overdue.append(trap_id)
+        for trap_id in returned:
+            self.update(trap_id, replace(self._latest[trap_id], available=True))
+        for trap_id in overdue:
+            self.set_unavailable(trap_id)
+        return overdue
+
+    def availability(self) -> dict[str, dict[str, float | int]]:
+        """Return each trap's learned interval and timeout for diagnostics."""
+        return {
+            trap_id: {
+                "interval": round(interval.interval, 2),
+                "samples": interval.samples,
+                "timeout": round(interval.timeout(), 2),
+            }
+            for trap_id, interval in self._intervals.items()
+        }
+
+    async def async_wait_for(
+        self,
+        trap_id: str,
+        predicate: Callable[[TrapObservation], bool],
+        timeout: float | None,
+    ) -> TrapObservation:
+        """Wait for the next available observation of a trap that matches.
+
+        Only observations published after the call are considered. Raises
+        ``TimeoutError`` when none matches within ``timeout`` seconds; ``None``
+        waits until cancelled.
+        """
+        future: asyncio.Future[TrapObservation] = (
+            asyncio.get_running_loop().create_future()
+        )
+
+        def listener(_trap_id: str, observation: TrapObservation) -> None:
+            if observation.available and predicate(observation) and not future.done():
+                future.set_result(observation)
+
+        remove_listener = self.register_trap_listener(trap_id, listener, replay=False)
+        self._waiters[trap_id] = self._waiters.get(trap_id, 0) + 1
+        try:
+            async with asyncio.timeout(timeout):
+                return await future
+        finally:
+            remove_listener()
+            if waiters := self._waiters[trap_id] - 1:
+                self._waiters[trap_id] = waiters
+            else:
+                del self._waiters[trap_id]
+
+    def has_waiters(self, trap_id: str) -> bool:
+        """Return whether ``async_wait_for`` is waiting on a trap."""
+        return trap_id in self._waiters
+
     def register_listener(self, listener: ObservationListener) -> Callable[[], None]:
         """Register a listener and immediately replay the latest observations."""
-        self._listeners.add(listener)
+        self._listeners += (listener,)
+        # Registration is rare; the snapshot lets a replayed listener publish.
+        for trap_id, observation in tuple(self._latest.items()):
+            listener(trap_id, observation)
+
+        def remove_listener() -> None:
+            self._listeners = _without(self._listeners, listener)
+
+        return remove_listener
+
+    def register_change_listener(
+        self, listener: ChangeListener, fields: int = CHANGED_ALL
+    ) -> Callable[[], None]:
+        """Register a listener for updates that change any of ``fields``.
+
+        The listener also receives the ``CHANGED_*`` flags of the update. The
+        latest observations are replayed immediately with every field changed.
+        """
+        registration = (fields, listener)
+        self._change_listeners += (registration,)
         for trap_id, observation in tuple(self._latest.items()):
+            listener(trap_id, observation, CHANGED_ALL)
+
+        def remove_listener() -> None:
+            self._change_listeners = _without(self._change_listeners, registration)
+
+        return remove_listener
+
+    def register_trap_listener(
+        self, trap_id: str, listener: ObservationListener, *, replay: bool = True
+    ) -> Callable[[], None]:
+        """Register a listener for one trap only.
+
+        Unless ``replay`` is false, the trap's latest observation is replayed.
+        """
+        self._trap_listeners[trap_id] = self._trap_listeners.get(trap_id, ()) + (
+            listener,
+        )
+        if replay and (observation := self._latest.get(trap_id)) is not None:
             listener(trap_id, observation)
 
         def remove_listener() -> None:
-            self._listeners.discard(listener)
+            if listeners := _without(self._trap_listeners.get(trap_id, ()), listener):
+                self._trap_listeners[trap_id] = listeners
+            else:
+                self._trap_listeners.pop(trap_id, None)
 
         return remove_listener
+
+
+def _changed_fields(previous: TrapObservation | None, current: TrapObservation) -> int:
+    """Return the ``CHANGED_*`` flags between two observations of a trap."""
+    if previous is None:
+        return CHANGED_ALL
+    changed = 0
+    if current.rssi != previous.rssi:
+        changed |= CHANGED_RSSI
+    if current.battery_v != previous.battery_v:
+        changed |= CHANGED_BATTERY
+    if current.available != previous.available:
+        changed |= CHANGED_AVAILABLE
+    if current.tripped != previous.tripped:
+        changed |= CHANGED_TRIPPED
+    return changed
+
+
+def _without(listeners: tuple[_T, ...], listener: _T) -> tuple[_T, ...]:
+    """Return ``listeners`` without one registration of ``listener``."""
+    if listener not in listeners:
+        return listeners
+    index = listeners.index(listener)
+    return listeners[:index] + listeners[index + 1 :]
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
 
 NEW_FRAME_MIN_LEN = 10
 CONNECT_TRAP_MARKER = 0x01
@@ -8,9 +10,17 @@ ELECTRONIC_TRAP_MARKER = 0x02
 MANUFACTURER_ID = 3003
 STATUS_READY = 0x00
 STATUS_TRIGGERED = 0x01
+
+# Traps repeat byte-identical payloads while nothing changes. Cache enough
+# distinct payloads for large fleets without growing without bound.
+DECODE_CACHE_SIZE = 1024
+
+TRAP_FAMILY_ELECTRONIC = "electronic"
+TRAP_FAMILY_CONNECT = "connect"
+TRAP_FAMILY_LEGACY = "legacy"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DecodedTrapFrame:
     version: int
     device_type: int
@@ -20,7 +30,9 @@ class DecodedTrapFrame:
     trap_id: str
     legacy_trap_ids: tuple[str, ...]
     battery_raw: int | None
-    battery_volts: float | None
+    battery_volts: float | None
+    family: str
+    supports_reset: bool
 
 
 def _battery_to_volts(raw: int | None) -> float | None:
@@ -50,7 +62,32 @@ def _hex_id(value: bytes) -> str:
 
 
 def decode_frame(payload: bytes) -> DecodedTrapFrame | None:
-    """Decode SWISSINNO BLE manufacturer payload.
+    """Decode SWISSINNO BLE manufacturer payload.
+
+    Repeated payloads return the same immutable frame from a bounded LRU
+    cache.
+    """
+    return _decode_cached(bytes(payload))
+
+
+def decode_cache_info() -> tuple[int, int, int, int]:
+    """Return ``(hits, misses, maxsize, currsize)`` for the decode cache."""
+    return _decode_cached.cache_info()
+
+
+def clear_decode_cache() -> None:
+    """Discard all cached frames and reset the cache counters."""
+    _decode_cached.cache_clear()
+
+
+@lru_cache(maxsize=DECODE_CACHE_SIZE)
+def _decode_cached(payload: bytes) -> DecodedTrapFrame | None:
+    """Decode a hashable payload; see ``_decode_payload``."""
+    return _decode_payload(payload)
+
+
+def _decode_payload(payload: bytes) -> DecodedTrapFrame | None:
+    """Decode SWISSINNO BLE manufacturer payload without caching.
 
     Supports:
     - Electronic 10-byte format with a trailing ready/triggered flag
@@ -82,6 +119,10 @@ def decode_frame(payload: bytes) -> DecodedTrapFrame | None:
             legacy_trap_ids=(_hex_id(trap_id_bytes),),
             battery_raw=battery_raw,
             battery_volts=_extended_battery_to_volts(battery_raw),
+            family=TRAP_FAMILY_ELECTRONIC,
+            # Electronic high-voltage traps intentionally require a physical
+            # power cycle for safety.
+            supports_reset=False,
         )
 
     # Connect SuperCat format (10 bytes minimum).
@@ -111,10 +152,12 @@ def decode_frame(payload: bytes) -> DecodedTrapFrame | None:
             trap_id=trap_id,
             # Version 1.0.14 used payload[1:4] for Connect identities.
             legacy_trap_ids=(trap_id, _hex_id(payload[1:4])),
-            battery_raw=battery_raw,
-            battery_volts=battery_volts,
-        )
-
+            battery_raw=battery_raw,
+            battery_volts=battery_volts,
+            family=TRAP_FAMILY_CONNECT,
+            supports_reset=True,
+        )
+
     # ----------------------------------------------------------------------
     # OLD FORMAT (legacy SuperCat)
     # Format example you currently use:
@@ -141,8 +184,116 @@ def decode_frame(payload: bytes) -> DecodedTrapFrame | None:
         is_tripped=_decode_binary_status(status),
         trap_id=trap_id,
         legacy_trap_ids=(trap_id,),
-        battery_raw=battery_raw,
+        battery_raw=battery_raw,
         battery_volts=battery_volts,
+        family=TRAP_FAMILY_LEGACY,
+        supports_reset=True,
+    )
+
+
+# Every one-byte battery reading, converted once for batch decoding.
+_BATTERY_VOLTS = tuple(_battery_to_volts(raw) for raw in range(256))
+_FAMILY_BY_MARKER = {
+    ELECTRONIC_TRAP_MARKER: TRAP_FAMILY_ELECTRONIC,
+    CONNECT_TRAP_MARKER: TRAP_FAMILY_CONNECT,
+}
+_EMPTY_TRAP_ID = "00000000"
+
+
+@dataclass(frozen=True, slots=True)
+class DecodedFrameColumns:
+    """Fields of many decoded payloads, one list per field.
+
+    Row ``i`` describes payload ``i``. Payloads rejected by ``decode_frame``
+    are ``None`` in every column.
+    """
+
+    trap_id: list[str | None]
+    status: list[int | None]
+    is_tripped: list[bool | None]
+    battery_volts: list[float | None]
+    family: list[str | None]
+
+    def __len__(self) -> int:
+        return len(self.trap_id)
+
+
+def decode_frames(
+    payloads: bytes | bytearray | memoryview | Iterable[bytes],
+    width: int | None = None,
+) -> DecodedFrameColumns:
+    """Decode many payloads at once for offline analysis of captures.
+
+    With ``width``, ``payloads`` is one packed buffer of fixed-width payloads.
+    Each field is then read as a column with extended slices instead of
+    slicing every payload. Otherwise ``payloads`` is an iterable of
+    individual payloads. Rows always match ``decode_frame``. The live decode
+    cache is left untouched, so a replay cannot evict current traps.
+    """
+    if width is None:
+        return _decode_payload_list(payloads)
+    return _decode_packed(bytes(payloads), width)
+
+
+def _decode_packed(buffer: bytes, width: int) -> DecodedFrameColumns:
+    if width <= 0 or len(buffer) % width:
+        raise ValueError(f"Buffer of {len(buffer)} bytes is not a multiple of {width}")
+    count = len(buffer) // width
+    if width < 6:
+        return DecodedFrameColumns(*([None] * count for _ in range(5)))
+
+    hexed = buffer.hex().upper()
+    trap_ids: list[str | None] = [
+        hexed[start : start + 8] for start in range(4, len(hexed), 2 * width)
+    ]
+    leading = buffer[0::width]
+    if width >= NEW_FRAME_MIN_LEN:
+        families: list[str | None] = [
+            _FAMILY_BY_MARKER.get(marker, TRAP_FAMILY_LEGACY)
+            for marker in buffer[6::width]
+        ]
+        statuses: list[int | None] = [
+            trailing if family is TRAP_FAMILY_ELECTRONIC else first
+            for family, first, trailing in zip(families, leading, buffer[9::width])
+        ]
+        battery_volts: list[float | None] = [
+            _extended_battery_to_volts(low | high << 8)
+            if family is TRAP_FAMILY_ELECTRONIC
+            else _BATTERY_VOLTS[low]
+            for family, low, high in zip(families, buffer[7::width], buffer[8::width])
+        ]
+    else:
+        families = [TRAP_FAMILY_LEGACY] * count
+        statuses = list(leading)
+        battery_volts = (
+            [_BATTERY_VOLTS[raw] for raw in buffer[7::width]]
+            if width > 7
+            else [None] * count
+        )
+    tripped: list[bool | None] = [_decode_binary_status(status) for status in statuses]
+
+    # Newer formats reject an all-zero trap ID; legacy frames keep it.
+    for index, trap_id in enumerate(trap_ids):
+        if trap_id == _EMPTY_TRAP_ID and families[index] is not TRAP_FAMILY_LEGACY:
+            trap_ids[index] = statuses[index] = tripped[index] = None
+            battery_volts[index] = families[index] = None
+
+    return DecodedFrameColumns(trap_ids, statuses, tripped, battery_volts, families)
+
+
+def _decode_payload_list(payloads: Iterable[bytes]) -> DecodedFrameColumns:
+    decode = lru_cache(maxsize=DECODE_CACHE_SIZE)(_decode_payload)
+    frames = [decode(bytes(payload)) for payload in payloads]
+
+    def column(field: str) -> list:
+        return [getattr(frame, field) if frame else None for frame in frames]
+
+    return DecodedFrameColumns(
+        column("trap_id"),
+        column("status"),
+        column("is_tripped"),
+        column("battery_volts"),
+        column("family"),
     )
 
 
@@ -151,9 +302,8 @@ def supports_remote_reset(payload: bytes) -> bool:
 
     Electronic traps use marker 0x02 and intentionally require a physical
     power cycle for safety. Connect SuperCat and legacy devices retain the
-    reset button.
+    reset button. Callers that already decoded the payload should read
+    ``DecodedTrapFrame.supports_reset`` instead.
     """
-    return decode_frame(payload) is not None and not (
-        len(payload) >= NEW_FRAME_MIN_LEN
-        and payload[6] == ELECTRONIC_TRAP_MARKER
-    )
+    frame = decode_frame(payload)
+    return frame is not None and frame.supports_reset
@@ -0,0 +1,28 @@
+"""Diagnostics support for SWISSINNO BLE."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_COORDINATOR, DATA_STATS, DOMAIN
+from .coordinator import TrapObservationCoordinator
+from .stats import HotPathStats
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return options, hot-path counters, and learned availability timeouts."""
+    data = hass.data.get(DOMAIN, {})
+    stats: HotPathStats | None = data.get(DATA_STATS)
+    coordinator: TrapObservationCoordinator | None = data.get(DATA_COORDINATOR)
+    return {
+        "options": dict(entry.options),
+        "hot_path": stats.as_dict() if stats is not None else None,
+        "availability": (
+            coordinator.availability() if coordinator is not None else None
+        ),
+    }
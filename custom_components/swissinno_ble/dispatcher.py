@@ -0,0 +1,331 @@
+"""Decode SWISSINNO advertisements once and publish them to all platforms."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from time import monotonic, perf_counter_ns, time
+
+from homeassistant.components.bluetooth import (
+    BluetoothServiceInfoBleak,
+    async_last_service_info,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+
+from .capture import AdvertisementRecorder
+from .const import MANUFACTURER_ID
+from .coordinator import TrapObservation, TrapObservationCoordinator
+from .decoder import DecodedTrapFrame, decode_frame
+from .identity import build_trap_identity
+from .stats import HotPathStats
+
+_LOGGER = logging.getLogger(__name__)
+
+AVAILABILITY_CHECK_INTERVAL = timedelta(seconds=5)
+
+# A Bluetooth proxy replaying its buffer after reconnecting repeats the same
+# addresses within moments, while a trap advertises about once per second.
+# Within BURST_WINDOW seconds, more than BURST_THRESHOLD repeated addresses
+# that also outnumber the distinct addresses are a burst, whatever the fleet
+# size.
+BURST_THRESHOLD = 20
+BURST_WINDOW = 0.1
+
+
+class AdvertisementDispatcher:
+    """Handle every matched advertisement for all entity platforms.
+
+    Home Assistant calls a single integration-level Bluetooth callback. Each
+    advertisement is decoded exactly once and the resulting observation is
+    published through the shared coordinator, which fans it out to the binary
+    sensor, sensor, and button platforms.
+
+    During a burst only the newest advertisement of each address is kept and
+    processed once the burst window ends, so the loop time a burst costs is
+    bounded by the number of traps rather than the number of packets. With a
+    ``processing_tick`` this applies all the time: held advertisements are
+    processed every tick, except that new traps, traps coming back, and
+    tripped changes are published immediately.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: TrapObservationCoordinator,
+        stats: HotPathStats,
+        processing_tick: float = 0,
+    ) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._stats = stats
+        self._processing_tick = processing_tick
+        self._cancel_availability_check: Callable[[], None] | None = None
+        self._cancel_tick: Callable[[], None] | None = None
+        self._recorder: AdvertisementRecorder | None = None
+        self._cancel_capture: Callable[[], None] | None = None
+        self._window_start = 0.0
+        self._window_addresses: set[str] = set()
+        self._window_repeats = 0
+        # Advertisements held in a burst are decoded when they are processed;
+        # the tick keeps the frame it decoded to decide whether to hold.
+        self._held: dict[
+            str, tuple[BluetoothServiceInfoBleak, DecodedTrapFrame | None]
+        ] = {}
+        self._burst_handle: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_process(self, service_info: BluetoothServiceInfoBleak, change) -> None:
+        """Decode a Bluetooth advertisement and publish the observation."""
+        started = perf_counter_ns()
+        self._stats.advertisements += 1
+        if self._recorder is not None:
+            self._recorder.record(service_info)
+        try:
+            if self._processing_tick:
+                if (
+                    frame := self._async_decode(service_info)
+                ) is not None and not self._async_hold_for_tick(service_info, frame):
+                    self._async_publish(service_info, frame)
+            elif not self._async_hold_in_burst(service_info):
+                self._async_process(service_info)
+        finally:
+            self._stats.callback_time.record(perf_counter_ns() - started)
+
+    @callback
+    def _async_hold_in_burst(self, service_info: BluetoothServiceInfoBleak) -> bool:
+        """Hold back an advertisement during a burst and return whether it was."""
+        if self._burst_handle is None:
+            now = monotonic()
+            addresses = self._window_addresses
+            if now - self._window_start >= BURST_WINDOW:
+                self._window_start = now
+                addresses.clear()
+                self._window_repeats = 0
+            address = service_info.address
+            if address not in addresses:
+                addresses.add(address)
+                return False
+            self._window_repeats += 1
+            if (
+                self._window_repeats <= BURST_THRESHOLD
+                or self._window_repeats <= len(addresses)
+            ):
+                return False
+            self._stats.bursts += 1
+            self._burst_handle = self._hass.loop.call_later(
+                BURST_WINDOW, self._async_flush_burst
+            )
+        self._async_hold(service_info, None)
+        return True
+
+    @callback
+    def _async_hold_for_tick(
+        self, service_info: BluetoothServiceInfoBleak, frame: DecodedTrapFrame
+    ) -> bool:
+        """Hold back an advertisement until the next tick and return whether it was.
+
+        Nothing is held that would change whether a trap is known, available,
+        or tripped, or that a reset confirmation is waiting for.
+        """
+        address = service_info.address
+        coordinator = self._coordinator
+        if (
+            (identity := coordinator.identity_for_address(address)) is None
+            or (previous := coordinator.observation(identity.trap_id)) is None
+            or not previous.available
+            or previous.restored
+            or previous.tripped != frame.is_tripped
+            or coordinator.has_waiters(identity.trap_id)
+        ):
+            # An older held advertisement must not undo this one at the tick.
+            self._held.pop(address, None)
+            return False
+        self._async_hold(service_info, frame)
+        return True
+
+    @callback
+    def _async_hold(
+        self, service_info: BluetoothServiceInfoBleak, frame: DecodedTrapFrame | None
+    ) -> None:
+        address = service_info.address
+        if address in self._held:
+            self._stats.coalesced += 1
+        self._held[address] = (service_info, frame)
+
+    @callback
+    def _async_flush_burst(self) -> None:
+        self._burst_handle = None
+        self._window_start = monotonic()
+        self._window_addresses.clear()
+        self._window_repeats = 0
+        self._async_process_held()
+
+    @callback
+    def _async_tick(self, _now: datetime) -> None:
+        self._async_process_held()
+
+    @callback
+    def _async_process_held(self) -> None:
+        """Process the newest held advertisement of each address.
+
+        The whole pass counts as one callback, as it blocks the loop as one.
+        """
+        if not self._held:
+            return
+        started = perf_counter_ns()
+        held, self._held = self._held, {}
+        try:
+            for service_info, frame in held.values():
+                if frame is None:
+                    self._async_process(service_info)
+                else:
+                    self._async_publish(service_info, frame)
+        finally:
+            self._stats.callback_time.record(perf_counter_ns() - started)
+
+    @callback
+    def _async_process(self, service_info: BluetoothServiceInfoBleak) -> None:
+        """Decode and publish one advertisement; timing is done by the caller."""
+        if (frame := self._async_decode(service_info)) is not None:
+            self._async_publish(service_info, frame)
+
+    @callback
+    def _async_decode(
+        self, service_info: BluetoothServiceInfoBleak
+    ) -> DecodedTrapFrame | None:
+        """Return the decoded frame of an advertisement, or None to skip it."""
+        stats = self._stats
+        payload = service_info.manufacturer_data.get(MANUFACTURER_ID)
+        if payload is None:
+            stats.ignored += 1
+            return None
+
+        decode_started = perf_counter_ns()
+        frame = decode_frame(payload)
+        stats.decode_time.record(perf_counter_ns() - decode_started)
+        if frame is None:
+            stats.decode_failures += 1
+        return frame
+
+    @callback
+    def _async_publish(
+        self, service_info: BluetoothServiceInfoBleak, frame: DecodedTrapFrame
+    ) -> None:
+        """Publish the observation of a decoded advertisement."""
+        stats = self._stats
+        address = service_info.address
+        if (identity := self._coordinator.identity_for_address(address)) is None:
+            identity = build_trap_identity(address, frame.legacy_trap_ids)
+            self._coordinator.add_identity(identity)
+
+        trap_id = identity.trap_id
+        stats.per_trap[trap_id] += 1
+        _LOGGER.debug(
+            "Trap %s: status=0x%02X, tripped=%s, RSSI=%s dBm, battery=%s V",
+            trap_id,
+            frame.status,
+            frame.is_tripped,
+            service_info.rssi,
+            frame.battery_volts,
+        )
+
+        observation = TrapObservation(
+            rssi=service_info.rssi,
+            battery_v=frame.battery_volts,
+            legacy_trap_ids=frame.legacy_trap_ids,
+            address=address,
+            tripped=frame.is_tripped,
+            family=frame.family,
+            supports_reset=frame.supports_reset,
+            connectable=service_info.connectable,
+            last_seen=time(),
+            source=service_info.source,
+        )
+        fan_out_started = perf_counter_ns()
+        self._coordinator.update(trap_id, observation)
+        stats.observations += 1
+        stats.fan_out_time.record(perf_counter_ns() - fan_out_started)
+
+    @callback
+    def async_start(self) -> None:
+        """Start checking trap availability.
+
+        Home Assistant's unavailability tracking uses one fallback timeout for
+        every device, which flaps slow advertisers and keeps dead chatty traps
+        up for minutes. The coordinator learns each trap's advertisement
+        interval instead, including restored traps that are never heard again.
+        Home Assistant's latest advertisement of each trap also counts, since
+        unchanged advertisements never reach ``async_process``.
+        """
+        if self._cancel_availability_check is None:
+            self._cancel_availability_check = async_track_time_interval(
+                self._hass, self._async_check_availability, AVAILABILITY_CHECK_INTERVAL
+            )
+        if self._processing_tick and self._cancel_tick is None:
+            self._cancel_tick = async_track_time_interval(
+                self._hass,
+                self._async_tick,
+                timedelta(seconds=self._processing_tick),
+            )
+
+    @callback
+    def _async_check_availability(self, _now: datetime) -> None:
+        for trap_id in self._coordinator.expire_overdue(self._async_last_seen):
+            _LOGGER.debug("Trap %s stopped advertising", trap_id)
+
+    @callback
+    def _async_last_seen(self, address: str) -> float | None:
+        """Return when Home Assistant last heard an address, on the monotonic clock."""
+        service_info = async_last_service_info(self._hass, address, connectable=False)
+        return None if service_info is None else service_info.time
+
+    @property
+    def capturing(self) -> bool:
+        """Return whether matched advertisements are being recorded."""
+        return self._recorder is not None
+
+    @callback
+    def async_start_capture(
+        self, recorder: AdvertisementRecorder, duration: float
+    ) -> None:
+        """Record every matched advertisement for ``duration`` seconds."""
+        if self._recorder is not None:
+            raise RuntimeError("A capture is already running")
+        self._recorder = recorder
+        self._cancel_capture = async_call_later(
+            self._hass, duration, self._async_capture_elapsed
+        )
+
+    async def async_stop_capture(self) -> AdvertisementRecorder | None:
+        """Stop recording and write out what is still buffered."""
+        if self._cancel_capture is not None:
+            self._cancel_capture()
+            self._cancel_capture = None
+        recorder, self._recorder = self._recorder, None
+        if recorder is not None:
+            await recorder.async_flush()
+        return recorder
+
+    @callback
+    def _async_capture_elapsed(self, _now: datetime) -> None:
+        self._cancel_capture = None
+        self._hass.async_create_background_task(
+            self.async_stop_capture(), "swissinno_ble capture stop"
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop checking trap availability and drop held advertisements."""
+        if self._cancel_availability_check is not None:
+            self._cancel_availability_check()
+            self._cancel_availability_check = None
+        if self._cancel_tick is not None:
+            self._cancel_tick()
+            self._cancel_tick = None
+        if self._burst_handle is not None:
+            self._burst_handle.cancel()
+            self._burst_handle = None
+        self._held.clear()
@@ -0,0 +1,45 @@
+"""Identifiers and device metadata derived once per trap."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from homeassistant.helpers.entity import DeviceInfo
+
+from .const import DOMAIN, entity_unique_id, normalized_address
+
+
+@dataclass(frozen=True, slots=True)
+class TrapIdentity:
+    """Everything the platforms need to name one trap's entities."""
+
+    address: str
+    trap_id: str
+    unique_id: str
+    battery_unique_id: str
+    rssi_unique_id: str
+    reset_unique_id: str
+    legacy_trap_ids: tuple[str, ...]
+    device_info: DeviceInfo
+
+
+def build_trap_identity(
+    address: str, legacy_trap_ids: tuple[str, ...]
+) -> TrapIdentity:
+    """Build the identity of a trap the first time it is seen."""
+    trap_id = normalized_address(address)
+    return TrapIdentity(
+        address=address,
+        trap_id=trap_id,
+        unique_id=entity_unique_id(trap_id),
+        battery_unique_id=entity_unique_id(trap_id, "battery"),
+        rssi_unique_id=entity_unique_id(trap_id, "rssi"),
+        reset_unique_id=entity_unique_id(trap_id, "reset"),
+        legacy_trap_ids=legacy_trap_ids,
+        device_info=DeviceInfo(
+            identifiers={(DOMAIN, trap_id)},
+            manufacturer="SWISSINNO",
+            model="BLE Trap",
+            name=f"SWISSINNO Trap {trap_id}",
+        ),
+    )
@@ -0,0 +1,38 @@
+"""Migrate payload-based unique IDs used before version 1.0.16."""
+
+from __future__ import annotations
+
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN, legacy_unique_ids
+
+
+def async_migrate_legacy_unique_id(
+    entity_registry: er.EntityRegistry,
+    platform: str,
+    legacy_trap_ids: tuple[str, ...] | None,
+    unique_id: str,
+    suffix: str | None = None,
+) -> None:
+    """Migrate a legacy payload-based unique ID when no duplicate exists.
+
+    Platforms call this once, right before creating a trap's entity, so the
+    advertisement path never queries the registry afterwards. Preserving the
+    legacy entry keeps the user's existing entity_id. Existing duplicate
+    entities are left alone so Home Assistant configuration is never
+    destructively rewritten.
+    """
+    if legacy_trap_ids is None or entity_registry.async_get_entity_id(
+        platform, DOMAIN, unique_id
+    ):
+        return
+
+    for legacy_unique_id in legacy_unique_ids(legacy_trap_ids, suffix):
+        legacy_entity_id = entity_registry.async_get_entity_id(
+            platform, DOMAIN, legacy_unique_id
+        )
+        if legacy_entity_id:
+            entity_registry.async_update_entity(
+                legacy_entity_id, new_unique_id=unique_id
+            )
+            return
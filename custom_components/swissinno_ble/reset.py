@@ -1,51 +1,347 @@
 """Bluetooth GATT helper for resetting SWISSINNO traps."""
 
+import asyncio
 import logging
+from collections.abc import Callable
+from typing import Any
 
 from bleak_retry_connector import (
     BleakClientWithServiceCache,
     establish_connection,
 )
-from homeassistant.components.bluetooth import async_ble_device_from_address
+from homeassistant.components.bluetooth import (
+    async_ble_device_from_address,
+    async_scanner_devices_by_address,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 RESET_CHARACTERISTIC_UUID = "02ECC6CD-2B43-4DB5-96E6-EDE92CF8778D"
 
+# ESPHome proxies allow three active connections by default. Leave one free
+# for other integrations and queue further resets on the same adapter.
+MAX_CONNECTIONS_PER_ADAPTER = 2
+
+# Keep a client open briefly so back-to-back resets of the same trap do not
+# reconnect.
+CLIENT_IDLE_TIMEOUT = 10.0
 
-async def async_reset_trap(hass, address: str) -> None:
-    """Reset a SWISSINNO trap by writing 0x00 to the reset characteristic."""
-    normalized = address.upper()
-    _LOGGER.info("SWISSINNO BLE: Resetting trap at %s", normalized)
 
-    device = async_ble_device_from_address(hass, normalized, connectable=True)
+def _async_connectable_device(hass, address: str):
+    device = async_ble_device_from_address(hass, address, connectable=True)
     if device is None:
-        raise RuntimeError(f"Bluetooth device {normalized} not found")
-
-    client = await establish_connection(
-        BleakClientWithServiceCache,
-        device,
-        device.name or normalized,
-    )
-
-    try:
-        characteristic = client.services.get_characteristic(RESET_CHARACTERISTIC_UUID)
-        if characteristic is None:
-            raise RuntimeError(
-                f"Reset characteristic {RESET_CHARACTERISTIC_UUID} not found"
-            )
+        raise RuntimeError(f"Bluetooth device {address} not found")
+    return device
+
+
+def _adapter_source(device) -> str:
+    """Return the scanner or proxy that would hold the connection."""
+    details = getattr(device, "details", None)
+    if isinstance(details, dict) and details.get("source"):
+        return str(details["source"])
+    return "default"
+
+
+class ResetCharacteristicCache:
+    """Remember the reset characteristic handle and write mode per trap.
+
+    A cached entry lets later resets look the characteristic up by handle
+    instead of by UUID. Entries are persisted with the trap state.
+    """
+
+    __slots__ = ("_entries",)
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[int, bool]] = {}
+
+    def get(self, address: str) -> tuple[int, bool] | None:
+        """Return the cached ``(handle, response)`` for a trap."""
+        return self._entries.get(address)
 
-        properties = set(characteristic.properties)
-        if "write-without-response" in properties:
-            response = False
-        elif "write" in properties:
-            response = True
+    def set(self, address: str, handle: int, response: bool) -> None:
+        """Remember the characteristic resolved for a trap."""
+        self._entries[address] = (handle, response)
+
+    def discard(self, address: str) -> None:
+        """Forget a trap whose cached handle no longer works."""
+        self._entries.pop(address, None)
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return a JSON-serializable copy for storage."""
+        return {
+            address: {"handle": handle, "response": response}
+            for address, (handle, response) in self._entries.items()
+        }
+
+    def restore(self, data: dict[str, dict[str, Any]]) -> None:
+        """Load entries saved by ``as_dict``, skipping invalid ones."""
+        for address, entry in data.items():
+            try:
+                handle = entry["handle"]
+                response = entry["response"]
+            except (KeyError, TypeError):
+                continue
+            if isinstance(handle, int) and isinstance(response, bool):
+                self._entries[address] = (handle, response)
+
+
+async def _async_write_reset(
+    client, address: str, cache: ResetCharacteristicCache | None = None
+) -> None:
+    if cache is not None and (cached := cache.get(address)) is not None:
+        handle, response = cached
+        cached_characteristic = client.services.get_characteristic(handle)
+        if (
+            cached_characteristic is None
+            or cached_characteristic.uuid.upper() != RESET_CHARACTERISTIC_UUID
+        ):
+            # A firmware update gave the handle to another characteristic.
+            # Writes without response to it would fail silently.
+            _LOGGER.debug(
+                "SWISSINNO BLE: Cached reset handle of %s is no longer the "
+                "reset characteristic",
+                address,
+            )
+            cache.discard(address)
         else:
-            raise RuntimeError(
-                f"Reset characteristic is not writable (properties: {sorted(properties)})"
+            try:
+                await client.write_gatt_char(handle, b"\x00", response=response)
+            except Exception:
+                # Firmware updates can move the characteristic. Resolve it again.
+                _LOGGER.debug(
+                    "SWISSINNO BLE: Cached reset handle failed for %s",
+                    address,
+                    exc_info=True,
+                )
+                cache.discard(address)
+            else:
+                _LOGGER.info("SWISSINNO BLE: Successfully reset trap %s", address)
+                return
+
+    characteristic = client.services.get_characteristic(RESET_CHARACTERISTIC_UUID)
+    if characteristic is None:
+        raise RuntimeError(
+            f"Reset characteristic {RESET_CHARACTERISTIC_UUID} not found"
+        )
+
+    properties = set(characteristic.properties)
+    if "write-without-response" in properties:
+        response = False
+    elif "write" in properties:
+        response = True
+    else:
+        raise RuntimeError(
+            f"Reset characteristic is not writable (properties: {sorted(properties)})"
+        )
+
+    await client.write_gatt_char(characteristic, b"\x00", response=response)
+    if cache is not None:
+        cache.set(address, characteristic.handle, response)
+    _LOGGER.info("SWISSINNO BLE: Successfully reset trap %s", address)
+
+
+class _PooledClient:
+    """An open connection and the adapter slot it occupies."""
+
+    __slots__ = ("adapter", "client", "idle_handle")
+
+    def __init__(self, adapter: str, client) -> None:
+        self.adapter = adapter
+        self.client = client
+        self.idle_handle: asyncio.TimerHandle | None = None
+
+
+class ResetEngine:
+    """Queue trap resets, limit connections per adapter, and reuse clients.
+
+    Each adapter or proxy has a fixed number of connection slots. Resets wait
+    in FIFO order for a slot, resets of the same trap run one at a time, and a
+    connection stays open for ``idle_timeout`` seconds after a reset so that
+    follow-up operations on that trap reuse it. Connections are closed right
+    away when another trap is waiting for their slot.
+
+    ``source_preference`` returns the scanners that heard a trap, nearest
+    first. Connections are tried through those scanners in order, then
+    through any other connectable scanner, falling back on failure. Scanners
+    with a free slot come first, so a reset queues behind a busy adapter only
+    when every scanner that can reach the trap is busy.
+    """
+
+    def __init__(
+        self,
+        hass,
+        *,
+        cache: ResetCharacteristicCache | None = None,
+        source_preference: Callable[[str], list[str]] | None = None,
+        max_connections_per_adapter: int = MAX_CONNECTIONS_PER_ADAPTER,
+        idle_timeout: float = CLIENT_IDLE_TIMEOUT,
+    ) -> None:
+        self._hass = hass
+        self._cache = cache if cache is not None else ResetCharacteristicCache()
+        self._source_preference = source_preference
+        self._max_connections = max_connections_per_adapter
+        self._idle_timeout = idle_timeout
+        self._slots: dict[str, asyncio.Semaphore] = {}
+        self._trap_locks: dict[str, asyncio.Lock] = {}
+        self._clients: dict[str, _PooledClient] = {}
+        self._waiting: dict[str, int] = {}
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Return the number of resets queued or in progress."""
+        return self._pending
+
+    async def async_reset(self, address: str, *, keep_alive: bool = True) -> None:
+        """Reset a trap, waiting for a free connection slot if needed.
+
+        With ``keep_alive`` False the connection is closed right after the
+        write, so the trap resumes advertising as soon as possible.
+        """
+        normalized = address.upper()
+        lock = self._trap_locks.setdefault(normalized, asyncio.Lock())
+        self._pending += 1
+        try:
+            async with lock:
+                _LOGGER.info("SWISSINNO BLE: Resetting trap at %s", normalized)
+                pooled = await self._async_client(normalized)
+                try:
+                    await _async_write_reset(pooled.client, normalized, self._cache)
+                except BaseException:
+                    self._clients.pop(normalized, None)
+                    await self._async_disconnect(pooled)
+                    raise
+                if not keep_alive or self._waiting.get(pooled.adapter):
+                    # Another trap may be queued for this adapter; hand over the slot.
+                    del self._clients[normalized]
+                    await self._async_disconnect(pooled)
+                else:
+                    pooled.idle_handle = self._hass.loop.call_later(
+                        self._idle_timeout, self._idle_expired, normalized
+                    )
+        finally:
+            self._pending -= 1
+
+    def forget_characteristic(self, address: str) -> None:
+        """Resolve the reset characteristic again on the next reset of a trap."""
+        self._cache.discard(address.upper())
+
+    async def async_stop(self) -> None:
+        """Close every pooled connection."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for pooled in clients:
+            await self._async_disconnect(pooled)
+
+    async def _async_client(self, address: str) -> _PooledClient:
+        if (pooled := self._clients.get(address)) is not None:
+            if pooled.idle_handle is not None:
+                pooled.idle_handle.cancel()
+                pooled.idle_handle = None
+            if pooled.client.is_connected:
+                return pooled
+            del self._clients[address]
+            await self._async_disconnect(pooled)
+
+        error = RuntimeError(f"No connectable scanner can reach {address}")
+        candidates = self._connection_candidates(address)
+        candidates.sort(key=lambda candidate: self._adapter_busy(candidate[0]))
+        for adapter, device in candidates:
+            try:
+                client = await self._async_connect(adapter, device, address)
+            except Exception as err:
+                _LOGGER.debug(
+                    "SWISSINNO BLE: Connecting to %s via %s failed: %s",
+                    address,
+                    adapter,
+                    err,
+                )
+                error = err
+                continue
+            pooled = self._clients[address] = _PooledClient(adapter, client)
+            return pooled
+        raise error
+
+    def _connection_candidates(self, address: str) -> list[tuple[str, Any]]:
+        """Return ``(adapter, device)`` pairs to try, best scanner first."""
+        scanner_devices = sorted(
+            async_scanner_devices_by_address(self._hass, address, connectable=True),
+            key=lambda scanner_device: scanner_device.advertisement.rssi,
+            reverse=True,
+        )
+        if not scanner_devices:
+            device = _async_connectable_device(self._hass, address)
+            return [(_adapter_source(device), device)]
+
+        devices = {
+            scanner_device.scanner.source: scanner_device.ble_device
+            for scanner_device in scanner_devices
+        }
+        preferred = (
+            self._source_preference(address) if self._source_preference else []
+        )
+        order = [source for source in preferred if source in devices]
+        order.extend(source for source in devices if source not in order)
+        return [(source, devices[source]) for source in order]
+
+    def _adapter_busy(self, adapter: str) -> bool:
+        """Return whether a connection through ``adapter`` would have to wait."""
+        if (slots := self._slots.get(adapter)) is None or not slots.locked():
+            return False
+        return not any(
+            pooled.adapter == adapter and pooled.idle_handle is not None
+            for pooled in self._clients.values()
+        )
+
+    async def _async_connect(self, adapter: str, device, address: str):
+        """Connect through ``adapter`` while holding one of its slots."""
+        if (slots := self._slots.get(adapter)) is None:
+            slots = self._slots[adapter] = asyncio.Semaphore(self._max_connections)
+        if slots.locked():
+            await self._async_close_idle(adapter)
+        self._waiting[adapter] = self._waiting.get(adapter, 0) + 1
+        try:
+            await slots.acquire()
+        finally:
+            self._waiting[adapter] -= 1
+        try:
+            client = await establish_connection(
+                BleakClientWithServiceCache,
+                device,
+                device.name or address,
             )
+        except BaseException:
+            slots.release()
+            raise
+        return client
+
+    async def _async_close_idle(self, adapter: str) -> None:
+        """Free slots held by idle connections on ``adapter``."""
+        idle = [
+            address
+            for address, pooled in self._clients.items()
+            if pooled.adapter == adapter and pooled.idle_handle is not None
+        ]
+        for address in idle:
+            if (pooled := self._clients.pop(address, None)) is not None:
+                await self._async_disconnect(pooled)
+
+    def _idle_expired(self, address: str) -> None:
+        if (pooled := self._clients.get(address)) is None:
+            return
+        pooled.idle_handle = None
+        del self._clients[address]
+        self._hass.async_create_background_task(
+            self._async_disconnect(pooled), f"swissinno_ble disconnect {address}"
+        )
 
-        await client.write_gatt_char(characteristic, b"\x00", response=response)
-        _LOGGER.info("SWISSINNO BLE: Successfully reset trap %s", normalized)
-    finally:
-        await client.disconnect()
+    async def _async_disconnect(self, pooled: _PooledClient) -> None:
+        if pooled.idle_handle is not None:
+            pooled.idle_handle.cancel()
+            pooled.idle_handle = None
+        try:
+            await pooled.client.disconnect()
+        except Exception:
+            _LOGGER.debug("SWISSINNO BLE: Disconnect failed", exc_info=True)
+        finally:
+            self._slots[pooled.adapter].release()
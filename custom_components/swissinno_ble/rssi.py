@@ -0,0 +1,105 @@
+"""Signal strength reporting filter for SWISSINNO traps."""
+
+from __future__ import annotations
+
+from collections import deque
+from statistics import median_low
+
+RSSI_SMOOTHING_NONE = "none"
+RSSI_SMOOTHING_EMA = "ema"
+RSSI_SMOOTHING_MEDIAN = "median"
+RSSI_SMOOTHING_MODES = (
+    RSSI_SMOOTHING_NONE,
+    RSSI_SMOOTHING_EMA,
+    RSSI_SMOOTHING_MEDIAN,
+)
+
+EMA_ALPHA = 0.3
+MEDIAN_WINDOW = 5
+
+
+class RSSIFilter:
+    """Publish RSSI only after meaningful changes and at a limited rate."""
+
+    __slots__ = (
+        "_deadband",
+        "_ema",
+        "_last",
+        "_min_interval",
+        "_published",
+        "_published_at",
+        "_smoothing",
+        "_window",
+    )
+
+    def __init__(
+        self,
+        *,
+        deadband: int = 3,
+        min_interval: float = 60.0,
+        smoothing: str = RSSI_SMOOTHING_NONE,
+    ) -> None:
+        if smoothing not in RSSI_SMOOTHING_MODES:
+            raise ValueError(f"Unsupported RSSI smoothing: {smoothing}")
+        self._deadband = deadband
+        self._min_interval = min_interval
+        self._smoothing = smoothing
+        self._ema: float | None = None
+        self._window: deque[int] = deque(maxlen=MEDIAN_WINDOW)
+        self._last: int | None = None
+        self._published: int | None = None
+        self._published_at = 0.0
+
+    @property
+    def settled(self) -> bool:
+        """Return whether repeating the last sample can change nothing.
+
+        Smoothing weighs repeated samples, and a sample held back only by the
+        minimum interval is published when it repeats later.
+        """
+        return (
+            self._smoothing == RSSI_SMOOTHING_NONE
+            and self._published is not None
+            and self._last is not None
+            and abs(self._last - self._published) < self._deadband
+        )
+
+    def update(self, rssi: int | None, now: float) -> int | None:
+        """Return a value to publish, or None to keep the last published one.
+
+        ``now`` is a monotonic timestamp in seconds. The first sample after
+        creation or ``reset`` is always published.
+        """
+        if rssi is None:
+            return None
+
+        value = self._last = self._smooth(rssi)
+        if self._published is not None and (
+            abs(value - self._published) < self._deadband
+            or now - self._published_at < self._min_interval
+        ):
+            return None
+
+        self._published = value
+        self._published_at = now
+        return value
+
+    def reset(self) -> None:
+        """Forget history so the next sample is published immediately."""
+        self._ema = None
+        self._window.clear()
+        self._last = None
+        self._published = None
+
+    def _smooth(self, rssi: int) -> int:
+        """Return the configured smoothed value for a new sample."""
+        if self._smoothing == RSSI_SMOOTHING_EMA:
+            if self._ema is None:
+                self._ema = float(rssi)
+            else:
+                self._ema += EMA_ALPHA * (rssi - self._ema)
+            return round(self._ema)
+        if self._smoothing == RSSI_SMOOTHING_MEDIAN:
+            self._window.append(rssi)
+            return median_low(self._window)
+        return rssi
@@ -1,5 +1,6 @@
-import logging
-
+import logging
+from time import monotonic
+
 from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
@@ -9,9 +10,31 @@ from homeassistant.const import (
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 
+from .batch import BatchedEntityMixin, EntityBatcher
 from .battery import BatteryStabilizer
-from .const import DATA_COORDINATOR, DOMAIN, entity_unique_id, legacy_unique_ids
-from .coordinator import TrapObservation, TrapObservationCoordinator
+from .const import (
+    CONF_RSSI_DEADBAND,
+    CONF_RSSI_MIN_INTERVAL,
+    CONF_RSSI_SMOOTHING,
+    DATA_COORDINATOR,
+    DATA_STATS,
+    DEFAULT_RSSI_DEADBAND,
+    DEFAULT_RSSI_MIN_INTERVAL,
+    DEFAULT_RSSI_SMOOTHING,
+    DOMAIN,
+)
+from .coordinator import (
+    CHANGED_AVAILABLE,
+    CHANGED_BATTERY,
+    CHANGED_RSSI,
+    UNCHANGED,
+    TrapObservation,
+    TrapObservationCoordinator,
+)
+from .identity import TrapIdentity
+from .migration import async_migrate_legacy_unique_id
+from .rssi import RSSIFilter
+from .stats import HotPathStats
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,83 +48,102 @@ async def async_setup_entry(
     battery_sensors: dict[str, SwissinnoBatterySensor] = {}
     battery_stabilizers: dict[str, BatteryStabilizer] = {}
     rssi_sensors: dict[str, SwissinnoRSSISensor] = {}
+    rssi_filters: dict[str, RSSIFilter] = {}
+    rssi_deadband = entry.options.get(CONF_RSSI_DEADBAND, DEFAULT_RSSI_DEADBAND)
+    rssi_min_interval = entry.options.get(
+        CONF_RSSI_MIN_INTERVAL, DEFAULT_RSSI_MIN_INTERVAL
+    )
+    rssi_smoothing = entry.options.get(CONF_RSSI_SMOOTHING, DEFAULT_RSSI_SMOOTHING)
     entity_registry = er.async_get(hass)
     coordinator: TrapObservationCoordinator = hass.data[DOMAIN][DATA_COORDINATOR]
+    stats: HotPathStats = hass.data[DOMAIN][DATA_STATS]
+    batcher = EntityBatcher(hass, async_add_entities)
 
     @callback
     def update_sensors(
         trap_id: str,
         observation: TrapObservation,
+        changed: int,
     ) -> None:
         if not observation.available:
             if trap_id in battery_sensors:
                 battery_sensors[trap_id].set_unavailable()
-            if trap_id in rssi_sensors:
-                rssi_sensors[trap_id].set_unavailable()
-            return
+            if trap_id in rssi_sensors:
+                rssi_sensors[trap_id].set_unavailable()
+            if trap_id in rssi_filters:
+                rssi_filters[trap_id].reset()
+            return
 
         # Battery readings can briefly be invalid during startup or switching.
         # Keep the last published value until two consecutive readings agree.
-        stabilizer = battery_stabilizers.setdefault(trap_id, BatteryStabilizer())
-        stable_battery_v = stabilizer.update(observation.battery_v)
+        # Values restored from storage were already confirmed before saving.
+        # A repeated reading only matters while a new value awaits confirmation.
+        if (stabilizer := battery_stabilizers.get(trap_id)) is None:
+            stabilizer = battery_stabilizers[trap_id] = BatteryStabilizer()
+        if observation.restored:
+            stable_battery_v = observation.battery_v
+        elif (
+            changed & (CHANGED_BATTERY | CHANGED_AVAILABLE)
+            or not stabilizer.confirmed
+        ):
+            stable_battery_v = stabilizer.update(observation.battery_v)
+        else:
+            stable_battery_v = None
         if stable_battery_v is not None:
             if trap_id in battery_sensors:
                 battery_sensors[trap_id].update_value(stable_battery_v)
             else:
-                _migrate_legacy_unique_id(
+                identity = coordinator.identity(trap_id)
+                async_migrate_legacy_unique_id(
                     entity_registry,
                     "sensor",
-                    observation.legacy_trap_ids,
+                    identity.legacy_trap_ids,
+                    identity.battery_unique_id,
                     "battery",
-                    entity_unique_id(trap_id, "battery"),
                 )
-                sensor = SwissinnoBatterySensor(trap_id, stable_battery_v)
+                sensor = SwissinnoBatterySensor(identity, stable_battery_v, stats)
                 battery_sensors[trap_id] = sensor
-                async_add_entities([sensor])
-
-        # RSSI
+                batcher.add([sensor])
+
+        # RSSI jitters by a few dBm on every advertisement. Publish only changes
+        # beyond the configured deadband, at most once per minimum interval.
+        if (rssi_filter := rssi_filters.get(trap_id)) is None:
+            rssi_filter = rssi_filters[trap_id] = RSSIFilter(
+                deadband=rssi_deadband,
+                min_interval=rssi_min_interval,
+                smoothing=rssi_smoothing,
+            )
+        elif not changed & (CHANGED_RSSI | CHANGED_AVAILABLE) and rssi_filter.settled:
+            return
+        if (rssi := rssi_filter.update(observation.rssi, monotonic())) is None:
+            return
+
         if trap_id in rssi_sensors:
-            rssi_sensors[trap_id].update_value(observation.rssi)
+            rssi_sensors[trap_id].update_value(rssi)
         else:
-            _migrate_legacy_unique_id(
+            identity = coordinator.identity(trap_id)
+            async_migrate_legacy_unique_id(
                 entity_registry,
                 "sensor",
-                observation.legacy_trap_ids,
+                identity.legacy_trap_ids,
+                identity.rssi_unique_id,
                 "rssi",
-                entity_unique_id(trap_id, "rssi"),
             )
-            sensor = SwissinnoRSSISensor(trap_id, observation.rssi)
-            rssi_sensors[trap_id] = sensor
-            async_add_entities([sensor])
-
-    entry.async_on_unload(coordinator.register_listener(update_sensors))
+            sensor = SwissinnoRSSISensor(identity, rssi, stats)
+            rssi_sensors[trap_id] = sensor
+            batcher.add([sensor])
 
+    entry.async_on_unload(batcher.async_cancel)
+    # Repeated advertisements are still needed to confirm new battery values.
+    entry.async_on_unload(
+        coordinator.register_change_listener(
+            update_sensors,
+            CHANGED_AVAILABLE | CHANGED_BATTERY | CHANGED_RSSI | UNCHANGED,
+        )
+    )
 
-def _migrate_legacy_unique_id(
-    entity_registry,
-    platform: str,
-    legacy_trap_ids: tuple[str, ...] | None,
-    suffix: str,
-    unique_id: str,
-) -> None:
-    """Migrate a legacy payload-based unique ID when no duplicate exists."""
-    if legacy_trap_ids is None or entity_registry.async_get_entity_id(
-        platform, DOMAIN, unique_id
-    ):
-        return
 
-    for legacy_unique_id in legacy_unique_ids(legacy_trap_ids, suffix):
-        legacy_entity_id = entity_registry.async_get_entity_id(
-            platform, DOMAIN, legacy_unique_id
-        )
-        if legacy_entity_id:
-            entity_registry.async_update_entity(
-                legacy_entity_id, new_unique_id=unique_id
-            )
-            return
-
-
-class SwissinnoBatterySensor(SensorEntity):
+class SwissinnoBatterySensor(BatchedEntityMixin, SensorEntity):
     """Battery voltage sensor."""
 
     _attr_device_class = SensorDeviceClass.VOLTAGE
@@ -111,32 +153,34 @@ class SwissinnoBatterySensor(SensorEntity):
     _attr_suggested_display_precision = 2
     _attr_translation_key = "battery_voltage"
 
-    def __init__(self, trap_id: str, battery_v: float | None):
-        self._trap_id = trap_id
-        self._value = battery_v
-        self._attr_available = True
-
-        self._attr_unique_id = entity_unique_id(trap_id, "battery")
-        self._attr_native_value = battery_v
-
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, trap_id)},
-            "manufacturer": "SWISSINNO",
-            "name": f"SWISSINNO Trap {trap_id}",
-        }
-
-    def update_value(self, value: float | None):
-        self._attr_native_value = value
-        self._attr_available = True
-        self.async_write_ha_state()
+    def __init__(
+        self, identity: TrapIdentity, battery_v: float | None, stats: HotPathStats
+    ):
+        self._trap_id = identity.trap_id
+        self._value = battery_v
+        self._stats = stats
+        self._attr_available = True
+
+        self._attr_unique_id = identity.battery_unique_id
+        self._attr_native_value = battery_v
+        self._attr_device_info = identity.device_info
 
-    @callback
-    def set_unavailable(self) -> None:
-        self._attr_available = False
-        self.async_write_ha_state()
+    def update_value(self, value: float | None):
+        if self._attr_available and value == self._attr_native_value:
+            return
+        self._attr_native_value = value
+        self._attr_available = True
+        self._async_write_state()
+
+    @callback
+    def set_unavailable(self) -> None:
+        if not self._attr_available:
+            return
+        self._attr_available = False
+        self._async_write_state()
 
 
-class SwissinnoRSSISensor(SensorEntity):
+class SwissinnoRSSISensor(BatchedEntityMixin, SensorEntity):
     """RSSI sensor."""
 
     _attr_device_class = SensorDeviceClass.SIGNAL_STRENGTH
@@ -145,26 +189,26 @@ class SwissinnoRSSISensor(SensorEntity):
     _attr_native_unit_of_measurement = SIGNAL_STRENGTH_DECIBELS_MILLIWATT
     _attr_translation_key = "signal_strength"
 
-    def __init__(self, trap_id: str, rssi: int | None):
-        self._trap_id = trap_id
-        self._value = rssi
-        self._attr_available = True
-
-        self._attr_unique_id = entity_unique_id(trap_id, "rssi")
-        self._attr_native_value = rssi
-
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, trap_id)},
-            "manufacturer": "SWISSINNO",
-            "name": f"SWISSINNO Trap {trap_id}",
-        }
-
-    def update_value(self, rssi: int | None):
-        self._attr_native_value = rssi
-        self._attr_available = True
-        self.async_write_ha_state()
+    def __init__(self, identity: TrapIdentity, rssi: int | None, stats: HotPathStats):
+        self._trap_id = identity.trap_id
+        self._value = rssi
+        self._stats = stats
+        self._attr_available = True
+
+        self._attr_unique_id = identity.rssi_unique_id
+        self._attr_native_value = rssi
+        self._attr_device_info = identity.device_info
 
-    @callback
-    def set_unavailable(self) -> None:
-        self._attr_available = False
-        self.async_write_ha_state()
+    def update_value(self, rssi: int | None):
+        if self._attr_available and rssi == self._attr_native_value:
+            return
+        self._attr_native_value = rssi
+        self._attr_available = True
+        self._async_write_state()
+
+    @callback
+    def set_unavailable(self) -> None:
+        if not self._attr_available:
+            return
+        self._attr_available = False
+        self._async_write_state()
@@ -0,0 +1,206 @@
+"""Services for SWISSINNO BLE traps."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import strftime
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+
+from .capture import AdvertisementRecorder
+from .const import (
+    CONF_RESET_CONFIRM_TIMEOUT,
+    DATA_COORDINATOR,
+    DATA_DISPATCHER,
+    DATA_RESET_ENGINE,
+    DEFAULT_RESET_CONFIRM_TIMEOUT,
+    DOMAIN,
+)
+from .coordinator import TrapObservation, TrapObservationCoordinator
+from .dispatcher import AdvertisementDispatcher
+from .reset import ResetEngine
+from .verification import async_reset_and_confirm
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_RESET_TRAPS = "reset_traps"
+SERVICE_CAPTURE_ADVERTISEMENTS = "capture_advertisements"
+ATTR_ALL_TRIPPED = "all_tripped"
+ATTR_DEVICE_ID = "device_id"
+ATTR_DURATION = "duration"
+
+RESET_TRAPS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_ID, default=[]): vol.All(cv.ensure_list, [str]),
+        vol.Optional(ATTR_ALL_TRIPPED, default=False): cv.boolean,
+    }
+)
+
+CAPTURE_ADVERTISEMENTS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=86400)
+        ),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Register the integration services."""
+    confirm_timeout = entry.options.get(
+        CONF_RESET_CONFIRM_TIMEOUT, DEFAULT_RESET_CONFIRM_TIMEOUT
+    )
+
+    async def async_reset_traps(call: ServiceCall) -> ServiceResponse:
+        data = hass.data[DOMAIN]
+        coordinator: TrapObservationCoordinator = data[DATA_COORDINATOR]
+        reset_engine: ResetEngine = data[DATA_RESET_ENGINE]
+
+        trap_ids = _trap_ids_for_devices(hass, call.data[ATTR_DEVICE_ID])
+        if call.data[ATTR_ALL_TRIPPED]:
+            trap_ids.update(
+                trap_id
+                for trap_id, observation in coordinator.observations()
+                if observation.available and observation.tripped
+            )
+        if not trap_ids:
+            raise ServiceValidationError(
+                "Select at least one trap or enable all tripped traps"
+            )
+
+        results = await async_reset_traps_by_id(
+            coordinator, reset_engine, sorted(trap_ids), confirm_timeout
+        )
+        return {"results": results}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESET_TRAPS,
+        async_reset_traps,
+        schema=RESET_TRAPS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_capture_advertisements(call: ServiceCall) -> ServiceResponse:
+        dispatcher: AdvertisementDispatcher = hass.data[DOMAIN][DATA_DISPATCHER]
+        if dispatcher.capturing:
+            raise ServiceValidationError("A capture is already running")
+
+        path = hass.config.path(f"{DOMAIN}_capture_{strftime('%Y%m%d_%H%M%S')}.bin")
+        dispatcher.async_start_capture(
+            AdvertisementRecorder(hass, path), call.data[ATTR_DURATION]
+        )
+        _LOGGER.info("SWISSINNO BLE: Capturing advertisements to %s", path)
+        return {"path": path}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAPTURE_ADVERTISEMENTS,
+        async_capture_advertisements,
+        schema=CAPTURE_ADVERTISEMENTS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the integration services."""
+    hass.services.async_remove(DOMAIN, SERVICE_RESET_TRAPS)
+    hass.services.async_remove(DOMAIN, SERVICE_CAPTURE_ADVERTISEMENTS)
+
+
+async def async_reset_traps_by_id(
+    coordinator: TrapObservationCoordinator,
+    reset_engine: ResetEngine,
+    trap_ids: list[str],
+    confirm_timeout: float = DEFAULT_RESET_CONFIRM_TIMEOUT,
+) -> dict[str, dict[str, Any]]:
+    """Reset traps in parallel and return a result for each trap.
+
+    The reset engine limits connections per adapter, so resets spread across
+    every connectable scanner and queue only where an adapter is busy. Each
+    result includes the seconds until the trap advertised ready again.
+    """
+    observations = dict(coordinator.observations())
+    results: dict[str, dict[str, Any]] = {}
+    pending: dict[str, str] = {}
+    for trap_id in trap_ids:
+        observation = observations.get(trap_id)
+        if (error := _reset_unavailable_reason(coordinator, observation)) is not None:
+            results[trap_id] = {
+                "address": observation.address if observation else None,
+                "success": False,
+                "error": error,
+                "confirm_seconds": None,
+            }
+        else:
+            pending[trap_id] = observation.address
+
+    outcomes = await asyncio.gather(
+        *(
+            async_reset_and_confirm(
+                coordinator, reset_engine, trap_id, address, confirm_timeout
+            )
+            for trap_id, address in pending.items()
+        ),
+        return_exceptions=True,
+    )
+    for (trap_id, address), outcome in zip(pending.items(), outcomes):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome
+            _LOGGER.warning("SWISSINNO BLE: Reset of %s failed: %s", trap_id, outcome)
+            results[trap_id] = {
+                "address": address,
+                "success": False,
+                "error": str(outcome) or type(outcome).__name__,
+                "confirm_seconds": None,
+            }
+        else:
+            results[trap_id] = {
+                "address": address,
+                "success": True,
+                "error": None,
+                "confirm_seconds": round(outcome, 2) if outcome is not None else None,
+            }
+    return results
+
+
+def _reset_unavailable_reason(
+    coordinator: TrapObservationCoordinator, observation: TrapObservation | None
+) -> str | None:
+    if observation is None or observation.address is None:
+        return "unknown trap"
+    if not observation.supports_reset:
+        return "trap does not support remote reset"
+    # The latest advertisement may have come through a passive scanner even
+    # though a connectable one heard the trap moments earlier.
+    if not observation.connectable and not coordinator.connectable_sources(
+        observation.address
+    ):
+        return "no connectable scanner has seen this trap"
+    return None
+
+
+def _trap_ids_for_devices(hass: HomeAssistant, device_ids: list[str]) -> set[str]:
+    device_registry = dr.async_get(hass)
+    trap_ids = set()
+    for device_id in device_ids:
+        if (device := device_registry.async_get(device_id)) is None:
+            raise ServiceValidationError(f"Unknown device: {device_id}")
+        trap_ids.update(
+            identifier for domain, identifier in device.identifiers if domain == DOMAIN
+        )
+    return trap_ids
@@ -0,0 +1,100 @@
+"""Lightweight hot-path counters for diagnostics."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from typing import Any
+
+from .decoder import decode_cache_info
+
+# Upper bucket bounds in microseconds; one more bucket collects slower calls.
+TIMING_BUCKETS_US = (10, 25, 50, 100, 250, 500, 1000, 5000)
+_TIMING_BUCKETS_NS = tuple(bound * 1000 for bound in TIMING_BUCKETS_US)
+
+
+class TimingHistogram:
+    """Count durations in fixed microsecond buckets."""
+
+    __slots__ = ("buckets", "count", "max_ns", "total_ns")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(TIMING_BUCKETS_US) + 1)
+        self.count = 0
+        self.max_ns = 0
+        self.total_ns = 0
+
+    def record(self, elapsed_ns: int) -> None:
+        """Add one duration in nanoseconds."""
+        self.buckets[bisect_left(_TIMING_BUCKETS_NS, elapsed_ns)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable summary."""
+        labels = [f"<={bound}us" for bound in TIMING_BUCKETS_US]
+        labels.append(f">{TIMING_BUCKETS_US[-1]}us")
+        mean_us = round(self.total_ns / self.count / 1000, 2) if self.count else None
+        return {
+            "count": self.count,
+            "mean_us": mean_us,
+            "max_us": round(self.max_ns / 1000, 2),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class HotPathStats:
+    """Count advertisements, bursts, decode results, writes, and callback time."""
+
+    __slots__ = (
+        "advertisements",
+        "bursts",
+        "callback_time",
+        "coalesced",
+        "decode_failures",
+        "decode_time",
+        "fan_out_time",
+        "ignored",
+        "observations",
+        "per_trap",
+        "state_writes",
+    )
+
+    def __init__(self) -> None:
+        self.advertisements = 0
+        self.bursts = 0
+        self.coalesced = 0
+        self.ignored = 0
+        self.decode_failures = 0
+        self.observations = 0
+        self.state_writes = 0
+        self.per_trap: Counter[str] = Counter()
+        self.callback_time = TimingHistogram()
+        self.decode_time = TimingHistogram()
+        self.fan_out_time = TimingHistogram()
+
+    def as_dict(self, busiest: int = 10) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot for diagnostics."""
+        cache = decode_cache_info()
+        return {
+            "advertisements": self.advertisements,
+            "bursts": self.bursts,
+            "coalesced": self.coalesced,
+            "ignored": self.ignored,
+            "decode_failures": self.decode_failures,
+            "observations": self.observations,
+            "state_writes": self.state_writes,
+            "traps": len(self.per_trap),
+            "busiest_traps": dict(self.per_trap.most_common(busiest)),
+            "decode_cache": {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "size": cache.currsize,
+                "max_size": cache.maxsize,
+            },
+            "callback_time": self.callback_time.as_dict(),
+            "decode_time": self.decode_time.as_dict(),
+            "fan_out_time": self.fan_out_time.as_dict(),
+        }
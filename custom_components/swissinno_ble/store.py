@@ -0,0 +1,137 @@
+"""Persist the last known state of SWISSINNO traps across restarts."""
+
+from __future__ import annotations
+
+import logging
+from time import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .coordinator import TrapObservation, TrapObservationCoordinator
+from .identity import build_trap_identity
+
+if TYPE_CHECKING:
+    from .reset import ResetCharacteristicCache
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.traps"
+SAVE_DELAY = 60
+
+# Home Assistant marks a passive Bluetooth device unavailable after 15 minutes
+# without advertisements. Older restored state is published as unavailable.
+RESTORE_MAX_AGE = 900
+
+
+class TrapStateStore:
+    """Save the latest trap observations and restore them at startup.
+
+    Resolved reset characteristics are saved alongside, so the first reset
+    after a restart does not need a service lookup either.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: TrapObservationCoordinator,
+        reset_characteristics: ResetCharacteristicCache,
+    ) -> None:
+        self._coordinator = coordinator
+        self._reset_characteristics = reset_characteristics
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._save_pending = False
+
+    async def async_restore(self) -> list[str]:
+        """Load persisted traps into the coordinator and return restored IDs."""
+        data = await self._store.async_load()
+        if not data:
+            return []
+
+        self._reset_characteristics.restore(data.get("reset_characteristics", {}))
+
+        now = time()
+        restored = []
+        for trap_id, stored in data.get("traps", {}).items():
+            try:
+                observation = _observation_from_dict(stored, now)
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.debug("Ignoring invalid stored state for trap %s", trap_id)
+                continue
+            identity = build_trap_identity(
+                observation.address, observation.legacy_trap_ids
+            )
+            self._coordinator.restore(identity, observation)
+            if observation.available:
+                restored.append(identity.trap_id)
+        return restored
+
+    @callback
+    def async_schedule_save(self, _trap_id: str, _observation: TrapObservation) -> None:
+        """Coordinator listener that schedules one delayed write.
+
+        ``Store.async_delay_save`` restarts its timer on every call, so with
+        traps advertising every second it must only be called once per write.
+        """
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Write the current state immediately."""
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._save_pending = False
+        return {
+            "traps": {
+                trap_id: _observation_to_dict(observation)
+                for trap_id, observation in self._coordinator.observations()
+                if observation.address is not None
+            },
+            "reset_characteristics": self._reset_characteristics.as_dict(),
+        }
+
+
+def _observation_to_dict(observation: TrapObservation) -> dict[str, Any]:
+    return {
+        "address": observation.address,
+        "legacy_trap_ids": list(observation.legacy_trap_ids),
+        "available": observation.available,
+        "rssi": observation.rssi,
+        "battery_v": observation.battery_v,
+        "tripped": observation.tripped,
+        "family": observation.family,
+        "supports_reset": observation.supports_reset,
+        "connectable": observation.connectable,
+        "last_seen": observation.last_seen,
+    }
+
+
+def _observation_from_dict(stored: dict[str, Any], now: float) -> TrapObservation:
+    if not isinstance(address := stored["address"], str):
+        raise TypeError("address")
+    last_seen = stored["last_seen"]
+    available = (
+        bool(stored["available"])
+        and last_seen is not None
+        and now - last_seen < RESTORE_MAX_AGE
+    )
+    return TrapObservation(
+        rssi=stored["rssi"],
+        battery_v=stored["battery_v"],
+        legacy_trap_ids=tuple(stored["legacy_trap_ids"]),
+        available=available,
+        address=address,
+        tripped=stored["tripped"],
+        family=stored["family"],
+        supports_reset=bool(stored["supports_reset"]),
+        connectable=bool(stored["connectable"]),
+        last_seen=last_seen,
+        restored=True,
+    )
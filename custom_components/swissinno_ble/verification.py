@@ -0,0 +1,69 @@
+"""Confirm trap resets from the advertisements that follow them."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import monotonic
+
+from .coordinator import TrapObservation, TrapObservationCoordinator
+from .reset import ResetEngine
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _is_ready(observation: TrapObservation) -> bool:
+    return observation.tripped is False
+
+
+async def async_reset_and_confirm(
+    coordinator: TrapObservationCoordinator,
+    reset_engine: ResetEngine,
+    trap_id: str,
+    address: str,
+    timeout: float,
+) -> float | None:
+    """Reset a trap and wait until it advertises ready again.
+
+    Returns the seconds from the completed write to the first ready
+    advertisement, or None when ``timeout`` is 0 and confirmation is disabled.
+    Raises RuntimeError when the trap does not report ready in time; the
+    cached reset characteristic is then dropped, since the write may have
+    gone to the wrong one.
+    """
+    if not timeout:
+        await reset_engine.async_reset(address)
+        return None
+
+    ready_at = 0.0
+
+    def is_ready(observation: TrapObservation) -> bool:
+        nonlocal ready_at
+        if not _is_ready(observation):
+            return False
+        ready_at = monotonic()
+        return True
+
+    # Wait before writing: the trap can advertise ready while the engine is
+    # still disconnecting. The engine does not keep the connection open, as a
+    # connected trap may not advertise at all.
+    waiter = asyncio.create_task(coordinator.async_wait_for(trap_id, is_ready, None))
+    try:
+        await reset_engine.async_reset(address, keep_alive=False)
+        written_at = monotonic()
+        try:
+            async with asyncio.timeout(timeout):
+                await waiter
+        except TimeoutError as err:
+            reset_engine.forget_characteristic(address)
+            raise RuntimeError(
+                f"Trap {trap_id} did not report ready within {timeout:g} seconds"
+            ) from err
+    finally:
+        waiter.cancel()
+
+    latency = max(0.0, ready_at - written_at)
+    _LOGGER.info(
+        "SWISSINNO BLE: Reset of trap %s confirmed after %.1f s", trap_id, latency
+    )
+    return latency
@@ -0,0 +1,301 @@
+"""Benchmark the SWISSINNO advertisement hot path.
+
+Synthetic electronic, Connect, and legacy advertisements are pushed through
+each stage of the pipeline with stubbed Home Assistant objects:
+
+- ``decode``: ``decode_frame`` with its payload cache
+- ``decode-uncached``: the same payloads without the cache
+- ``battery``: ``BatteryStabilizer.update`` per trap, on pre-decoded frames
+- ``coordinator``: ``TrapObservationCoordinator.update`` with three listeners
+- ``pipeline``: ``AdvertisementDispatcher`` through the entity platforms
+
+Run from the repository root, for example::
+
+    python tests/benchmark_hot_path.py --traps 500 --seconds 60
+
+Each trap advertises once per simulated second. ``--budget-us`` makes the
+command exit with status 1 when a stage's p99 latency exceeds the budget.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import types
+from dataclasses import dataclass
+
+import ha_stubs
+
+ha_stubs.install()
+battery = ha_stubs.load("battery")
+binary_sensor = ha_stubs.load("binary_sensor")
+coordinator_module = ha_stubs.load("coordinator")
+decoder = ha_stubs.load("decoder")
+dispatcher_module = ha_stubs.load("dispatcher")
+sensor = ha_stubs.load("sensor")
+stats_module = ha_stubs.load("stats")
+
+FAMILIES = ("electronic", "connect", "legacy")
+
+
+@dataclass
+class StageResult:
+    """Latency and allocation figures for one benchmark stage."""
+
+    name: str
+    advertisements: int
+    mean_us: float
+    p50_us: float
+    p99_us: float
+    max_us: float
+    allocated_bytes: float
+    peak_kib: float
+
+    def loop_load(self, rate: float) -> float:
+        """Return the share of one event loop consumed at ``rate`` per second."""
+        return self.mean_us * rate / 1_000_000
+
+
+def trap_payload(index: int, family: str, battery_raw: int, tripped: bool) -> bytes:
+    """Return a synthetic manufacturer payload matching ``decode_frame``."""
+    trap_id = (index + 1).to_bytes(4, "big")
+    status = 0x01 if tripped else 0x00
+    if family == "electronic":
+        return (
+            bytes((0x10, 0x00))
+            + trap_id
+            + bytes((0x02,))
+            + battery_raw.to_bytes(2, "little")
+            + bytes((status,))
+        )
+    if family == "connect":
+        return bytes((status, 0x3F)) + trap_id + bytes((0x01, battery_raw, 0x03, 0x00))
+    return bytes((status, 0x00)) + trap_id + bytes((0x00, battery_raw))
+
+
+def synthetic_advertisements(traps: int, seconds: int, seed: int = 0) -> list:
+    """Return one advertisement per trap per simulated second.
+
+    Most advertisements repeat the previous payload; battery values drift
+    occasionally, a few traps trip, and RSSI jitters on every packet.
+    """
+    rng = random.Random(seed)
+    state = []
+    for index in range(traps):
+        family = FAMILIES[index % len(FAMILIES)]
+        battery_raw = 468 if family == "electronic" else 218
+        state.append([family, battery_raw, False, -60 - rng.randrange(30)])
+
+    advertisements = []
+    for _second in range(seconds):
+        for index, trap in enumerate(state):
+            family, battery_raw, tripped, base_rssi = trap
+            if rng.random() < 1 / 300:
+                trap[1] = battery_raw = max(1, battery_raw - 1)
+            if rng.random() < 1 / 3600:
+                trap[2] = tripped = not tripped
+            address = ":".join(f"{byte:02X}" for byte in index.to_bytes(6, "big"))
+            advertisements.append(
+                types.SimpleNamespace(
+                    address=address,
+                    rssi=base_rssi + rng.randint(-3, 3),
+                    connectable=family != "electronic",
+                    source="benchmark",
+                    manufacturer_data={
+                        3003: trap_payload(index, family, battery_raw, tripped)
+                    },
+                )
+            )
+    return advertisements
+
+
+def measure(name: str, advertisements: list, prepare, process) -> StageResult:
+    """Time ``process`` per advertisement, then measure its allocations.
+
+    Allocations are the tracemalloc high-water mark of each call above the
+    memory traced when it started, so short-lived objects count even when
+    they are freed before the call returns.
+    """
+    state = prepare()
+    clock = time.perf_counter_ns
+    samples = []
+    for advertisement in advertisements:
+        start = clock()
+        process(state, advertisement)
+        samples.append(clock() - start)
+
+    state = prepare()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    allocated = 0
+    highest = baseline
+    for advertisement in advertisements:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        process(state, advertisement)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+        highest = max(highest, peak)
+    tracemalloc.stop()
+
+    samples.sort()
+    count = len(samples)
+    return StageResult(
+        name=name,
+        advertisements=count,
+        mean_us=statistics.fmean(samples) / 1000,
+        p50_us=samples[count // 2] / 1000,
+        p99_us=samples[min(count - 1, count * 99 // 100)] / 1000,
+        max_us=samples[-1] / 1000,
+        allocated_bytes=allocated / count,
+        peak_kib=(highest - baseline) / 1024,
+    )
+
+
+def _decode(state, advertisement):
+    decoder.decode_frame(advertisement.manufacturer_data[3003])
+
+
+def _decode_uncached(state, advertisement):
+    decoder._decode_payload(advertisement.manufacturer_data[3003])
+
+
+def _prepare_decode():
+    decoder.clear_decode_cache()
+
+
+def _prepare_battery(advertisements):
+    volts = {}
+    for advertisement in advertisements:
+        payload = advertisement.manufacturer_data[3003]
+        if payload not in volts:
+            volts[payload] = decoder.decode_frame(payload).battery_volts
+    return {}, volts
+
+
+def _battery(state, advertisement):
+    stabilizers, volts = state
+    stabilizer = stabilizers.get(advertisement.address)
+    if stabilizer is None:
+        stabilizer = stabilizers[advertisement.address] = battery.BatteryStabilizer()
+    stabilizer.update(volts[advertisement.manufacturer_data[3003]])
+
+
+def _prepare_coordinator():
+    coordinator = coordinator_module.TrapObservationCoordinator()
+    for _ in range(3):
+        coordinator.register_listener(lambda trap_id, observation: None)
+    return coordinator
+
+
+def _coordinator(coordinator, advertisement):
+    frame = decoder.decode_frame(advertisement.manufacturer_data[3003])
+    coordinator.update(
+        advertisement.address,
+        coordinator_module.TrapObservation(
+            rssi=advertisement.rssi,
+            battery_v=frame.battery_volts,
+            legacy_trap_ids=frame.legacy_trap_ids,
+            tripped=frame.is_tripped,
+        ),
+    )
+
+
+def prepare_pipeline(options=None):
+    """Set up the dispatcher and entity platforms against stubbed objects."""
+    coordinator = coordinator_module.TrapObservationCoordinator()
+    stats = stats_module.HotPathStats()
+    hass = ha_stubs.fake_hass(coordinator=coordinator, stats=stats)
+    entry = ha_stubs.FakeEntry(options)
+    entities = []
+
+    def add_entities(new_entities, update_before_add=False):
+        for entity in new_entities:
+            entity.hass = hass
+        entities.extend(new_entities)
+
+    async def setup():
+        await binary_sensor.async_setup_entry(hass, entry, add_entities)
+        await sensor.async_setup_entry(hass, entry, add_entities)
+
+    asyncio.run(setup())
+    hass.loop.run_ready()
+    dispatcher = dispatcher_module.AdvertisementDispatcher(hass, coordinator, stats)
+    return types.SimpleNamespace(
+        dispatcher=dispatcher,
+        coordinator=coordinator,
+        entities=entities,
+        loop=hass.loop,
+        stats=stats,
+    )
+
+
+def _pipeline(pipeline, advertisement):
+    pipeline.dispatcher.async_process(advertisement, None)
+    pipeline.loop.run_ready()
+
+
+def run(traps: int, seconds: int, seed: int = 0) -> list[StageResult]:
+    """Run every benchmark stage and return the results."""
+    advertisements = synthetic_advertisements(traps, seconds, seed)
+    return [
+        measure("decode", advertisements, _prepare_decode, _decode),
+        measure("decode-uncached", advertisements, _prepare_decode, _decode_uncached),
+        measure(
+            "battery",
+            advertisements,
+            lambda: _prepare_battery(advertisements),
+            _battery,
+        ),
+        measure("coordinator", advertisements, _prepare_coordinator, _coordinator),
+        measure("pipeline", advertisements, prepare_pipeline, _pipeline),
+    ]
+
+
+def format_results(results: list[StageResult], rate: float) -> str:
+    """Return a plain-text results table."""
+    lines = [
+        f"{'stage':<16}{'adverts':>9}{'mean us':>9}{'p50 us':>9}{'p99 us':>9}"
+        f"{'max us':>9}{'loop %':>8}{'alloc B':>9}{'peak KiB':>10}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.name:<16}{result.advertisements:>9}{result.mean_us:>9.2f}"
+            f"{result.p50_us:>9.2f}{result.p99_us:>9.2f}{result.max_us:>9.1f}"
+            f"{result.loop_load(rate) * 100:>8.3f}{result.allocated_bytes:>9.1f}"
+            f"{result.peak_kib:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--traps", type=int, default=500)
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--budget-us",
+        type=float,
+        help="fail when any stage's p99 latency exceeds this many microseconds",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.traps, args.seconds, args.seed)
+    print(
+        f"{args.traps} traps x 1 Hz for {args.seconds} s "
+        f"({args.traps * args.seconds} advertisements)"
+    )
+    print(format_results(results, args.traps))
+    if args.budget_us is not None:
+        slow = [result.name for result in results if result.p99_us > args.budget_us]
+        if slow:
+            print(f"p99 budget of {args.budget_us} us exceeded by: {', '.join(slow)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Minimal Home Assistant stand-ins for offline benchmarks and tools.
+
+The unit tests stub only what each module needs. Benchmarks and load tools
+drive the whole advertisement pipeline, so they share these stubs instead.
+"""
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+COMPONENT_DIR = (
+    Path(__file__).parents[1] / "custom_components" / "swissinno_ble"
+)
+PACKAGE = "custom_components.swissinno_ble"
+
+
+class FakeEntity:
+    """Entity base class that counts state writes instead of performing them."""
+
+    _attr_available = True
+    _attr_native_value = None
+    hass = None
+    writes = 0
+
+    @property
+    def available(self):
+        return self._attr_available
+
+    @property
+    def native_value(self):
+        return self._attr_native_value
+
+    def async_write_ha_state(self):
+        self.writes += 1
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+def install():
+    """Register stub Home Assistant modules in ``sys.modules``."""
+    _module("homeassistant")
+    _module("homeassistant.components")
+    _module(
+        "homeassistant.components.bluetooth",
+        BluetoothScanningMode=types.SimpleNamespace(PASSIVE="passive"),
+        BluetoothServiceInfoBleak=object,
+        async_ble_device_from_address=lambda *args, **kwargs: None,
+        async_last_service_info=lambda *args, **kwargs: None,
+        async_register_callback=lambda *args, **kwargs: lambda: None,
+        async_scanner_devices_by_address=lambda *args, **kwargs: [],
+    )
+    _module("homeassistant.components.binary_sensor", BinarySensorEntity=FakeEntity)
+    _module("homeassistant.components.button", ButtonEntity=FakeEntity)
+    _module(
+        "homeassistant.components.sensor",
+        SensorDeviceClass=types.SimpleNamespace(
+            VOLTAGE="voltage", SIGNAL_STRENGTH="signal_strength"
+        ),
+        SensorEntity=FakeEntity,
+    )
+    _module("homeassistant.config_entries", ConfigEntry=object)
+    _module(
+        "homeassistant.const",
+        SIGNAL_STRENGTH_DECIBELS_MILLIWATT="dBm",
+        UnitOfElectricPotential=types.SimpleNamespace(VOLT="V"),
+    )
+    _module("homeassistant.core", HomeAssistant=object, callback=lambda func: func)
+    helpers = _module("homeassistant.helpers")
+    _module("homeassistant.helpers.entity", DeviceInfo=dict)
+    _module(
+        "homeassistant.helpers.event",
+        async_call_later=lambda *args, **kwargs: lambda: None,
+        async_track_time_interval=lambda *args, **kwargs: lambda: None,
+    )
+    helpers.entity_registry = _module(
+        "homeassistant.helpers.entity_registry",
+        EntityRegistry=object,
+        async_get=lambda hass: hass.entity_registry,
+    )
+    _module(
+        "bleak_retry_connector",
+        BleakClientWithServiceCache=object,
+        establish_connection=None,
+    )
+
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules["custom_components"] = types.ModuleType("custom_components")
+    sys.modules[PACKAGE] = package
+    for name in tuple(sys.modules):
+        if name.startswith(f"{PACKAGE}."):
+            del sys.modules[name]
+
+
+def load(name):
+    """Import one integration module against the installed stubs."""
+    return importlib.import_module(f"{PACKAGE}.{name}")
+
+
+class FakeEntityRegistry:
+    """Entity registry without any legacy entries."""
+
+    def async_get_entity_id(self, platform, domain, unique_id):
+        return None
+
+
+class FakeLoop:
+    """Event loop stand-in that runs ``call_soon`` callbacks on demand."""
+
+    def __init__(self):
+        self.ready = []
+
+    def call_soon(self, func, *args):
+        handle = types.SimpleNamespace(cancelled=False)
+        handle.cancel = lambda: setattr(handle, "cancelled", True)
+        self.ready.append((handle, func, args))
+        return handle
+
+    def call_later(self, delay, func, *args):
+        """Queue ``func`` for the next ``run_ready``, whatever the delay."""
+        return self.call_soon(func, *args)
+
+    def run_ready(self):
+        """Run the callbacks queued so far, like one loop iteration."""
+        ready, self.ready = self.ready, []
+        for handle, func, args in ready:
+            if not handle.cancelled:
+                func(*args)
+
+
+class FakeEntry:
+    """Config entry that collects unload callbacks."""
+
+    def __init__(self, options=None):
+        self.options = options or {}
+        self.unload_callbacks = []
+
+    def async_on_unload(self, func):
+        self.unload_callbacks.append(func)
+
+
+def fake_hass(**data):
+    """Return a minimal ``hass`` object for platform setup."""
+    return types.SimpleNamespace(
+        data={"swissinno_ble": data},
+        entity_registry=FakeEntityRegistry(),
+        loop=FakeLoop(),
+    )
@@ -0,0 +1,162 @@
+"""Replay a SWISSINNO advertisement capture through the integration.
+
+Captures are recorded in Home Assistant with the
+``swissinno_ble.capture_advertisements`` service. Every advertisement is fed
+to the dispatcher callback and through the entity platforms against stubbed
+Home Assistant objects, at the recorded pace, accelerated with ``--speed``,
+or as fast as possible with ``--speed 0``. Run from the repository root::
+
+    python tests/replay_capture.py swissinno_ble_capture_20260101_120000.bin
+
+Without a production capture, write one for the benchmark's synthetic fleet::
+
+    python tests/replay_capture.py fleet.bin --write-synthetic --traps 500
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import benchmark_hot_path
+import ha_stubs
+
+capture = ha_stubs.load("capture")
+
+
+@dataclass
+class ReplayResult:
+    """Throughput and latency figures for one replay."""
+
+    advertisements: int
+    captured_seconds: float
+    wall_seconds: float
+    mean_us: float
+    p50_us: float
+    p99_us: float
+    max_us: float
+    max_lag_ms: float
+    state_writes: int
+    entities: int
+
+    @property
+    def throughput(self) -> float:
+        """Return advertisements processed per wall-clock second."""
+        return self.advertisements / self.wall_seconds if self.wall_seconds else 0.0
+
+
+def replay(
+    advertisements: list,
+    speed: float = 1.0,
+    options=None,
+    clock=time.perf_counter,
+    sleep=time.sleep,
+) -> ReplayResult:
+    """Feed captured advertisements through the pipeline and time each one.
+
+    With a positive ``speed`` each advertisement waits for its recorded time
+    divided by ``speed``; ``max_lag_ms`` reports how far the replay fell
+    behind that schedule.
+    """
+    pipeline = benchmark_hot_path.prepare_pipeline(options)
+    first = advertisements[0].timestamp if advertisements else 0.0
+    samples = []
+    max_lag = 0.0
+    started = clock()
+    for advertisement in advertisements:
+        if speed > 0:
+            wait = started + (advertisement.timestamp - first) / speed - clock()
+            if wait > 0:
+                sleep(wait)
+            else:
+                max_lag = max(max_lag, -wait)
+        start = time.perf_counter_ns()
+        pipeline.dispatcher.async_process(advertisement, None)
+        pipeline.loop.run_ready()
+        samples.append(time.perf_counter_ns() - start)
+    wall_seconds = clock() - started
+
+    samples.sort()
+    count = len(samples)
+    return ReplayResult(
+        advertisements=count,
+        captured_seconds=advertisements[-1].timestamp - first if count else 0.0,
+        wall_seconds=wall_seconds,
+        mean_us=statistics.fmean(samples) / 1000 if count else 0.0,
+        p50_us=samples[count // 2] / 1000 if count else 0.0,
+        p99_us=samples[min(count - 1, count * 99 // 100)] / 1000 if count else 0.0,
+        max_us=samples[-1] / 1000 if count else 0.0,
+        max_lag_ms=max_lag * 1000,
+        state_writes=pipeline.stats.state_writes,
+        entities=len(pipeline.entities),
+    )
+
+
+def write_synthetic_capture(path: Path, traps: int, seconds: int, seed: int = 0):
+    """Write the benchmark's synthetic fleet as a capture file.
+
+    Each trap advertises once per second, spread evenly across the second.
+    """
+    data = bytearray(capture.capture_header())
+    advertisements = benchmark_hot_path.synthetic_advertisements(traps, seconds, seed)
+    for index, advertisement in enumerate(advertisements):
+        data += capture.encode_advertisement(
+            index // traps + (index % traps) / traps,
+            advertisement.address,
+            advertisement.source,
+            advertisement.rssi,
+            advertisement.connectable,
+            advertisement.manufacturer_data[capture.MANUFACTURER_ID],
+        )
+    path.write_bytes(data)
+
+
+def format_result(result: ReplayResult) -> str:
+    """Return a plain-text summary of a replay."""
+    return "\n".join(
+        (
+            f"advertisements  {result.advertisements}",
+            f"captured span   {result.captured_seconds:.1f} s",
+            f"wall time       {result.wall_seconds:.2f} s",
+            f"throughput      {result.throughput:.0f} adv/s",
+            f"latency us      mean {result.mean_us:.2f}  p50 {result.p50_us:.2f}  "
+            f"p99 {result.p99_us:.2f}  max {result.max_us:.1f}",
+            f"max lag         {result.max_lag_ms:.1f} ms",
+            f"entities        {result.entities}",
+            f"state writes    {result.state_writes}",
+        )
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path)
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="replay speed-up over the recorded pace; 0 replays without waiting",
+    )
+    parser.add_argument(
+        "--write-synthetic",
+        action="store_true",
+        help="write a synthetic capture to the path instead of replaying it",
+    )
+    parser.add_argument("--traps", type=int, default=500)
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.write_synthetic:
+        write_synthetic_capture(args.capture, args.traps, args.seconds, args.seed)
+        print(f"Wrote {args.traps * args.seconds} advertisements to {args.capture}")
+        return 0
+
+    print(format_result(replay(capture.read_capture(args.capture), args.speed)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
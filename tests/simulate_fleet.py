@@ -0,0 +1,429 @@
+"""Simulate a fleet of SWISSINNO traps against the integration.
+
+Electronic, Connect, and legacy traps advertise payloads in the layouts read
+by ``decode_frame``. Each trap has its own advertising interval, RSSI noise,
+battery drain, trip events, lost packets, and outages. A stand-in for Home
+Assistant's Bluetooth manager applies the integration's matcher, so other
+Bluetooth devices are filtered out as in production, and like Home Assistant
+it only calls back when a trap's advertisement content changes. Advertisements run on a
+real event loop through the dispatcher and entity platforms; the simulated
+clock runs ``--speed`` times faster than wall time. Run from the repository
+root, for example::
+
+    python tests/simulate_fleet.py --traps 1000 --minutes 30 --speed 20
+
+The report shows how late advertisement callbacks ran (loop lag) and the
+state-write rate of the fleet.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import types
+from dataclasses import dataclass, fields
+from unittest.mock import patch
+
+import benchmark_hot_path
+import ha_stubs
+
+const = ha_stubs.load("const")
+coordinator_module = benchmark_hot_path.coordinator_module
+dispatcher_module = benchmark_hot_path.dispatcher_module
+sensor = benchmark_hot_path.sensor
+
+
+@dataclass
+class FleetConfig:
+    """Fleet size, trap behaviour, and simulation speed."""
+
+    traps: int = 500
+    minutes: float = 10.0
+    interval: float = 1.0
+    interval_spread: float = 0.5
+    rssi_noise: float = 3.0
+    battery_drain: float = 0.01
+    trip_rate: float = 0.05
+    trip_seconds: float = 600.0
+    loss: float = 0.05
+    outage_rate: float = 0.02
+    outage_seconds: float = 1200.0
+    foreign: int = 50
+    processing_tick: int = 0
+    speed: float = 10.0
+    seed: int = 0
+
+
+@dataclass
+class FleetResult:
+    """What the integration did with one simulated fleet."""
+
+    traps: int
+    simulated_seconds: float
+    wall_seconds: float
+    advertisements: int
+    unchanged: int
+    lost: int
+    foreign: int
+    bursts: int
+    coalesced: int
+    trips: int
+    outages: int
+    unavailable: int
+    entities: int
+    state_writes: int
+    lag_mean_ms: float
+    lag_p99_ms: float
+    lag_max_ms: float
+
+    @property
+    def writes_per_second(self) -> float:
+        """Return state writes per simulated second."""
+        return self.state_writes / self.simulated_seconds
+
+    @property
+    def writes_per_trap_hour(self) -> float:
+        """Return state writes per trap and simulated hour."""
+        return self.writes_per_second * 3600 / self.traps
+
+
+class SimulatedClock:
+    """Simulated seconds running ``speed`` times faster than the event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, speed: float) -> None:
+        self._loop = loop
+        self._speed = speed
+        self._start = loop.time()
+
+    def now(self) -> float:
+        """Return simulated seconds since the start."""
+        return (self._loop.time() - self._start) * self._speed
+
+    def loop_time(self, simulated: float) -> float:
+        """Return the event loop time of a simulated instant."""
+        return self._start + simulated / self._speed
+
+
+class SimulatedLoop:
+    """The event loop as seen by the integration, with timers on the clock."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, speed: float) -> None:
+        self._loop = loop
+        self._speed = speed
+        self.call_soon = loop.call_soon
+
+    def call_later(self, delay: float, func, *args) -> asyncio.TimerHandle:
+        return self._loop.call_later(delay / self._speed, func, *args)
+
+
+class SimulatedTrap:
+    """One trap's advertising behaviour."""
+
+    def __init__(self, index: int, config: FleetConfig, rng: random.Random) -> None:
+        self.index = index
+        self.family = benchmark_hot_path.FAMILIES[index % 3]
+        self.address = ":".join(f"{byte:02X}" for byte in index.to_bytes(6, "big"))
+        self.interval = config.interval * rng.uniform(
+            1 - config.interval_spread, 1 + config.interval_spread
+        )
+        self.base_rssi = rng.uniform(-95, -55)
+        self.start_volts = rng.uniform(2.9, 3.1)
+        self.tripped_until: float | None = None
+        self.outage_until = 0.0
+        self.trips = 0
+        self.outages = 0
+        self.lost = 0
+
+    def next_delay(self, rng: random.Random) -> float:
+        """Return the seconds until the next advertisement, with BLE jitter."""
+        return self.interval + rng.uniform(0, 0.01)
+
+    def advertise(self, now: float, config: FleetConfig, rng: random.Random):
+        """Return the advertisement sent at ``now``, or None if none is heard."""
+        share_of_hour = self.interval / 3600
+        if now < self.outage_until:
+            return None
+        if rng.random() < config.outage_rate * share_of_hour:
+            self.outages += 1
+            self.outage_until = now + config.outage_seconds
+            return None
+        if self.tripped_until is not None and now >= self.tripped_until:
+            self.tripped_until = None
+        if self.tripped_until is None and rng.random() < (
+            config.trip_rate * share_of_hour
+        ):
+            self.trips += 1
+            self.tripped_until = now + config.trip_seconds
+        if rng.random() < config.loss:
+            self.lost += 1
+            return None
+
+        volts = self.start_volts - config.battery_drain * now / 86400
+        if self.family == "electronic":
+            battery_raw = round(volts * 156)
+        else:
+            battery_raw = max(1, min(255, round(volts * 255 / 3.6)))
+        payload = benchmark_hot_path.trap_payload(
+            self.index, self.family, battery_raw, self.tripped_until is not None
+        )
+        return types.SimpleNamespace(
+            address=self.address,
+            rssi=round(self.base_rssi + rng.gauss(0, config.rssi_noise)),
+            connectable=self.family != "electronic",
+            source="simulator",
+            manufacturer_data={const.MANUFACTURER_ID: payload},
+            service_uuids=[const.SERVICE_UUID],
+        )
+
+
+class ForeignDevice:
+    """A Bluetooth device from another vendor, advertising once per second."""
+
+    interval = 1.0
+
+    def __init__(self, index: int) -> None:
+        self.address = "F0:" + ":".join(
+            f"{byte:02X}" for byte in index.to_bytes(5, "big")
+        )
+
+    def next_delay(self, rng: random.Random) -> float:
+        return self.interval + rng.uniform(0, 0.01)
+
+    def advertise(self, now: float, config: FleetConfig, rng: random.Random):
+        return types.SimpleNamespace(
+            address=self.address,
+            rssi=-80,
+            connectable=True,
+            source="simulator",
+            manufacturer_data={76: b"\x02\x15"},
+            service_uuids=[],
+        )
+
+
+class FakeBluetoothManager:
+    """Deliver advertisements to the callbacks whose matcher accepts them."""
+
+    def __init__(self, now=time.monotonic) -> None:
+        self._now = now
+        self._callbacks = []
+        self._history = {}
+        self.delivered = 0
+        self.filtered = 0
+        self.unchanged = 0
+
+    def async_register_callback(self, hass, callback, matcher, mode):
+        registration = (callback, matcher)
+        self._callbacks.append(registration)
+        return lambda: self._callbacks.remove(registration)
+
+    def async_last_service_info(self, hass, address, connectable):
+        """Return the latest advertisement of an address, forwarded or not."""
+        return self._history.get(address)
+
+    def async_deliver(self, service_info) -> None:
+        """Pass an advertisement to every matching callback.
+
+        An advertisement whose content equals the previous one from the same
+        address is only remembered, as Home Assistant ignores RSSI changes.
+        """
+        service_info.time = self._now()
+        previous = self._history.get(service_info.address)
+        self._history[service_info.address] = service_info
+        matching = [
+            callback
+            for callback, matcher in self._callbacks
+            if _matches(matcher, service_info)
+        ]
+        if not matching:
+            self.filtered += 1
+        elif previous is not None and _same_content(previous, service_info):
+            self.unchanged += 1
+        else:
+            self.delivered += 1
+            for callback in matching:
+                callback(service_info, None)
+
+
+def _same_content(previous, service_info) -> bool:
+    return (
+        previous.manufacturer_data == service_info.manufacturer_data
+        and previous.service_uuids == service_info.service_uuids
+        and previous.connectable == service_info.connectable
+    )
+
+
+def _matches(matcher: dict, service_info) -> bool:
+    if (
+        manufacturer_id := matcher.get("manufacturer_id")
+    ) is not None and manufacturer_id not in service_info.manufacturer_data:
+        return False
+    if (
+        service_uuid := matcher.get("service_uuid")
+    ) is not None and service_uuid not in service_info.service_uuids:
+        return False
+    return not matcher.get("connectable") or service_info.connectable
+
+
+async def _simulate(config: FleetConfig) -> FleetResult:
+    loop = asyncio.get_running_loop()
+    clock = SimulatedClock(loop, config.speed)
+    rng = random.Random(config.seed)
+    duration = config.minutes * 60
+    manager = FakeBluetoothManager(clock.now)
+
+    def track_time_interval(hass, action, interval):
+        handle = None
+
+        def tick():
+            nonlocal handle
+            action(None)
+            handle = loop.call_later(interval.total_seconds() / config.speed, tick)
+
+        handle = loop.call_later(interval.total_seconds() / config.speed, tick)
+        return lambda: handle.cancel()
+
+    with (
+        patch.object(coordinator_module, "monotonic", clock.now),
+        patch.object(dispatcher_module, "monotonic", clock.now),
+        patch.object(sensor, "monotonic", clock.now),
+        patch.object(
+            dispatcher_module, "async_track_time_interval", track_time_interval
+        ),
+        patch.object(
+            dispatcher_module,
+            "async_last_service_info",
+            manager.async_last_service_info,
+        ),
+    ):
+        coordinator = coordinator_module.TrapObservationCoordinator()
+        stats = benchmark_hot_path.stats_module.HotPathStats()
+        hass = ha_stubs.fake_hass(coordinator=coordinator, stats=stats)
+        hass.loop = SimulatedLoop(loop, config.speed)
+        entry = ha_stubs.FakeEntry()
+        entities = []
+
+        def add_entities(new_entities, update_before_add=False):
+            for entity in new_entities:
+                entity.hass = hass
+            entities.extend(new_entities)
+
+        await benchmark_hot_path.binary_sensor.async_setup_entry(
+            hass, entry, add_entities
+        )
+        await sensor.async_setup_entry(hass, entry, add_entities)
+
+        unavailable = 0
+
+        def count_unavailable(trap_id, observation, changed):
+            nonlocal unavailable
+            if not observation.available:
+                unavailable += 1
+
+        coordinator.register_change_listener(
+            count_unavailable, coordinator_module.CHANGED_AVAILABLE
+        )
+
+        dispatcher = dispatcher_module.AdvertisementDispatcher(
+            hass, coordinator, stats, config.processing_tick
+        )
+        manager.async_register_callback(
+            hass, dispatcher.async_process, const.ADVERTISEMENT_MATCHER, "passive"
+        )
+        dispatcher.async_start()
+
+        traps = [SimulatedTrap(index, config, rng) for index in range(config.traps)]
+        devices = traps + [ForeignDevice(index) for index in range(config.foreign)]
+        lags = []
+        done = loop.create_future()
+        running = len(devices)
+
+        def fire(device, due: float) -> None:
+            nonlocal running
+            lags.append(loop.time() - clock.loop_time(due))
+            if due >= duration:
+                running -= 1
+                if not running:
+                    done.set_result(None)
+                return
+            if (service_info := device.advertise(due, config, rng)) is not None:
+                manager.async_deliver(service_info)
+            next_due = due + device.next_delay(rng)
+            loop.call_at(clock.loop_time(next_due), fire, device, next_due)
+
+        for device in devices:
+            first = rng.uniform(0, device.interval)
+            loop.call_at(clock.loop_time(first), fire, device, first)
+
+        started = loop.time()
+        await done
+        wall_seconds = loop.time() - started
+        dispatcher.async_stop()
+
+    lags.sort()
+    return FleetResult(
+        traps=config.traps,
+        simulated_seconds=duration,
+        wall_seconds=wall_seconds,
+        advertisements=stats.advertisements,
+        unchanged=manager.unchanged,
+        lost=sum(trap.lost for trap in traps),
+        foreign=manager.filtered,
+        bursts=stats.bursts,
+        coalesced=stats.coalesced,
+        trips=sum(trap.trips for trap in traps),
+        outages=sum(trap.outages for trap in traps),
+        unavailable=unavailable,
+        entities=len(entities),
+        state_writes=stats.state_writes,
+        lag_mean_ms=statistics.fmean(lags) * 1000,
+        lag_p99_ms=lags[min(len(lags) - 1, len(lags) * 99 // 100)] * 1000,
+        lag_max_ms=lags[-1] * 1000,
+    )
+
+
+def run(config: FleetConfig) -> FleetResult:
+    """Simulate ``config`` on a fresh event loop."""
+    return asyncio.run(_simulate(config))
+
+
+def format_result(result: FleetResult) -> str:
+    """Return a plain-text report of a simulation."""
+    return "\n".join(
+        (
+            f"traps           {result.traps}",
+            f"simulated       {result.simulated_seconds:.0f} s "
+            f"in {result.wall_seconds:.1f} s wall",
+            f"advertisements  {result.advertisements} delivered, "
+            f"{result.unchanged} unchanged, {result.lost} lost, "
+            f"{result.foreign} foreign filtered",
+            f"bursts          {result.bursts}, "
+            f"{result.coalesced} advertisements coalesced",
+            f"events          {result.trips} trips, {result.outages} outages, "
+            f"{result.unavailable} unavailable",
+            f"entities        {result.entities}",
+            f"state writes    {result.state_writes} "
+            f"({result.writes_per_second:.2f}/s, "
+            f"{result.writes_per_trap_hour:.1f} per trap-hour)",
+            f"loop lag ms     mean {result.lag_mean_ms:.2f}  "
+            f"p99 {result.lag_p99_ms:.2f}  max {result.lag_max_ms:.1f}",
+        )
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for config_field in fields(FleetConfig):
+        parser.add_argument(
+            f"--{config_field.name.replace('_', '-')}",
+            type=type(config_field.default),
+            default=config_field.default,
+        )
+    args = parser.parse_args(argv)
+    print(format_result(run(FleetConfig(**vars(args)))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,6 +32,16 @@ class BatteryStabilizerTests(unittest.TestCase):
         self.assertIsNone(stabilizer.update(2.96))
         self.assertEqual(stabilizer.update(2.96), 2.96)
 
+    def test_confirmed_after_matching_readings(self):
+        stabilizer = battery.BatteryStabilizer()
+        self.assertFalse(stabilizer.confirmed)
+        stabilizer.update(2.96)
+        self.assertFalse(stabilizer.confirmed)
+        stabilizer.update(2.96)
+        self.assertTrue(stabilizer.confirmed)
+        stabilizer.update(1.64)
+        self.assertFalse(stabilizer.confirmed)
+
     def test_zero_and_non_finite_values_are_ignored(self):
         stabilizer = battery.BatteryStabilizer()
         self.assertIsNone(stabilizer.update(2.96))
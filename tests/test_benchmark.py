@@ -0,0 +1,43 @@
+"""Smoke tests for the hot-path benchmark."""
+
+import unittest
+
+import benchmark_hot_path
+
+
+class HotPathBenchmarkTests(unittest.TestCase):
+    def test_synthetic_payloads_decode_as_their_family(self):
+        advertisements = benchmark_hot_path.synthetic_advertisements(3, 1)
+        families = [
+            benchmark_hot_path.decoder.decode_frame(
+                advertisement.manufacturer_data[3003]
+            ).family
+            for advertisement in advertisements
+        ]
+        self.assertEqual(families, ["electronic", "connect", "legacy"])
+
+    def test_reports_every_stage(self):
+        results = benchmark_hot_path.run(traps=6, seconds=3)
+        self.assertEqual(
+            [result.name for result in results],
+            ["decode", "decode-uncached", "battery", "coordinator", "pipeline"],
+        )
+        for result in results:
+            self.assertEqual(result.advertisements, 18)
+            self.assertGreater(result.mean_us, 0)
+            self.assertLessEqual(result.p50_us, result.max_us)
+        uncached = results[1]
+        self.assertGreater(uncached.allocated_bytes, 0)
+        self.assertIn("pipeline", benchmark_hot_path.format_results(results, 6))
+
+    def test_pipeline_creates_entities_for_each_trap(self):
+        pipeline = benchmark_hot_path.prepare_pipeline()
+        for advertisement in benchmark_hot_path.synthetic_advertisements(3, 2):
+            pipeline.dispatcher.async_process(advertisement, None)
+        pipeline.loop.run_ready()
+        # Status and RSSI for every trap, plus battery once two samples agree.
+        self.assertEqual(len(pipeline.entities), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
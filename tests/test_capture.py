@@ -0,0 +1,158 @@
+"""Tests for advertisement capture files and their replay."""
+
+import asyncio
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+import benchmark_hot_path
+import replay_capture
+
+capture = replay_capture.capture
+
+CONNECT_READY = bytes.fromhex("00 3F CE 03 04 00 01 DA 03 00")
+
+
+def executor_hass():
+    """Return a ``hass`` stand-in that runs executor jobs in a thread."""
+
+    async def add_executor_job(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    return types.SimpleNamespace(
+        async_add_executor_job=add_executor_job,
+        async_create_background_task=lambda coro, name: asyncio.ensure_future(coro),
+    )
+
+
+def service_info(payload=CONNECT_READY, **changes):
+    values = {
+        "address": "C8:AE:DC:73:80:48",
+        "source": "AA:BB:CC:DD:EE:FF",
+        "rssi": -67,
+        "connectable": True,
+        "manufacturer_data": {3003: payload},
+    }
+    values.update(changes)
+    return types.SimpleNamespace(**values)
+
+
+class CaptureFormatTests(unittest.TestCase):
+    def test_round_trips_records(self):
+        data = (
+            capture.capture_header()
+            + capture.encode_advertisement(
+                1.5, "C8:AE:DC:73:80:48", "hci0", -67, True, CONNECT_READY
+            )
+            + capture.encode_advertisement(
+                2.25, "2B4C-UUID", "proxy", None, False, None
+            )
+        )
+        first, second = capture.iter_capture(data)
+
+        self.assertEqual(first.timestamp, 1.5)
+        self.assertEqual(first.address, "C8:AE:DC:73:80:48")
+        self.assertEqual(first.source, "hci0")
+        self.assertEqual(first.rssi, -67)
+        self.assertTrue(first.connectable)
+        self.assertEqual(first.manufacturer_data, {3003: CONNECT_READY})
+        self.assertEqual(second.address, "2B4C-UUID")
+        self.assertIsNone(second.rssi)
+        self.assertFalse(second.connectable)
+        self.assertEqual(second.manufacturer_data, {})
+
+    def test_records_are_compact(self):
+        record = capture.encode_advertisement(
+            0.0, "C8:AE:DC:73:80:48", "hci0", -67, True, CONNECT_READY
+        )
+        self.assertEqual(len(record), 13 + 6 + 4 + len(CONNECT_READY))
+
+    def test_truncated_record_ends_the_capture(self):
+        record = capture.encode_advertisement(
+            0.0, "C8:AE:DC:73:80:48", "hci0", -67, True, CONNECT_READY
+        )
+        data = capture.capture_header() + record + record[:-3]
+        self.assertEqual(len(list(capture.iter_capture(data))), 1)
+
+    def test_foreign_file_is_rejected(self):
+        with self.assertRaises(ValueError):
+            list(capture.iter_capture(b"not a capture"))
+
+
+class AdvertisementRecorderTests(unittest.TestCase):
+    def test_dispatcher_records_matched_advertisements(self):
+        pipeline = benchmark_hot_path.prepare_pipeline()
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "capture.bin"
+            recorder = capture.AdvertisementRecorder(executor_hass(), path)
+            pipeline.dispatcher.async_start_capture(recorder, 60)
+            self.assertTrue(pipeline.dispatcher.capturing)
+            with self.assertRaises(RuntimeError):
+                pipeline.dispatcher.async_start_capture(recorder, 60)
+
+            pipeline.dispatcher.async_process(service_info(), None)
+            pipeline.dispatcher.async_process(
+                service_info(manufacturer_data={76: b"\x01"}), None
+            )
+            self.assertIs(
+                asyncio.run(pipeline.dispatcher.async_stop_capture()), recorder
+            )
+            pipeline.dispatcher.async_process(service_info(), None)
+
+            self.assertFalse(pipeline.dispatcher.capturing)
+            records = capture.read_capture(path)
+        self.assertEqual(recorder.count, 2)
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0].manufacturer_data, {3003: CONNECT_READY})
+        self.assertEqual(records[1].manufacturer_data, {})
+
+    def test_large_buffers_are_appended_in_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "capture.bin"
+
+            async def run():
+                recorder = capture.AdvertisementRecorder(executor_hass(), path)
+                for rssi in range(-100, 0):
+                    for _ in range(100):
+                        recorder.record(service_info(rssi=rssi))
+                    await asyncio.sleep(0)
+                await recorder.async_flush()
+                return recorder
+
+            recorder = asyncio.run(run())
+            records = capture.read_capture(path)
+            self.assertGreater(path.stat().st_size, capture.FLUSH_SIZE)
+        self.assertEqual(len(records), recorder.count)
+        self.assertEqual(
+            [record.rssi for record in records[::100]], list(range(-100, 0))
+        )
+
+
+class ReplayTests(unittest.TestCase):
+    def test_replays_synthetic_capture(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "fleet.bin"
+            replay_capture.write_synthetic_capture(path, traps=6, seconds=3)
+            advertisements = capture.read_capture(path)
+
+        waits = []
+        now = [0.0]
+
+        def sleep(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+
+        result = replay_capture.replay(
+            advertisements, speed=2.0, clock=lambda: now[0], sleep=sleep
+        )
+        self.assertEqual(result.advertisements, 18)
+        self.assertAlmostEqual(result.captured_seconds, 17 / 6)
+        self.assertAlmostEqual(sum(waits), 17 / 12)
+        # Status and RSSI for every trap, plus battery once two samples agree.
+        self.assertEqual(result.entities, 18)
+        self.assertIn("throughput", replay_capture.format_result(result))
+
+
+if __name__ == "__main__":
+    unittest.main()
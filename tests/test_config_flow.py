@@ -40,14 +40,42 @@ class FakeConfigFlow:
         return {"type": "form", **kwargs}
 
 
+class FakeOptionsFlow:
+    def async_create_entry(self, *, title, data):
+        return {"type": "create_entry", "title": title, "data": data}
+
+    def async_show_form(self, **kwargs):
+        return {"type": "form", **kwargs}
+
+
+class FakeRequired(str):
+    def __new__(cls, key, default=None):
+        marker = super().__new__(cls, key)
+        marker.default = default
+        return marker
+
+
 def load_config_flow():
     voluptuous = types.ModuleType("voluptuous")
-    voluptuous.Required = lambda key, default=None: key
+    voluptuous.Required = FakeRequired
     voluptuous.Schema = lambda schema: schema
+    voluptuous.All = lambda *validators: validators
+    voluptuous.Coerce = lambda type_: type_
+    voluptuous.Range = lambda **kwargs: kwargs
 
     config_entries = types.ModuleType("homeassistant.config_entries")
+    config_entries.ConfigEntry = object
     config_entries.ConfigFlow = FakeConfigFlow
     config_entries.ConfigFlowResult = dict
+    config_entries.OptionsFlow = FakeOptionsFlow
+
+    core = types.ModuleType("homeassistant.core")
+    core.callback = lambda func: func
+
+    selector = types.ModuleType("homeassistant.helpers.selector")
+    selector.SelectSelector = lambda config: config
+    selector.SelectSelectorConfig = lambda **kwargs: kwargs
+    selector.SelectSelectorMode = types.SimpleNamespace(DROPDOWN="dropdown")
 
     bluetooth = types.ModuleType("homeassistant.components.bluetooth")
     bluetooth.BluetoothServiceInfoBleak = object
@@ -63,9 +91,11 @@ def load_config_flow():
         "homeassistant.components"
     )
     sys.modules["homeassistant.components.bluetooth"] = bluetooth
+    sys.modules["homeassistant.core"] = core
     sys.modules["homeassistant.helpers"] = types.ModuleType("homeassistant.helpers")
     sys.modules["homeassistant.helpers"].config_validation = cv
     sys.modules["homeassistant.helpers.config_validation"] = cv
+    sys.modules["homeassistant.helpers.selector"] = selector
 
     package = types.ModuleType("custom_components.swissinno_ble")
     package.__path__ = [str(COMPONENT_DIR)]
@@ -115,6 +145,39 @@ class ConfigFlowTests(unittest.TestCase):
         result = asyncio.run(flow.async_step_user())
         self.assertEqual(result, {"type": "abort", "reason": "already_configured"})
 
+    def test_options_form_defaults_to_current_rssi_reporting(self):
+        entry = types.SimpleNamespace(options={"rssi_deadband": 5})
+        flow = config_flow.SwissinnoBLEConfigFlow.async_get_options_flow(entry)
+        result = asyncio.run(flow.async_step_init())
+        self.assertEqual(result["type"], "form")
+        self.assertEqual(result["step_id"], "init")
+        defaults = {key: key.default for key in result["data_schema"]}
+        self.assertEqual(
+            defaults,
+            {
+                "rssi_deadband": 5,
+                "rssi_min_interval": 60,
+                "rssi_smoothing": "none",
+                "reset_confirm_timeout": 30,
+                "processing_tick": 0,
+            },
+        )
+        smoothing = result["data_schema"]["rssi_smoothing"]
+        self.assertEqual(smoothing["options"], ["none", "ema", "median"])
+        self.assertEqual(smoothing["translation_key"], "rssi_smoothing")
+
+    def test_options_are_stored(self):
+        entry = types.SimpleNamespace(options={})
+        flow = config_flow.SwissinnoBLEConfigFlow.async_get_options_flow(entry)
+        options = {
+            "rssi_deadband": 4,
+            "rssi_min_interval": 120,
+            "rssi_smoothing": "ema",
+        }
+        result = asyncio.run(flow.async_step_init(options))
+        self.assertEqual(result["type"], "create_entry")
+        self.assertEqual(result["data"], options)
+
 
 if __name__ == "__main__":
     unittest.main()
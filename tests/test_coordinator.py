@@ -1,9 +1,15 @@
 """Tests for cross-platform trap observation replay."""
 
+import asyncio
+import dataclasses
 import importlib.util
 import sys
+import time
+import tracemalloc
+import types
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 COORDINATOR_PATH = (
     Path(__file__).parents[1]
@@ -28,6 +34,55 @@ sys.modules[battery_spec.name] = battery
 battery_spec.loader.exec_module(battery)
 
 
+def allocated_bytes(factory, count=1000):
+    """Return the memory still held by ``count`` objects from ``factory``."""
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        objects = [factory(index) for index in range(count)]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del objects
+    return after - before
+
+
+class TrapObservationMemoryTests(unittest.TestCase):
+    def test_observation_is_slotted(self):
+        observation = coordinator.TrapObservation(
+            rssi=-61, battery_v=3.08, legacy_trap_ids=("5E100300",)
+        )
+        self.assertFalse(hasattr(observation, "__dict__"))
+        self.assertFalse(hasattr(battery.BatteryStabilizer(), "__dict__"))
+
+    def test_slotted_observations_use_less_memory_than_dict_backed(self):
+        dict_backed = dataclasses.make_dataclass(
+            "DictObservation",
+            [
+                (field.name, field.type, dataclasses.field(default=field.default))
+                for field in dataclasses.fields(coordinator.TrapObservation)
+            ],
+            frozen=True,
+        )
+        legacy_trap_ids = ("5E100300",)
+
+        def slotted(index):
+            return coordinator.TrapObservation(
+                rssi=-index, battery_v=3.08, legacy_trap_ids=legacy_trap_ids
+            )
+
+        def unslotted(index):
+            return dict_backed(
+                rssi=-index, battery_v=3.08, legacy_trap_ids=legacy_trap_ids
+            )
+
+        slotted_bytes = allocated_bytes(slotted)
+        unslotted_bytes = allocated_bytes(unslotted)
+        # CPython 3.11+ shares dict keys between instances, so the saving is
+        # smaller than on older versions: about 145 versus 195 bytes each.
+        self.assertLess(slotted_bytes, unslotted_bytes * 0.9)
+
+
 class TrapObservationCoordinatorTests(unittest.TestCase):
     def test_replays_observation_to_late_listener(self):
         store = coordinator.TrapObservationCoordinator()
@@ -101,6 +156,296 @@ class TrapObservationCoordinatorTests(unittest.TestCase):
         store.update("cbbaeb6357fb", observation)
         self.assertEqual(published, [3.08])
 
+    def test_trap_listener_only_receives_its_trap(self):
+        store = coordinator.TrapObservationCoordinator()
+        observation = coordinator.TrapObservation(
+            rssi=-61, battery_v=3.08, legacy_trap_ids=()
+        )
+        store.update("cbbaeb6357fb", observation)
+        store.update("c8aedc738048", observation)
+
+        received = []
+        remove = store.register_trap_listener(
+            "cbbaeb6357fb", lambda trap_id, value: received.append(trap_id)
+        )
+        store.register_trap_listener(
+            "cbbaeb6357fb",
+            lambda trap_id, value: received.append("late"),
+            replay=False,
+        )
+        self.assertEqual(received, ["cbbaeb6357fb"])
+
+        store.update("c8aedc738048", observation)
+        store.update("cbbaeb6357fb", observation)
+        self.assertEqual(received, ["cbbaeb6357fb", "cbbaeb6357fb", "late"])
+
+        remove()
+        store.update("cbbaeb6357fb", observation)
+        self.assertEqual(received[-1], "late")
+        self.assertEqual(len(received), 4)
+
+    def test_listener_can_unsubscribe_during_fan_out(self):
+        store = coordinator.TrapObservationCoordinator()
+        received = []
+        removers = []
+
+        def first(trap_id, value):
+            received.append("first")
+            for remove in removers:
+                remove()
+
+        removers.append(store.register_listener(first))
+        removers.append(
+            store.register_listener(lambda trap_id, value: received.append("second"))
+        )
+        listeners = store._listeners
+        observation = coordinator.TrapObservation(
+            rssi=-61, battery_v=3.08, legacy_trap_ids=()
+        )
+
+        store.update("cbbaeb6357fb", observation)
+        self.assertEqual(received, ["first", "second"])
+        self.assertIsNot(store._listeners, listeners)
+        self.assertEqual(store._listeners, ())
+
+        store.update("cbbaeb6357fb", observation)
+        self.assertEqual(received, ["first", "second"])
+
+    def test_update_does_not_copy_listeners(self):
+        store = coordinator.TrapObservationCoordinator()
+        store.register_listener(lambda trap_id, value: None)
+        listeners = store._listeners
+        observation = coordinator.TrapObservation(
+            rssi=-61, battery_v=3.08, legacy_trap_ids=()
+        )
+
+        with patch.object(coordinator, "tuple", create=True) as copy:
+            store.update("cbbaeb6357fb", observation)
+        copy.assert_not_called()
+        self.assertIs(store._listeners, listeners)
+
+
+class ChangeNotificationTests(unittest.TestCase):
+    def observation(self, **changes):
+        values = {"rssi": -61, "battery_v": 3.08, "legacy_trap_ids": ()}
+        values.update(changes)
+        return coordinator.TrapObservation(**values)
+
+    def test_reports_changed_fields(self):
+        store = coordinator.TrapObservationCoordinator()
+        received = []
+        store.register_change_listener(
+            lambda trap_id, value, changed: received.append(changed),
+            coordinator.CHANGED_ALL | coordinator.UNCHANGED,
+        )
+
+        store.update("cbbaeb6357fb", self.observation(tripped=False))
+        store.update("cbbaeb6357fb", self.observation(tripped=False))
+        store.update("cbbaeb6357fb", self.observation(rssi=-70, tripped=False))
+        store.update(
+            "cbbaeb6357fb", self.observation(rssi=-70, battery_v=3.0, tripped=True)
+        )
+        store.set_unavailable("cbbaeb6357fb")
+
+        self.assertEqual(
+            received,
+            [
+                coordinator.CHANGED_ALL,
+                coordinator.UNCHANGED,
+                coordinator.CHANGED_RSSI,
+                coordinator.CHANGED_BATTERY | coordinator.CHANGED_TRIPPED,
+                coordinator.CHANGED_AVAILABLE,
+            ],
+        )
+
+    def test_skips_listeners_whose_fields_did_not_change(self):
+        store = coordinator.TrapObservationCoordinator()
+        store.update("cbbaeb6357fb", self.observation(tripped=False))
+        received = []
+        remove = store.register_change_listener(
+            lambda trap_id, value, changed: received.append((trap_id, changed)),
+            coordinator.CHANGED_TRIPPED | coordinator.CHANGED_AVAILABLE,
+        )
+        self.assertEqual(received, [("cbbaeb6357fb", coordinator.CHANGED_ALL)])
+
+        store.update("cbbaeb6357fb", self.observation(tripped=False))
+        store.update("cbbaeb6357fb", self.observation(rssi=-80, tripped=False))
+        store.update("cbbaeb6357fb", self.observation(rssi=-80, tripped=True))
+        self.assertEqual(
+            received[1:], [("cbbaeb6357fb", coordinator.CHANGED_TRIPPED)]
+        )
+
+        remove()
+        self.assertEqual(store._change_listeners, ())
+
+
+class SourceRSSITests(unittest.TestCase):
+    def test_ranks_recent_connectable_sources_by_rssi(self):
+        store = coordinator.TrapObservationCoordinator()
+        store.add_identity(
+            types.SimpleNamespace(address="CB:BA:EB:63:57:FB", trap_id="cbbaeb6357fb")
+        )
+        for source, rssi, connectable in (
+            ("kitchen", -80, True),
+            ("garage", -60, True),
+            ("passive", -40, False),
+            ("garage", -85, True),
+            ("attic", -70, True),
+        ):
+            store.update(
+                "cbbaeb6357fb",
+                coordinator.TrapObservation(
+                    rssi=rssi,
+                    battery_v=3.08,
+                    legacy_trap_ids=(),
+                    connectable=connectable,
+                    source=source,
+                ),
+            )
+        self.assertEqual(
+            store.connectable_sources("CB:BA:EB:63:57:FB"),
+            ["attic", "kitchen", "garage"],
+        )
+        self.assertEqual(store.connectable_sources("00:00:00:00:00:00"), [])
+
+        later = time.monotonic() + coordinator.SOURCE_RSSI_MAX_AGE + 1
+        with patch.object(coordinator, "monotonic", return_value=later):
+            self.assertEqual(store.connectable_sources("CB:BA:EB:63:57:FB"), [])
+
+
+class AdaptiveAvailabilityTests(unittest.TestCase):
+    def advertise(self, store, trap_id, times):
+        for now in times:
+            with patch.object(coordinator, "monotonic", return_value=now):
+                store.update(
+                    trap_id,
+                    coordinator.TrapObservation(
+                        rssi=-61, battery_v=3.08, legacy_trap_ids=()
+                    ),
+                )
+
+    def expire(self, store, now, last_seen=None):
+        with patch.object(coordinator, "monotonic", return_value=now):
+            return store.expire_overdue(last_seen)
+
+    def test_learns_interval_per_trap(self):
+        store = coordinator.TrapObservationCoordinator()
+        self.advertise(store, "fast", [1000.0 + second for second in range(20)])
+        self.advertise(store, "slow", [1000.0 + 120 * step for step in range(6)])
+
+        availability = store.availability()
+        self.assertEqual(availability["fast"]["interval"], 1.0)
+        self.assertEqual(availability["fast"]["timeout"], 30.0)
+        self.assertEqual(availability["slow"]["interval"], 120.0)
+        self.assertGreater(availability["slow"]["timeout"], 600.0)
+
+        self.assertEqual(self.expire(store, 1019.0 + 29), [])
+        self.assertEqual(self.expire(store, 1019.0 + 31), ["fast"])
+        self.assertEqual(self.expire(store, 1600.0 + 599), [])
+        self.assertEqual(self.expire(store, 1600.0 + 901), ["slow"])
+        self.assertFalse(dict(store.observations())["fast"].available)
+
+    def test_uses_fallback_timeout_until_interval_is_learned(self):
+        store = coordinator.TrapObservationCoordinator()
+        self.advertise(store, "new", [1000.0, 1001.0])
+
+        self.assertEqual(store.availability()["new"]["timeout"], 900.0)
+        self.assertEqual(self.expire(store, 1500.0), [])
+        self.assertEqual(self.expire(store, 1902.0), ["new"])
+
+    def test_ignores_relayed_duplicates_and_outages(self):
+        store = coordinator.TrapObservationCoordinator()
+        self.advertise(store, "trap", [1000.0, 1000.05, 1010.0, 1010.02, 1020.0])
+        self.advertise(store, "trap", [1030.0, 1040.0])
+        self.assertEqual(store.availability()["trap"]["interval"], 10.0)
+
+        self.assertEqual(self.expire(store, 1200.0), ["trap"])
+        self.advertise(store, "trap", [5000.0, 5010.0])
+        self.assertEqual(store.availability()["trap"]["interval"], 10.0)
+        self.assertTrue(dict(store.observations())["trap"].available)
+
+    def test_counts_advertisements_home_assistant_did_not_forward(self):
+        store = coordinator.TrapObservationCoordinator()
+        address = "CB:BA:EB:63:57:FB"
+        store.add_identity(types.SimpleNamespace(address=address, trap_id="trap"))
+        self.advertise(store, "trap", [1000.0 + second for second in range(5)])
+        heard = {address: 1100.0}
+
+        self.assertEqual(self.expire(store, 1101.0, heard.get), [])
+        self.assertEqual(self.expire(store, 1140.0, heard.get), ["trap"])
+        # Back with the same advertisement, which Home Assistant does not forward.
+        heard[address] = 1200.0
+        self.assertEqual(self.expire(store, 1201.0, heard.get), [])
+        self.assertTrue(dict(store.observations())["trap"].available)
+
+    def test_restored_trap_expires_on_its_original_schedule(self):
+        store = coordinator.TrapObservationCoordinator()
+        identity = types.SimpleNamespace(address="CB:BA:EB:63:57:FB", trap_id="trap")
+        with patch.object(coordinator, "monotonic", return_value=1000.0):
+            store.restore(
+                identity,
+                coordinator.TrapObservation(
+                    rssi=-61,
+                    battery_v=3.08,
+                    legacy_trap_ids=(),
+                    last_seen=time.time() - 600,
+                    restored=True,
+                ),
+            )
+
+        self.assertEqual(self.expire(store, 1299.0), [])
+        self.assertEqual(self.expire(store, 1301.0), ["trap"])
+
+    def test_restart_gap_is_not_an_interval(self):
+        store = coordinator.TrapObservationCoordinator()
+        identity = types.SimpleNamespace(address="CB:BA:EB:63:57:FB", trap_id="trap")
+        with patch.object(coordinator, "monotonic", return_value=1000.0):
+            store.restore(
+                identity,
+                coordinator.TrapObservation(
+                    rssi=-61,
+                    battery_v=3.08,
+                    legacy_trap_ids=(),
+                    last_seen=time.time() - 600,
+                    restored=True,
+                ),
+            )
+        self.advertise(store, "trap", [1000.0, 1001.0, 1002.0, 1003.0])
+        self.assertEqual(store.availability()["trap"]["interval"], 1.0)
+
+
+class WaitForObservationTests(unittest.TestCase):
+    def observation(self, tripped):
+        return coordinator.TrapObservation(
+            rssi=-61, battery_v=3.08, legacy_trap_ids=(), tripped=tripped
+        )
+
+    def test_waits_for_a_later_matching_observation(self):
+        store = coordinator.TrapObservationCoordinator()
+        store.update("cbbaeb6357fb", self.observation(False))
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            loop.call_soon(store.update, "cbbaeb6357fb", self.observation(True))
+            loop.call_soon(store.update, "other", self.observation(False))
+            loop.call_later(0.01, store.update, "cbbaeb6357fb", self.observation(False))
+            return await store.async_wait_for(
+                "cbbaeb6357fb", lambda value: value.tripped is False, 1
+            )
+
+        self.assertFalse(asyncio.run(run()).tripped)
+        self.assertEqual(store._trap_listeners, {})
+
+    def test_times_out_and_unsubscribes(self):
+        store = coordinator.TrapObservationCoordinator()
+
+        async def run():
+            await store.async_wait_for("cbbaeb6357fb", lambda value: True, 0.01)
+
+        with self.assertRaises(TimeoutError):
+            asyncio.run(run())
+        self.assertEqual(store._trap_listeners, {})
+
 
 if __name__ == "__main__":
     unittest.main()
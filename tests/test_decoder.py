@@ -1,6 +1,7 @@
 """Tests for SWISSINNO advertisement decoding and identity."""
 
 import importlib.util
+import random
 import sys
 import unittest
 from pathlib import Path
@@ -112,6 +113,21 @@ class DecoderTests(unittest.TestCase):
         payload = bytes.fromhex("00 3F CE 03 04 00 01 DA 03 00")
         self.assertTrue(decoder.supports_remote_reset(payload))
 
+    def test_frame_reports_family_and_reset_capability(self):
+        for payload_hex, family, supports_reset in (
+            ("40 00 68 07 07 00 02 D4 01 01", "electronic", False),
+            ("00 3F CE 03 04 00 01 DA 03 00", "connect", True),
+            ("01 00 AA BB CC DD 00 FF", "legacy", True),
+        ):
+            with self.subTest(family=family):
+                frame = decoder.decode_frame(bytes.fromhex(payload_hex))
+                self.assertEqual(frame.family, family)
+                self.assertEqual(frame.supports_reset, supports_reset)
+                self.assertEqual(
+                    decoder.supports_remote_reset(bytes.fromhex(payload_hex)),
+                    supports_reset,
+                )
+
     def test_newer_frame_with_empty_trap_id_is_rejected(self):
         frame = decoder.decode_frame(bytes.fromhex("10 00 00 00 00 00 02 D4 01 00"))
         self.assertIsNone(frame)
@@ -133,6 +149,29 @@ class DecoderTests(unittest.TestCase):
         self.assertIsNotNone(frame)
         self.assertFalse(frame.is_tripped)
 
+    def test_identical_payloads_share_one_cached_frame(self):
+        decoder.clear_decode_cache()
+        payload = bytes.fromhex("00 3F CE 03 04 00 01 DA 03 00")
+        frame = decoder.decode_frame(payload)
+        self.assertIs(decoder.decode_frame(bytes(payload)), frame)
+        self.assertIs(decoder.decode_frame(bytearray(payload)), frame)
+
+        info = decoder.decode_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+        with self.assertRaises(AttributeError):
+            frame.status = 0x01
+        self.assertFalse(hasattr(frame, "__dict__"))
+
+    def test_decode_cache_is_bounded(self):
+        decoder.clear_decode_cache()
+        for counter in range(decoder.DECODE_CACHE_SIZE + 10):
+            decoder.decode_frame(
+                counter.to_bytes(2, "little") + bytes.fromhex("68 07 07 00 02 D4 01 00")
+            )
+        info = decoder.decode_cache_info()
+        self.assertEqual(info.currsize, decoder.DECODE_CACHE_SIZE)
+        self.assertEqual(info.maxsize, decoder.DECODE_CACHE_SIZE)
+
     def test_address_identity_is_format_independent(self):
         self.assertEqual(const.normalized_address("AA:BB:CC:DD:EE:FF"), "aabbccddeeff")
         self.assertEqual(const.normalized_address("AA-BB-CC-DD-EE-FF"), "aabbccddeeff")
@@ -163,5 +202,65 @@ class DecoderTests(unittest.TestCase):
         self.assertFalse(hasattr(const, "STATUS_KILL"))
 
 
+def random_payloads(count, width, seed=0):
+    """Return payloads of every family, including empty and odd IDs."""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(count):
+        payload = bytearray(rng.randbytes(width))
+        if width >= 10:
+            payload[6] = rng.choice((0x01, 0x02, 0x02, 0x01, 0x07))
+        payload[0] = rng.choice((0x00, 0x01, payload[0]))
+        if width > 9:
+            payload[9] = rng.choice((0x00, 0x01, payload[9]))
+        if width >= 6 and rng.random() < 0.1:
+            payload[2:6] = bytes(4)
+        payloads.append(bytes(payload))
+    return payloads
+
+
+class BatchDecoderTests(unittest.TestCase):
+    FIELDS = ("trap_id", "status", "is_tripped", "battery_volts", "family")
+
+    def assert_matches_decode_frame(self, payloads, columns):
+        self.assertEqual(len(columns), len(payloads))
+        for index, payload in enumerate(payloads):
+            frame = decoder.decode_frame(payload)
+            for field in self.FIELDS:
+                expected = getattr(frame, field) if frame else None
+                self.assertEqual(
+                    getattr(columns, field)[index], expected, (payload.hex(), field)
+                )
+
+    def test_packed_buffer_matches_decode_frame(self):
+        for width in (5, 6, 7, 8, 9, 10, 12):
+            with self.subTest(width=width):
+                payloads = random_payloads(500, width, seed=width)
+                columns = decoder.decode_frames(b"".join(payloads), width)
+                self.assert_matches_decode_frame(payloads, columns)
+
+    def test_payload_list_matches_decode_frame(self):
+        payloads = [
+            payload
+            for width in (3, 6, 8, 10, 11)
+            for payload in random_payloads(100, width, seed=width)
+        ]
+        columns = decoder.decode_frames(payloads * 2)
+        self.assert_matches_decode_frame(payloads * 2, columns)
+
+    def test_batch_decoding_leaves_live_cache_alone(self):
+        decoder.clear_decode_cache()
+        payloads = random_payloads(50, 10)
+        decoder.decode_frames(payloads)
+        decoder.decode_frames(b"".join(payloads), 10)
+        self.assertEqual(decoder.decode_cache_info().currsize, 0)
+
+    def test_misaligned_buffer_is_rejected(self):
+        with self.assertRaises(ValueError):
+            decoder.decode_frames(bytes(15), 10)
+        with self.assertRaises(ValueError):
+            decoder.decode_frames(bytes(10), 0)
+
+
 if __name__ == "__main__":
     unittest.main()
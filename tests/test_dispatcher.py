@@ -0,0 +1,464 @@
+"""Tests for the shared advertisement dispatcher."""
+
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+COMPONENT_DIR = (
+    Path(__file__).parents[1] / "custom_components" / "swissinno_ble"
+)
+
+CONNECT_READY = bytes.fromhex("00 3F CE 03 04 00 01 DA 03 00")
+ELECTRONIC_TRIPPED = bytes.fromhex("40 00 68 07 07 00 02 D4 01 01")
+
+
+def load_dispatcher():
+    bluetooth = types.ModuleType("homeassistant.components.bluetooth")
+    bluetooth.BluetoothServiceInfoBleak = object
+    bluetooth.async_last_service_info = Mock(return_value=None)
+    core = types.ModuleType("homeassistant.core")
+    core.HomeAssistant = object
+    core.callback = lambda func: func
+    entity = types.ModuleType("homeassistant.helpers.entity")
+    entity.DeviceInfo = dict
+    event = types.ModuleType("homeassistant.helpers.event")
+    event.async_call_later = Mock()
+    event.async_track_time_interval = Mock()
+
+    sys.modules["homeassistant"] = types.ModuleType("homeassistant")
+    sys.modules["homeassistant.components"] = types.ModuleType(
+        "homeassistant.components"
+    )
+    sys.modules["homeassistant.components.bluetooth"] = bluetooth
+    sys.modules["homeassistant.core"] = core
+    sys.modules["homeassistant.helpers"] = types.ModuleType("homeassistant.helpers")
+    sys.modules["homeassistant.helpers.entity"] = entity
+    sys.modules["homeassistant.helpers.event"] = event
+
+    package = types.ModuleType("custom_components.swissinno_ble")
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules["custom_components"] = types.ModuleType("custom_components")
+    sys.modules["custom_components.swissinno_ble"] = package
+    for name in (
+        "capture",
+        "const",
+        "coordinator",
+        "decoder",
+        "dispatcher",
+        "identity",
+        "stats",
+    ):
+        sys.modules.pop(f"custom_components.swissinno_ble.{name}", None)
+
+    return importlib.import_module("custom_components.swissinno_ble.dispatcher")
+
+
+dispatcher = load_dispatcher()
+coordinator = sys.modules["custom_components.swissinno_ble.coordinator"]
+stats = sys.modules["custom_components.swissinno_ble.stats"]
+
+
+def service_info(payload, *, address="C8:AE:DC:73:80:48", connectable=True):
+    return types.SimpleNamespace(
+        address=address,
+        rssi=-67,
+        connectable=connectable,
+        source="hci0",
+        manufacturer_data={3003: payload},
+    )
+
+
+class AdvertisementDispatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.track_interval = dispatcher.async_track_time_interval
+        self.track_interval.reset_mock()
+        self.cancel = Mock()
+        self.track_interval.return_value = self.cancel
+        self.coordinator = coordinator.TrapObservationCoordinator()
+        self.stats = stats.HotPathStats()
+        self.dispatcher = dispatcher.AdvertisementDispatcher(
+            object(), self.coordinator, self.stats
+        )
+        self.received = []
+        self.coordinator.register_listener(
+            lambda trap_id, value: self.received.append((trap_id, value))
+        )
+
+    def test_publishes_decoded_observation(self):
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+
+        self.assertEqual(len(self.received), 1)
+        trap_id, observation = self.received[0]
+        self.assertEqual(trap_id, "c8aedc738048")
+        self.assertEqual(observation.address, "C8:AE:DC:73:80:48")
+        self.assertEqual(observation.rssi, -67)
+        self.assertEqual(observation.battery_v, 3.08)
+        self.assertFalse(observation.tripped)
+        self.assertEqual(observation.family, "connect")
+        self.assertTrue(observation.supports_reset)
+        self.assertTrue(observation.connectable)
+        self.assertEqual(observation.legacy_trap_ids, ("CE030400", "3FCE03"))
+
+    def test_electronic_trap_is_not_resettable(self):
+        self.dispatcher.async_process(service_info(ELECTRONIC_TRIPPED), None)
+
+        observation = self.received[0][1]
+        self.assertTrue(observation.tripped)
+        self.assertEqual(observation.family, "electronic")
+        self.assertFalse(observation.supports_reset)
+
+    def test_decodes_each_advertisement_once(self):
+        with patch.object(
+            dispatcher, "decode_frame", wraps=dispatcher.decode_frame
+        ) as decode:
+            self.dispatcher.async_process(service_info(CONNECT_READY), None)
+        decode.assert_called_once_with(CONNECT_READY)
+
+    def test_ignores_foreign_and_undecodable_advertisements(self):
+        foreign = service_info(CONNECT_READY)
+        foreign.manufacturer_data = {76: CONNECT_READY}
+        self.dispatcher.async_process(foreign, None)
+        self.dispatcher.async_process(service_info(b"\x01"), None)
+
+        self.assertEqual(self.received, [])
+
+    def test_builds_trap_identity_once(self):
+        with patch.object(
+            dispatcher, "build_trap_identity", wraps=dispatcher.build_trap_identity
+        ) as build:
+            self.dispatcher.async_process(service_info(CONNECT_READY), None)
+            self.dispatcher.async_process(service_info(CONNECT_READY), None)
+        build.assert_called_once_with("C8:AE:DC:73:80:48", ("CE030400", "3FCE03"))
+
+        identity = self.coordinator.identity("c8aedc738048")
+        self.assertIs(
+            self.coordinator.identity_for_address("C8:AE:DC:73:80:48"), identity
+        )
+        self.assertEqual(identity.unique_id, "swissinno_trap_c8aedc738048")
+        self.assertEqual(
+            identity.battery_unique_id, "swissinno_trap_c8aedc738048_battery"
+        )
+        self.assertEqual(identity.rssi_unique_id, "swissinno_trap_c8aedc738048_rssi")
+        self.assertEqual(
+            identity.reset_unique_id, "swissinno_trap_c8aedc738048_reset"
+        )
+        self.assertEqual(
+            identity.device_info["identifiers"],
+            {("swissinno_ble", "c8aedc738048")},
+        )
+
+    def test_checks_availability_periodically(self):
+        self.dispatcher.async_start()
+        self.dispatcher.async_start()
+        self.track_interval.assert_called_once()
+        self.assertEqual(self.track_interval.call_args.args[2], timedelta(seconds=5))
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+
+        check = self.track_interval.call_args.args[1]
+        check(None)
+        self.assertTrue(self.received[-1][1].available)
+
+        later = coordinator.monotonic() + coordinator.MAX_UNAVAILABLE_TIMEOUT + 1
+        with patch.object(coordinator, "monotonic", return_value=later):
+            check(None)
+        self.assertFalse(self.received[-1][1].available)
+
+        self.dispatcher.async_stop()
+        self.cancel.assert_called_once()
+
+    def test_unchanged_advertisements_keep_trap_available(self):
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+        self.dispatcher.async_start()
+        check = self.track_interval.call_args.args[1]
+
+        later = coordinator.monotonic() + coordinator.MAX_UNAVAILABLE_TIMEOUT + 1
+        last = types.SimpleNamespace(time=later - 1)
+        with (
+            patch.object(
+                dispatcher, "async_last_service_info", return_value=last
+            ) as last_service_info,
+            patch.object(coordinator, "monotonic", return_value=later),
+        ):
+            check(None)
+        self.assertTrue(self.received[-1][1].available)
+        last_service_info.assert_called_once_with(
+            self.dispatcher._hass, "C8:AE:DC:73:80:48", connectable=False
+        )
+
+    def test_counts_hot_path_events(self):
+        foreign = service_info(CONNECT_READY)
+        foreign.manufacturer_data = {76: CONNECT_READY}
+        self.dispatcher.async_process(foreign, None)
+        self.dispatcher.async_process(service_info(b"\x01"), None)
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+
+        self.assertEqual(self.stats.advertisements, 4)
+        self.assertEqual(self.stats.ignored, 1)
+        self.assertEqual(self.stats.decode_failures, 1)
+        self.assertEqual(self.stats.observations, 2)
+        self.assertEqual(self.stats.per_trap, {"c8aedc738048": 2})
+        self.assertEqual(self.stats.callback_time.count, 4)
+        self.assertEqual(self.stats.decode_time.count, 3)
+        self.assertEqual(self.stats.fan_out_time.count, 2)
+
+    def test_decode_time_covers_only_decoding(self):
+        clock = [0]
+        recorder = Mock()
+        # Recording takes a millisecond; decoding takes no time on this clock.
+        recorder.record.side_effect = lambda _info: clock.__setitem__(
+            0, clock[0] + 1_000_000
+        )
+        self.dispatcher._recorder = recorder
+        with patch.object(dispatcher, "perf_counter_ns", side_effect=lambda: clock[0]):
+            self.dispatcher.async_process(service_info(CONNECT_READY), None)
+
+        self.assertEqual(self.stats.decode_time.max_ns, 0)
+        self.assertEqual(self.stats.callback_time.max_ns, 1_000_000)
+
+    def test_restored_trap_is_replaced_on_first_advertisement(self):
+        trap = dispatcher.build_trap_identity("C8:AE:DC:73:80:48", ())
+        self.coordinator.restore(
+            trap,
+            coordinator.TrapObservation(
+                rssi=-70, battery_v=3.0, legacy_trap_ids=(), restored=True
+            ),
+        )
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+
+        self.assertIsNotNone(self.received[-1][1].last_seen)
+        self.assertFalse(self.received[-1][1].restored)
+
+    def test_restored_traps_expire_unless_heard(self):
+        self.dispatcher.async_start()
+        last_seen = dispatcher.time() - 600
+        for address in ("C8:AE:DC:73:80:48", "C8:AE:DC:73:80:49"):
+            trap = dispatcher.build_trap_identity(address, ())
+            self.coordinator.restore(
+                trap,
+                coordinator.TrapObservation(
+                    rssi=-70,
+                    battery_v=3.0,
+                    legacy_trap_ids=(),
+                    address=address,
+                    last_seen=last_seen,
+                    restored=True,
+                ),
+            )
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+        self.received.clear()
+
+        check = self.track_interval.call_args.args[1]
+        check(None)
+        self.assertEqual(self.received, [])
+
+        later = coordinator.monotonic() + 301
+        with patch.object(coordinator, "monotonic", return_value=later):
+            check(None)
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.received[0][0], "c8aedc738049")
+        self.assertFalse(self.received[0][1].available)
+
+
+class BurstCoalescingTests(unittest.TestCase):
+    def setUp(self):
+        self.hass = Mock()
+        self.coordinator = coordinator.TrapObservationCoordinator()
+        self.stats = stats.HotPathStats()
+        self.dispatcher = dispatcher.AdvertisementDispatcher(
+            self.hass, self.coordinator, self.stats
+        )
+        self.received = []
+        self.coordinator.register_listener(
+            lambda trap_id, value: self.received.append((trap_id, value))
+        )
+        clock = patch.object(dispatcher, "monotonic", return_value=100.0)
+        self.now = clock.start()
+        self.addCleanup(clock.stop)
+
+    @staticmethod
+    def address(index):
+        return f"C8:AE:DC:73:{index >> 8:02X}:{index & 0xFF:02X}"
+
+    def start_burst(self):
+        """Replay five traps' buffered advertisements until a burst starts."""
+        sent = 0
+        while not self.hass.loop.call_later.called:
+            address = self.address(sent % 5)
+            self.dispatcher.async_process(
+                service_info(CONNECT_READY, address=address), None
+            )
+            sent += 1
+        self.received.clear()
+        return sent
+
+    def test_replayed_buffer_starts_a_burst(self):
+        # Five first sightings, then more than BURST_THRESHOLD repeats.
+        self.assertEqual(self.start_burst(), 5 + dispatcher.BURST_THRESHOLD + 1)
+        self.assertEqual(self.stats.bursts, 1)
+        delay, _flush = self.hass.loop.call_later.call_args.args
+        self.assertEqual(delay, dispatcher.BURST_WINDOW)
+
+    def test_keeps_newest_advertisement_per_address(self):
+        self.start_burst()
+        first = self.address(0x10)
+        second = self.address(0x11)
+        self.dispatcher.async_process(service_info(CONNECT_READY, address=first), None)
+        self.dispatcher.async_process(service_info(CONNECT_READY, address=second), None)
+        self.dispatcher.async_process(
+            service_info(ELECTRONIC_TRIPPED, address=first), None
+        )
+
+        self.assertEqual(self.received, [])
+        self.assertEqual(self.stats.coalesced, 1)
+        self.hass.loop.call_later.assert_called_once()
+
+        _delay, flush = self.hass.loop.call_later.call_args.args
+        flush()
+        tripped = {trap_id: value.tripped for trap_id, value in self.received}
+        self.assertEqual(len(self.received), 3)
+        self.assertTrue(tripped["c8aedc730010"])
+        self.assertFalse(tripped["c8aedc730011"])
+
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+        self.assertEqual(len(self.received), 4)
+
+    def test_steady_fleet_traffic_is_not_held(self):
+        traps = 2000
+        for second in range(3):
+            for index in range(traps):
+                self.now.return_value = 100.0 + second + index / traps
+                advertisement = service_info(CONNECT_READY, address=self.address(index))
+                self.dispatcher.async_process(advertisement, None)
+                if index % 100 == 0:
+                    # A second scanner reports the same packet.
+                    self.dispatcher.async_process(advertisement, None)
+
+        self.assertEqual(self.stats.observations, 3 * (traps + traps // 100))
+        self.assertEqual(self.stats.bursts, 0)
+        self.hass.loop.call_later.assert_not_called()
+
+    def test_stop_drops_held_burst(self):
+        self.start_burst()
+        self.dispatcher.async_stop()
+
+        self.hass.loop.call_later.return_value.cancel.assert_called_once()
+        self.assertEqual(self.received, [])
+
+
+class ProcessingTickTests(unittest.TestCase):
+    def setUp(self):
+        self.track_interval = dispatcher.async_track_time_interval
+        self.track_interval.reset_mock()
+        self.coordinator = coordinator.TrapObservationCoordinator()
+        self.stats = stats.HotPathStats()
+        self.dispatcher = dispatcher.AdvertisementDispatcher(
+            object(), self.coordinator, self.stats, processing_tick=2
+        )
+        self.received = []
+        self.coordinator.register_listener(
+            lambda trap_id, value: self.received.append(value)
+        )
+        self.dispatcher.async_start()
+        ticks = [
+            call.args[1]
+            for call in self.track_interval.call_args_list
+            if call.args[2] == timedelta(seconds=2)
+        ]
+        self.assertEqual(len(ticks), 1)
+        self.tick = ticks[0]
+
+    def test_processes_latest_advertisement_per_tick(self):
+        first = service_info(CONNECT_READY)
+        self.dispatcher.async_process(first, None)
+        self.assertEqual(len(self.received), 1)
+
+        for rssi in (-70, -71, -72):
+            advertisement = service_info(CONNECT_READY)
+            advertisement.rssi = rssi
+            self.dispatcher.async_process(advertisement, None)
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.stats.coalesced, 2)
+
+        self.assertEqual(self.stats.callback_time.count, 4)
+        self.tick(None)
+        self.assertEqual([value.rssi for value in self.received], [-67, -72])
+        self.assertEqual(self.stats.callback_time.count, 5)
+        self.tick(None)
+        self.assertEqual(len(self.received), 2)
+        self.assertEqual(self.stats.callback_time.count, 5)
+
+    def test_decodes_each_advertisement_once(self):
+        advertisements = [service_info(CONNECT_READY) for _ in range(3)]
+        advertisements.append(service_info(ELECTRONIC_TRIPPED))
+        with patch.object(
+            dispatcher, "decode_frame", wraps=dispatcher.decode_frame
+        ) as decode:
+            for advertisement in advertisements:
+                self.dispatcher.async_process(advertisement, None)
+            self.dispatcher.async_process(service_info(CONNECT_READY), None)
+            self.tick(None)
+
+        # First sighting, two held, the trip, and the ready that follows it.
+        self.assertEqual(decode.call_count, 5)
+        self.assertEqual(
+            [value.tripped for value in self.received], [False, True, False]
+        )
+        self.assertEqual(self.stats.decode_time.count, 5)
+
+    def test_tripped_change_bypasses_tick(self):
+        ready = bytes.fromhex("40 00 68 07 07 00 02 D4 01 00")
+        self.dispatcher.async_process(service_info(ready), None)
+        self.dispatcher.async_process(service_info(ready), None)
+        self.dispatcher.async_process(service_info(ELECTRONIC_TRIPPED), None)
+
+        self.assertEqual([value.tripped for value in self.received], [False, True])
+        # The older ready advertisement no longer overrides the trip.
+        self.tick(None)
+        self.assertEqual(len(self.received), 2)
+
+    def test_awaited_trap_bypasses_tick(self):
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+
+        async def confirm():
+            waiter = asyncio.create_task(
+                self.coordinator.async_wait_for(
+                    "c8aedc738048", lambda value: not value.tripped, 1
+                )
+            )
+            await asyncio.sleep(0)
+            self.dispatcher.async_process(service_info(CONNECT_READY), None)
+            return await waiter
+
+        self.assertFalse(asyncio.run(confirm()).tripped)
+        self.assertEqual(len(self.received), 2)
+        self.assertEqual(self.stats.coalesced, 0)
+
+    def test_unavailable_trap_returns_immediately(self):
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+        self.coordinator.set_unavailable("c8aedc738048")
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+
+        self.assertEqual(
+            [value.available for value in self.received], [True, False, True]
+        )
+
+    def test_stop_cancels_tick(self):
+        cancel = self.track_interval.return_value
+        cancel.reset_mock()
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+        self.dispatcher.async_process(service_info(CONNECT_READY), None)
+        self.dispatcher.async_stop()
+
+        self.assertEqual(cancel.call_count, 2)
+        self.tick(None)
+        self.assertEqual(len(self.received), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
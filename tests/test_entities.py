@@ -0,0 +1,390 @@
+"""Tests for SWISSINNO entity state publishing."""
+
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from ha_stubs import FakeLoop
+
+COMPONENT_DIR = (
+    Path(__file__).parents[1] / "custom_components" / "swissinno_ble"
+)
+
+
+class FakeEntity:
+    _attr_available = True
+    _attr_native_value = None
+    hass = object()
+    writes = 0
+
+    @property
+    def available(self):
+        return self._attr_available
+
+    @property
+    def native_value(self):
+        return self._attr_native_value
+
+    def async_write_ha_state(self):
+        self.writes += 1
+
+
+def load_platforms():
+    def module(name, **attributes):
+        stub = types.ModuleType(name)
+        stub.__dict__.update(attributes)
+        sys.modules[name] = stub
+        return stub
+
+    module("homeassistant")
+    module("homeassistant.components")
+    module("homeassistant.components.binary_sensor", BinarySensorEntity=FakeEntity)
+    module(
+        "homeassistant.components.sensor",
+        SensorDeviceClass=types.SimpleNamespace(
+            VOLTAGE="voltage", SIGNAL_STRENGTH="signal_strength"
+        ),
+        SensorEntity=FakeEntity,
+    )
+    module("homeassistant.config_entries", ConfigEntry=object)
+    module(
+        "homeassistant.const",
+        SIGNAL_STRENGTH_DECIBELS_MILLIWATT="dBm",
+        UnitOfElectricPotential=types.SimpleNamespace(VOLT="V"),
+    )
+    module("homeassistant.core", HomeAssistant=object, callback=lambda func: func)
+    module("homeassistant.helpers")
+    module("homeassistant.helpers.entity", DeviceInfo=dict)
+    module(
+        "homeassistant.helpers.entity_registry",
+        async_get=lambda hass: hass.entity_registry,
+    )
+    sys.modules["homeassistant.helpers"].entity_registry = sys.modules[
+        "homeassistant.helpers.entity_registry"
+    ]
+
+    package = types.ModuleType("custom_components.swissinno_ble")
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules["custom_components"] = types.ModuleType("custom_components")
+    sys.modules["custom_components.swissinno_ble"] = package
+    for name in (
+        "batch",
+        "battery",
+        "binary_sensor",
+        "const",
+        "coordinator",
+        "identity",
+        "migration",
+        "rssi",
+        "sensor",
+        "stats",
+    ):
+        sys.modules.pop(f"custom_components.swissinno_ble.{name}", None)
+
+    return (
+        importlib.import_module("custom_components.swissinno_ble.binary_sensor"),
+        importlib.import_module("custom_components.swissinno_ble.sensor"),
+    )
+
+
+binary_sensor, sensor = load_platforms()
+coordinator = sys.modules["custom_components.swissinno_ble.coordinator"]
+identity = sys.modules["custom_components.swissinno_ble.identity"]
+stats = sys.modules["custom_components.swissinno_ble.stats"]
+batch = sys.modules["custom_components.swissinno_ble.batch"]
+TRAP = identity.build_trap_identity("C8:AE:DC:73:80:48", ("CE030400", "3FCE03"))
+
+
+class CountingEntityRegistry:
+    def __init__(self):
+        self.lookups = 0
+
+    def async_get_entity_id(self, platform, domain, unique_id):
+        self.lookups += 1
+        return None
+
+
+class EntityStateWriteTests(unittest.TestCase):
+    def setUp(self):
+        self.stats = stats.HotPathStats()
+
+    def test_trap_status_writes_only_changes(self):
+        entity = binary_sensor.SwissinnoTrapSensor(TRAP, False, self.stats)
+        entity.update_state(False)
+        self.assertEqual(entity.writes, 0)
+
+        entity.update_state(True)
+        entity.update_state(True)
+        self.assertEqual(entity.writes, 1)
+        self.assertTrue(entity.is_on)
+
+        entity.set_unavailable()
+        entity.set_unavailable()
+        self.assertEqual(entity.writes, 2)
+
+        # Becoming available again is a change even with the same state.
+        entity.update_state(True)
+        self.assertEqual(entity.writes, 3)
+        self.assertTrue(entity.available)
+        self.assertEqual(self.stats.state_writes, 3)
+
+    def test_battery_writes_only_changes(self):
+        entity = sensor.SwissinnoBatterySensor(TRAP, 3.08, self.stats)
+        entity.update_value(3.08)
+        self.assertEqual(entity.writes, 0)
+        entity.update_value(3.07)
+        self.assertEqual(entity.writes, 1)
+        entity.set_unavailable()
+        entity.set_unavailable()
+        entity.update_value(3.07)
+        self.assertEqual(entity.writes, 3)
+
+    def test_rssi_writes_only_changes(self):
+        entity = sensor.SwissinnoRSSISensor(TRAP, -67, self.stats)
+        entity.update_value(-67)
+        self.assertEqual(entity.writes, 0)
+        entity.update_value(-70)
+        entity.update_value(-70)
+        self.assertEqual(entity.writes, 1)
+        self.assertEqual(entity.native_value, -70)
+
+    def test_queued_entity_does_not_write(self):
+        entity = sensor.SwissinnoRSSISensor(TRAP, -67, self.stats)
+        entity.hass = None
+        entity.update_value(-80)
+        self.assertEqual(entity.writes, 0)
+        self.assertEqual(entity.native_value, -80)
+
+
+class EntityIdentityTests(unittest.TestCase):
+    def test_entities_share_precomputed_identity(self):
+        counters = stats.HotPathStats()
+        status = binary_sensor.SwissinnoTrapSensor(TRAP, False, counters)
+        battery = sensor.SwissinnoBatterySensor(TRAP, 3.08, counters)
+        rssi = sensor.SwissinnoRSSISensor(TRAP, -67, counters)
+        self.assertEqual(status._attr_unique_id, "swissinno_trap_c8aedc738048")
+        self.assertEqual(
+            battery._attr_unique_id, "swissinno_trap_c8aedc738048_battery"
+        )
+        self.assertEqual(rssi._attr_unique_id, "swissinno_trap_c8aedc738048_rssi")
+        for entity in (status, battery, rssi):
+            self.assertIs(entity._attr_device_info, TRAP.device_info)
+
+
+class LegacyMigrationTests(unittest.TestCase):
+    def test_steady_state_observations_skip_registry(self):
+        store = coordinator.TrapObservationCoordinator()
+        store.add_identity(TRAP)
+        hass = types.SimpleNamespace(
+            data={
+                "swissinno_ble": {
+                    "coordinator": store,
+                    "stats": stats.HotPathStats(),
+                }
+            },
+            entity_registry=CountingEntityRegistry(),
+            loop=FakeLoop(),
+        )
+        entry = types.SimpleNamespace(async_on_unload=lambda remove: None)
+        added = []
+        asyncio.run(
+            binary_sensor.async_setup_entry(
+                hass, entry, lambda entities, **kwargs: added.extend(entities)
+            )
+        )
+        observation = coordinator.TrapObservation(
+            rssi=-67,
+            battery_v=3.08,
+            legacy_trap_ids=("CE030400", "3FCE03"),
+            tripped=False,
+        )
+
+        store.update("c8aedc738048", observation)
+        hass.loop.run_ready()
+        lookups = hass.entity_registry.lookups
+        self.assertGreater(lookups, 0)
+        self.assertEqual(len(added), 1)
+
+        for _ in range(10):
+            store.update("c8aedc738048", observation)
+        self.assertEqual(hass.entity_registry.lookups, lookups)
+
+
+class RestoredStateTests(unittest.TestCase):
+    def test_restored_battery_is_published_immediately(self):
+        store = coordinator.TrapObservationCoordinator()
+        store.restore(
+            TRAP,
+            coordinator.TrapObservation(
+                rssi=-67,
+                battery_v=3.08,
+                legacy_trap_ids=("CE030400", "3FCE03"),
+                address=TRAP.address,
+                restored=True,
+            ),
+        )
+        hass = types.SimpleNamespace(
+            data={
+                "swissinno_ble": {
+                    "coordinator": store,
+                    "stats": stats.HotPathStats(),
+                }
+            },
+            entity_registry=CountingEntityRegistry(),
+            loop=FakeLoop(),
+        )
+        entry = types.SimpleNamespace(options={}, async_on_unload=lambda remove: None)
+        added = []
+        asyncio.run(
+            sensor.async_setup_entry(
+                hass, entry, lambda entities, **kwargs: added.extend(entities)
+            )
+        )
+        hass.loop.run_ready()
+
+        battery = [
+            entity
+            for entity in added
+            if isinstance(entity, sensor.SwissinnoBatterySensor)
+        ]
+        self.assertEqual(len(battery), 1)
+        self.assertEqual(battery[0].native_value, 3.08)
+
+
+class ChangeFilteringTests(unittest.TestCase):
+    def setUp(self):
+        self.store = coordinator.TrapObservationCoordinator()
+        self.store.add_identity(TRAP)
+        self.hass = types.SimpleNamespace(
+            data={
+                "swissinno_ble": {
+                    "coordinator": self.store,
+                    "stats": stats.HotPathStats(),
+                }
+            },
+            entity_registry=CountingEntityRegistry(),
+            loop=FakeLoop(),
+        )
+        self.entry = types.SimpleNamespace(
+            options={}, async_on_unload=lambda remove: None
+        )
+        self.added = []
+
+    def observation(self, **changes):
+        values = {
+            "rssi": -67,
+            "battery_v": 3.08,
+            "legacy_trap_ids": ("CE030400", "3FCE03"),
+            "tripped": False,
+        }
+        values.update(changes)
+        return coordinator.TrapObservation(**values)
+
+    def setup_platform(self, platform):
+        asyncio.run(
+            platform.async_setup_entry(
+                self.hass,
+                self.entry,
+                lambda entities, **kwargs: self.added.extend(entities),
+            )
+        )
+
+    def test_repeated_advertisement_confirms_battery(self):
+        self.setup_platform(sensor)
+        self.store.update("c8aedc738048", self.observation())
+        self.store.update("c8aedc738048", self.observation())
+        self.hass.loop.run_ready()
+
+        battery = [
+            entity
+            for entity in self.added
+            if isinstance(entity, sensor.SwissinnoBatterySensor)
+        ]
+        self.assertEqual(len(battery), 1)
+        self.assertEqual(battery[0].native_value, 3.08)
+
+    def test_rate_limited_rssi_is_published_on_repeat(self):
+        self.entry.options = {"rssi_min_interval": 60}
+        self.setup_platform(sensor)
+        with patch.object(sensor, "monotonic", return_value=0.0):
+            self.store.update("c8aedc738048", self.observation())
+        with patch.object(sensor, "monotonic", return_value=30.0):
+            self.store.update("c8aedc738048", self.observation(rssi=-80))
+        with patch.object(sensor, "monotonic", return_value=60.0):
+            self.store.update("c8aedc738048", self.observation(rssi=-80))
+        self.hass.loop.run_ready()
+
+        rssi_sensor = next(
+            entity
+            for entity in self.added
+            if isinstance(entity, sensor.SwissinnoRSSISensor)
+        )
+        self.assertEqual(rssi_sensor.native_value, -80)
+
+    def test_trap_status_ignores_signal_changes(self):
+        self.setup_platform(binary_sensor)
+        self.store.update("c8aedc738048", self.observation())
+        self.hass.loop.run_ready()
+        status = self.added[0]
+
+        with patch.object(status, "update_state", wraps=status.update_state) as spy:
+            self.store.update("c8aedc738048", self.observation(rssi=-80))
+            self.store.update("c8aedc738048", self.observation(battery_v=3.0))
+            spy.assert_not_called()
+            self.store.update("c8aedc738048", self.observation(tripped=True))
+            spy.assert_called_once_with(True)
+
+
+class EntityBatchingTests(unittest.TestCase):
+    def test_replayed_traps_are_added_in_one_batch(self):
+        store = coordinator.TrapObservationCoordinator()
+        for index in range(50):
+            address = f"C8:AE:DC:73:80:{index:02X}"
+            trap = identity.build_trap_identity(address, ())
+            store.add_identity(trap)
+            store.update(
+                trap.trap_id,
+                coordinator.TrapObservation(
+                    rssi=-67, battery_v=3.08, legacy_trap_ids=(), tripped=False
+                ),
+            )
+        hass = types.SimpleNamespace(
+            data={
+                "swissinno_ble": {
+                    "coordinator": store,
+                    "stats": stats.HotPathStats(),
+                }
+            },
+            entity_registry=CountingEntityRegistry(),
+            loop=FakeLoop(),
+        )
+        unload = []
+        entry = types.SimpleNamespace(async_on_unload=unload.append)
+        calls = []
+        asyncio.run(
+            binary_sensor.async_setup_entry(
+                hass, entry, lambda entities, **kwargs: calls.append(entities)
+            )
+        )
+        self.assertEqual(calls, [])
+
+        hass.loop.run_ready()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(calls[0]), 50)
+
+    def test_unload_drops_queued_entities(self):
+        calls = []
+        hass = types.SimpleNamespace(loop=FakeLoop())
+        batcher = batch.EntityBatcher(hass, calls.append)
+        batcher.add(["entity"])
+        batcher.async_cancel()
+        hass.loop.run_ready()
+        self.assertEqual(calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
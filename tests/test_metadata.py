@@ -50,13 +50,6 @@ class MetadataTests(unittest.TestCase):
             },
         )
         self.assertEqual(manifest["bluetooth"], [const.ADVERTISEMENT_MATCHER])
-        self.assertEqual(
-            const.CONNECTABLE_ADVERTISEMENT_MATCHER,
-            {
-                **const.ADVERTISEMENT_MATCHER,
-                "connectable": True,
-            },
-        )
 
     def test_custom_integration_uses_translation_file_only(self):
         translations = json.loads(
@@ -134,13 +127,22 @@ class MetadataTests(unittest.TestCase):
             )
             self.assertEqual(flatten_keys(translations), expected_keys, language)
 
-    def test_sensor_platform_replays_late_observations(self):
-        binary_source = (INTEGRATION / "binary_sensor.py").read_text(
+    def test_platforms_replay_late_observations(self):
+        dispatcher_source = (INTEGRATION / "dispatcher.py").read_text(
             encoding="utf-8"
         )
-        sensor_source = (INTEGRATION / "sensor.py").read_text(encoding="utf-8")
-        self.assertIn("coordinator.update(", binary_source)
-        self.assertIn("coordinator.register_listener(update_sensors)", sensor_source)
+        self.assertIn("self._coordinator.update(", dispatcher_source)
+        for platform, listener in (
+            ("binary_sensor", "update_sensor"),
+            ("sensor", "update_sensors"),
+            ("button", "add_button"),
+        ):
+            source = (INTEGRATION / f"{platform}.py").read_text(encoding="utf-8")
+            self.assertNotIn("async_register_callback", source)
+            self.assertRegex(
+                source,
+                rf"coordinator\.register_(change_)?listener\(\s*{listener}\b",
+            )
 
     def test_entities_have_stable_explicit_icons(self):
         binary_source = (INTEGRATION / "binary_sensor.py").read_text(
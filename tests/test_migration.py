@@ -0,0 +1,98 @@
+"""Tests for legacy unique ID migration."""
+
+import importlib
+import sys
+import types
+import unittest
+from pathlib import Path
+
+COMPONENT_DIR = (
+    Path(__file__).parents[1] / "custom_components" / "swissinno_ble"
+)
+
+
+class FakeEntityRegistry:
+    def __init__(self, entities):
+        self.entities = dict(entities)
+        self.lookups = 0
+
+    def async_get_entity_id(self, platform, domain, unique_id):
+        self.lookups += 1
+        return self.entities.get((platform, unique_id))
+
+    def async_update_entity(self, entity_id, *, new_unique_id):
+        for key, value in tuple(self.entities.items()):
+            if value == entity_id:
+                del self.entities[key]
+                self.entities[(key[0], new_unique_id)] = entity_id
+
+
+def load_migration():
+    entity_registry = types.ModuleType("homeassistant.helpers.entity_registry")
+    helpers = types.ModuleType("homeassistant.helpers")
+    helpers.entity_registry = entity_registry
+    sys.modules["homeassistant"] = types.ModuleType("homeassistant")
+    sys.modules["homeassistant.helpers"] = helpers
+    sys.modules["homeassistant.helpers.entity_registry"] = entity_registry
+
+    package = types.ModuleType("custom_components.swissinno_ble")
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules["custom_components"] = types.ModuleType("custom_components")
+    sys.modules["custom_components.swissinno_ble"] = package
+    for name in ("const", "migration"):
+        sys.modules.pop(f"custom_components.swissinno_ble.{name}", None)
+
+    return importlib.import_module("custom_components.swissinno_ble.migration")
+
+
+migration = load_migration()
+
+
+class LegacyUniqueIdMigrationTests(unittest.TestCase):
+    def test_migrates_first_matching_legacy_id(self):
+        registry = FakeEntityRegistry(
+            {("sensor", "swissinno_trap_3fce03_battery"): "sensor.kitchen_battery"}
+        )
+        migration.async_migrate_legacy_unique_id(
+            registry,
+            "sensor",
+            ("CE030400", "3FCE03"),
+            "swissinno_trap_c8aedc738048_battery",
+            "battery",
+        )
+        self.assertEqual(
+            registry.entities,
+            {
+                (
+                    "sensor",
+                    "swissinno_trap_c8aedc738048_battery",
+                ): "sensor.kitchen_battery"
+            },
+        )
+
+    def test_existing_mac_based_entity_is_not_replaced(self):
+        registry = FakeEntityRegistry(
+            {
+                ("binary_sensor", "swissinno_trap_c8aedc738048"): "binary_sensor.new",
+                ("binary_sensor", "swissinno_trap_CE030400"): "binary_sensor.old",
+            }
+        )
+        migration.async_migrate_legacy_unique_id(
+            registry,
+            "binary_sensor",
+            ("CE030400",),
+            "swissinno_trap_c8aedc738048",
+        )
+        self.assertIn(("binary_sensor", "swissinno_trap_CE030400"), registry.entities)
+        self.assertEqual(registry.lookups, 1)
+
+    def test_missing_legacy_ids_skip_registry(self):
+        registry = FakeEntityRegistry({})
+        migration.async_migrate_legacy_unique_id(
+            registry, "button", None, "swissinno_trap_c8aedc738048_reset", "reset"
+        )
+        self.assertEqual(registry.lookups, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
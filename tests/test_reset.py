@@ -11,23 +11,25 @@ from unittest.mock import AsyncMock, Mock
 RESET_PATH = (
     Path(__file__).parents[1] / "custom_components" / "swissinno_ble" / "reset.py"
 )
+# Bleak reports characteristic UUIDs in lower case.
+RESET_UUID = "02ecc6cd-2b43-4db5-96e6-ede92cf8778d"
+OTHER_UUID = "00002a19-0000-1000-8000-00805f9b34fb"
 
 
-class ResetHelperTests(unittest.TestCase):
+class ResetWriteTests(unittest.TestCase):
     def _load_module(self, properties):
         characteristic = Mock(properties=properties)
         services = Mock()
         services.get_characteristic.return_value = characteristic
         client = Mock(services=services)
         client.write_gatt_char = AsyncMock()
-        client.disconnect = AsyncMock()
 
-        device = Mock(name="Trap")
         bluetooth = types.ModuleType("homeassistant.components.bluetooth")
-        bluetooth.async_ble_device_from_address = Mock(return_value=device)
+        bluetooth.async_ble_device_from_address = Mock()
+        bluetooth.async_scanner_devices_by_address = Mock(return_value=[])
         connector = types.ModuleType("bleak_retry_connector")
         connector.BleakClientWithServiceCache = object
-        connector.establish_connection = AsyncMock(return_value=client)
+        connector.establish_connection = AsyncMock()
 
         sys.modules["homeassistant"] = types.ModuleType("homeassistant")
         sys.modules["homeassistant.components"] = types.ModuleType(
@@ -39,33 +41,330 @@ class ResetHelperTests(unittest.TestCase):
         spec = importlib.util.spec_from_file_location("swissinno_reset", RESET_PATH)
         module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(module)
-        return module, connector, client, characteristic
+        return module, client, characteristic
 
     def test_prefers_write_without_response(self):
-        module, connector, client, characteristic = self._load_module(
+        module, client, characteristic = self._load_module(
             ["write", "write-without-response"]
         )
-        asyncio.run(module.async_reset_trap(object(), "aa:bb"))
-        connector.establish_connection.assert_awaited_once()
+        asyncio.run(module._async_write_reset(client, "AA:BB"))
         client.write_gatt_char.assert_awaited_once_with(
             characteristic, b"\x00", response=False
         )
-        client.disconnect.assert_awaited_once()
 
     def test_uses_response_when_required(self):
-        module, _, client, characteristic = self._load_module(["write"])
-        asyncio.run(module.async_reset_trap(object(), "aa:bb"))
+        module, client, characteristic = self._load_module(["write"])
+        asyncio.run(module._async_write_reset(client, "AA:BB"))
         client.write_gatt_char.assert_awaited_once_with(
             characteristic, b"\x00", response=True
         )
 
-    def test_disconnects_after_write_failure(self):
-        module, _, client, _ = self._load_module(["write"])
-        client.write_gatt_char.side_effect = RuntimeError("failed")
-        with self.assertRaisesRegex(RuntimeError, "failed"):
-            asyncio.run(module.async_reset_trap(object(), "aa:bb"))
-        client.disconnect.assert_awaited_once()
-
-
-if __name__ == "__main__":
+    def test_rejects_characteristic_that_is_not_writable(self):
+        module, client, _ = self._load_module(["read", "notify"])
+        with self.assertRaisesRegex(RuntimeError, "not writable"):
+            asyncio.run(module._async_write_reset(client, "AA:BB"))
+        client.write_gatt_char.assert_not_awaited()
+
+
+def load_engine_module(scanners=(), failing_sources=()):
+    """Load reset.py with a connector that tracks open connections.
+
+    ``scanners`` lists ``(source, rssi)`` pairs of connectable scanners that
+    hear every trap; without any, Home Assistant's default device is used.
+    """
+    state = types.SimpleNamespace(
+        open=0, peak=0, connects=[], clients=[], sources=[]
+    )
+
+    async def establish_connection(client_class, device, name):
+        state.sources.append(device.details["source"])
+        if device.details["source"] in failing_sources:
+            raise OSError("proxy out of connection slots")
+        state.connects.append(device.address)
+        state.open += 1
+        state.peak = max(state.peak, state.open)
+        await asyncio.sleep(0)
+        client = Mock(is_connected=True)
+        characteristic = Mock(properties=["write"], handle=42, uuid=RESET_UUID)
+        client.services.get_characteristic.return_value = characteristic
+        client.write_gatt_char = AsyncMock()
+
+        async def disconnect():
+            state.open -= 1
+            client.is_connected = False
+
+        client.disconnect = AsyncMock(side_effect=disconnect)
+        state.clients.append(client)
+        return client
+
+    def device_from_address(hass, address, connectable):
+        return types.SimpleNamespace(
+            address=address, name=None, details={"source": "proxy"}
+        )
+
+    bluetooth = types.ModuleType("homeassistant.components.bluetooth")
+    bluetooth.async_ble_device_from_address = device_from_address
+    bluetooth.async_scanner_devices_by_address = lambda hass, address, connectable: [
+        types.SimpleNamespace(
+            scanner=types.SimpleNamespace(source=source),
+            ble_device=types.SimpleNamespace(
+                address=address, name=None, details={"source": source}
+            ),
+            advertisement=types.SimpleNamespace(rssi=rssi),
+        )
+        for source, rssi in scanners
+    ]
+    connector = types.ModuleType("bleak_retry_connector")
+    connector.BleakClientWithServiceCache = object
+    connector.establish_connection = establish_connection
+    sys.modules["homeassistant"] = types.ModuleType("homeassistant")
+    sys.modules["homeassistant.components"] = types.ModuleType(
+        "homeassistant.components"
+    )
+    sys.modules["homeassistant.components.bluetooth"] = bluetooth
+    sys.modules["bleak_retry_connector"] = connector
+
+    spec = importlib.util.spec_from_file_location("swissinno_reset", RESET_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module, state
+
+
+def fake_hass():
+    loop = asyncio.get_running_loop()
+    return types.SimpleNamespace(
+        loop=loop,
+        async_create_background_task=lambda coro, name: loop.create_task(coro),
+    )
+
+
+class ResetEngineTests(unittest.TestCase):
+    def test_limits_connections_per_adapter(self):
+        module, state = load_engine_module()
+
+        async def run():
+            engine = module.ResetEngine(fake_hass(), idle_timeout=60)
+            addresses = [f"AA:BB:CC:DD:EE:{index:02X}" for index in range(6)]
+            await asyncio.gather(*(engine.async_reset(a) for a in addresses))
+            self.assertEqual(engine.pending, 0)
+            await engine.async_stop()
+
+        asyncio.run(run())
+        self.assertEqual(len(state.connects), 6)
+        self.assertEqual(state.peak, 2)
+        self.assertEqual(state.open, 0)
+        for client in state.clients:
+            client.write_gatt_char.assert_awaited_once()
+
+    def test_reuses_client_for_back_to_back_resets(self):
+        module, state = load_engine_module()
+
+        async def run():
+            engine = module.ResetEngine(fake_hass(), idle_timeout=60)
+            await engine.async_reset("aa:bb:cc:dd:ee:ff")
+            await engine.async_reset("AA:BB:CC:DD:EE:FF")
+            await engine.async_stop()
+
+        asyncio.run(run())
+        self.assertEqual(state.connects, ["AA:BB:CC:DD:EE:FF"])
+        self.assertEqual(state.clients[0].write_gatt_char.await_count, 2)
+        state.clients[0].disconnect.assert_awaited_once()
+
+    def test_closes_connection_after_write_without_keep_alive(self):
+        module, state = load_engine_module()
+
+        async def run():
+            engine = module.ResetEngine(fake_hass(), idle_timeout=60)
+            await engine.async_reset("AA:BB:CC:DD:EE:FF", keep_alive=False)
+            self.assertEqual(state.open, 0)
+            await engine.async_stop()
+
+        asyncio.run(run())
+        state.clients[0].write_gatt_char.assert_awaited_once()
+
+    def test_disconnects_idle_client(self):
+        module, state = load_engine_module()
+
+        async def run():
+            engine = module.ResetEngine(fake_hass(), idle_timeout=0)
+            await engine.async_reset("AA:BB:CC:DD:EE:FF")
+            await asyncio.sleep(0.01)
+            self.assertEqual(state.open, 0)
+            await engine.async_reset("AA:BB:CC:DD:EE:FF")
+            await engine.async_stop()
+
+        asyncio.run(run())
+        self.assertEqual(len(state.connects), 2)
+
+    def test_failed_write_releases_slot(self):
+        module, state = load_engine_module()
+
+        async def run():
+            engine = module.ResetEngine(
+                fake_hass(), max_connections_per_adapter=1, idle_timeout=60
+            )
+            original = module._async_write_reset
+            module._async_write_reset = AsyncMock(side_effect=RuntimeError("failed"))
+            with self.assertRaisesRegex(RuntimeError, "failed"):
+                await engine.async_reset("AA:BB:CC:DD:EE:01")
+            module._async_write_reset = original
+            await asyncio.wait_for(engine.async_reset("AA:BB:CC:DD:EE:02"), 1)
+            await engine.async_stop()
+
+        asyncio.run(run())
+        self.assertEqual(state.open, 0)
+
+
+class ScannerRoutingTests(unittest.TestCase):
+    SCANNERS = (("kitchen", -80), ("garage", -60), ("attic", -90))
+
+    def reset(self, module, **engine_kwargs):
+        async def run():
+            engine = module.ResetEngine(fake_hass(), **engine_kwargs)
+            await engine.async_reset("AA:BB:CC:DD:EE:FF")
+            await engine.async_stop()
+
+        asyncio.run(run())
+
+    def test_prefers_nearest_scanner_reported_by_coordinator(self):
+        module, state = load_engine_module(self.SCANNERS)
+        preference = Mock(return_value=["attic", "kitchen"])
+        self.reset(module, source_preference=preference)
+        preference.assert_called_once_with("AA:BB:CC:DD:EE:FF")
+        self.assertEqual(state.sources, ["attic"])
+
+    def test_falls_back_to_next_scanner_on_failure(self):
+        module, state = load_engine_module(
+            self.SCANNERS, failing_sources={"attic", "garage"}
+        )
+        self.reset(module, source_preference=lambda address: ["attic"])
+        # Unranked scanners follow in order of Home Assistant's latest RSSI.
+        self.assertEqual(state.sources, ["attic", "garage", "kitchen"])
+        self.assertEqual(state.open, 0)
+
+    def test_spreads_resets_across_scanners_with_free_slots(self):
+        module, state = load_engine_module((("proxy_a", -60), ("proxy_b", -75)))
+
+        async def run():
+            engine = module.ResetEngine(fake_hass(), idle_timeout=60)
+            addresses = [f"AA:BB:CC:DD:EE:{index:02X}" for index in range(6)]
+            await asyncio.gather(*(engine.async_reset(a) for a in addresses))
+            await engine.async_stop()
+
+        asyncio.run(run())
+        # Two slots on the nearer proxy, then two on the other, before queueing.
+        self.assertEqual(
+            state.sources[:4], ["proxy_a", "proxy_a", "proxy_b", "proxy_b"]
+        )
+        self.assertEqual(state.peak, 4)
+        self.assertEqual(state.open, 0)
+
+    def test_reports_last_error_when_every_scanner_fails(self):
+        module, state = load_engine_module(
+            self.SCANNERS, failing_sources={"attic", "garage", "kitchen"}
+        )
+        with self.assertRaisesRegex(OSError, "connection slots"):
+            self.reset(module)
+        self.assertEqual(len(state.sources), 3)
+
+
+class ResetCharacteristicCacheTests(unittest.TestCase):
+    def test_reuses_cached_handle_after_reconnect(self):
+        module, state = load_engine_module()
+        cache = module.ResetCharacteristicCache()
+
+        async def run():
+            engine = module.ResetEngine(fake_hass(), cache=cache, idle_timeout=0)
+            await engine.async_reset("AA:BB:CC:DD:EE:FF")
+            await asyncio.sleep(0.01)
+            await engine.async_reset("AA:BB:CC:DD:EE:FF")
+            await engine.async_stop()
+
+        asyncio.run(run())
+        first, second = state.clients
+        first.services.get_characteristic.assert_called_once()
+        # The cached handle is only checked with a handle lookup.
+        second.services.get_characteristic.assert_called_once_with(42)
+        second.write_gatt_char.assert_awaited_once_with(42, b"\x00", response=True)
+        self.assertEqual(cache.get("AA:BB:CC:DD:EE:FF"), (42, True))
+
+    def test_stale_handle_is_resolved_again(self):
+        module, _ = load_engine_module()
+        cache = module.ResetCharacteristicCache()
+        cache.set("AA:BB:CC:DD:EE:FF", 7, False)
+        client = self.client_with_characteristics(
+            {7: Mock(uuid=RESET_UUID)},
+            Mock(properties=["write"], handle=42, uuid=RESET_UUID),
+        )
+        client.write_gatt_char = AsyncMock(side_effect=[OSError("gone"), None])
+
+        asyncio.run(module._async_write_reset(client, "AA:BB:CC:DD:EE:FF", cache))
+
+        self.assertEqual(client.write_gatt_char.await_count, 2)
+        self.assertEqual(cache.get("AA:BB:CC:DD:EE:FF"), (42, True))
+
+    def test_reassigned_handle_is_not_written(self):
+        module, _ = load_engine_module()
+        cache = module.ResetCharacteristicCache()
+        cache.set("AA:BB:CC:DD:EE:FF", 7, False)
+        reset = Mock(properties=["write"], handle=42, uuid=RESET_UUID)
+        client = self.client_with_characteristics({7: Mock(uuid=OTHER_UUID)}, reset)
+        client.write_gatt_char = AsyncMock()
+
+        asyncio.run(module._async_write_reset(client, "AA:BB:CC:DD:EE:FF", cache))
+
+        client.write_gatt_char.assert_awaited_once_with(reset, b"\x00", response=True)
+        self.assertEqual(cache.get("AA:BB:CC:DD:EE:FF"), (42, True))
+
+    def test_unknown_handle_is_resolved_again(self):
+        module, _ = load_engine_module()
+        cache = module.ResetCharacteristicCache()
+        cache.set("AA:BB:CC:DD:EE:FF", 7, False)
+        reset = Mock(properties=["write"], handle=42, uuid=RESET_UUID)
+        client = self.client_with_characteristics({}, reset)
+        client.write_gatt_char = AsyncMock()
+
+        asyncio.run(module._async_write_reset(client, "AA:BB:CC:DD:EE:FF", cache))
+
+        client.write_gatt_char.assert_awaited_once_with(reset, b"\x00", response=True)
+
+    def test_engine_forgets_characteristic(self):
+        module, _ = load_engine_module()
+        cache = module.ResetCharacteristicCache()
+        cache.set("AA:BB:CC:DD:EE:FF", 42, True)
+
+        async def run():
+            engine = module.ResetEngine(fake_hass(), cache=cache)
+            engine.forget_characteristic("aa:bb:cc:dd:ee:ff")
+
+        asyncio.run(run())
+        self.assertIsNone(cache.get("AA:BB:CC:DD:EE:FF"))
+
+    @staticmethod
+    def client_with_characteristics(by_handle, reset):
+        """Return a client whose services hold ``by_handle`` and ``reset``."""
+
+        def get_characteristic(specifier):
+            if isinstance(specifier, int):
+                return by_handle.get(specifier)
+            return reset if specifier.lower() == RESET_UUID else None
+
+        client = Mock()
+        client.services.get_characteristic.side_effect = get_characteristic
+        return client
+
+    def test_round_trips_through_storage_format(self):
+        module, _ = load_engine_module()
+        cache = module.ResetCharacteristicCache()
+        cache.set("AA:BB:CC:DD:EE:FF", 42, False)
+        restored = module.ResetCharacteristicCache()
+        restored.restore(
+            {**cache.as_dict(), "11:22": {"handle": "x"}, "33:44": None}
+        )
+        self.assertEqual(restored.get("AA:BB:CC:DD:EE:FF"), (42, False))
+        self.assertIsNone(restored.get("11:22"))
+        self.assertIsNone(restored.get("33:44"))
+
+
+if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,95 @@
+"""Tests for RSSI reporting filters."""
+
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+RSSI_PATH = (
+    Path(__file__).parents[1]
+    / "custom_components"
+    / "swissinno_ble"
+    / "rssi.py"
+)
+
+spec = importlib.util.spec_from_file_location("swissinno_rssi", RSSI_PATH)
+rssi = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = rssi
+spec.loader.exec_module(rssi)
+
+
+class RSSIFilterTests(unittest.TestCase):
+    def test_first_sample_is_published(self):
+        rssi_filter = rssi.RSSIFilter()
+        self.assertEqual(rssi_filter.update(-67, 0.0), -67)
+
+    def test_jitter_within_deadband_is_suppressed(self):
+        rssi_filter = rssi.RSSIFilter(deadband=3, min_interval=0)
+        self.assertEqual(rssi_filter.update(-67, 0.0), -67)
+        self.assertIsNone(rssi_filter.update(-69, 1.0))
+        self.assertIsNone(rssi_filter.update(-65, 2.0))
+        self.assertEqual(rssi_filter.update(-70, 3.0), -70)
+
+    def test_changes_are_rate_limited(self):
+        rssi_filter = rssi.RSSIFilter(deadband=3, min_interval=60)
+        self.assertEqual(rssi_filter.update(-67, 0.0), -67)
+        self.assertIsNone(rssi_filter.update(-80, 30.0))
+        self.assertEqual(rssi_filter.update(-80, 60.0), -80)
+
+    def test_settled_when_repeating_the_sample_changes_nothing(self):
+        rssi_filter = rssi.RSSIFilter(deadband=3, min_interval=60)
+        self.assertFalse(rssi_filter.settled)
+        rssi_filter.update(-67, 0.0)
+        self.assertTrue(rssi_filter.settled)
+        rssi_filter.update(-68, 1.0)
+        self.assertTrue(rssi_filter.settled)
+
+        # Held back only by the interval: a later repeat is published.
+        self.assertIsNone(rssi_filter.update(-80, 30.0))
+        self.assertFalse(rssi_filter.settled)
+        self.assertEqual(rssi_filter.update(-80, 60.0), -80)
+        self.assertTrue(rssi_filter.settled)
+
+        rssi_filter.reset()
+        self.assertFalse(rssi_filter.settled)
+
+    def test_smoothed_filter_is_never_settled(self):
+        rssi_filter = rssi.RSSIFilter(smoothing=rssi.RSSI_SMOOTHING_EMA)
+        rssi_filter.update(-67, 0.0)
+        self.assertFalse(rssi_filter.settled)
+
+    def test_reset_publishes_next_sample(self):
+        rssi_filter = rssi.RSSIFilter(deadband=3, min_interval=60)
+        self.assertEqual(rssi_filter.update(-67, 0.0), -67)
+        rssi_filter.reset()
+        self.assertEqual(rssi_filter.update(-67, 1.0), -67)
+
+    def test_missing_rssi_is_ignored(self):
+        rssi_filter = rssi.RSSIFilter()
+        self.assertIsNone(rssi_filter.update(None, 0.0))
+        self.assertEqual(rssi_filter.update(-67, 0.0), -67)
+
+    def test_ema_smoothing(self):
+        rssi_filter = rssi.RSSIFilter(
+            deadband=0, min_interval=0, smoothing=rssi.RSSI_SMOOTHING_EMA
+        )
+        self.assertEqual(rssi_filter.update(-60, 0.0), -60)
+        # -60 + 0.3 * (-70 - -60) = -63
+        self.assertEqual(rssi_filter.update(-70, 1.0), -63)
+
+    def test_median_smoothing_rejects_outliers(self):
+        rssi_filter = rssi.RSSIFilter(
+            deadband=1, min_interval=0, smoothing=rssi.RSSI_SMOOTHING_MEDIAN
+        )
+        self.assertEqual(rssi_filter.update(-60, 0.0), -60)
+        self.assertIsNone(rssi_filter.update(-60, 1.0))
+        self.assertIsNone(rssi_filter.update(-95, 2.0))
+        self.assertIsNone(rssi_filter.update(-60, 3.0))
+
+    def test_unknown_smoothing_is_rejected(self):
+        with self.assertRaises(ValueError):
+            rssi.RSSIFilter(smoothing="kalman")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,319 @@
+"""Tests for SWISSINNO BLE services."""
+
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from pathlib import Path
+
+COMPONENT_DIR = (
+    Path(__file__).parents[1] / "custom_components" / "swissinno_ble"
+)
+
+
+class FakeServiceValidationError(Exception):
+    pass
+
+
+def load_services():
+    def module(name, **attributes):
+        stub = types.ModuleType(name)
+        stub.__dict__.update(attributes)
+        sys.modules[name] = stub
+        return stub
+
+    module(
+        "voluptuous",
+        Schema=lambda schema: schema,
+        Optional=lambda key, default=None: key,
+        All=lambda *validators: validators,
+        Coerce=lambda type_: type_,
+        Range=lambda **kwargs: kwargs,
+    )
+    module("homeassistant")
+    module("homeassistant.components")
+    module(
+        "homeassistant.components.bluetooth",
+        BluetoothServiceInfoBleak=object,
+        async_ble_device_from_address=lambda *args, **kwargs: None,
+        async_last_service_info=lambda *args, **kwargs: None,
+        async_scanner_devices_by_address=lambda *args, **kwargs: [],
+    )
+    module(
+        "bleak_retry_connector",
+        BleakClientWithServiceCache=object,
+        establish_connection=None,
+    )
+    module("homeassistant.config_entries", ConfigEntry=object)
+    module(
+        "homeassistant.core",
+        HomeAssistant=object,
+        ServiceCall=object,
+        ServiceResponse=dict,
+        SupportsResponse=types.SimpleNamespace(OPTIONAL="optional"),
+        callback=lambda func: func,
+    )
+    module(
+        "homeassistant.exceptions",
+        ServiceValidationError=FakeServiceValidationError,
+    )
+    helpers = module("homeassistant.helpers")
+    helpers.config_validation = module(
+        "homeassistant.helpers.config_validation", ensure_list=list, boolean=bool
+    )
+    helpers.device_registry = module(
+        "homeassistant.helpers.device_registry",
+        async_get=lambda hass: hass.device_registry,
+    )
+    module("homeassistant.helpers.entity", DeviceInfo=dict)
+    module(
+        "homeassistant.helpers.event",
+        async_call_later=lambda *args, **kwargs: lambda: None,
+        async_track_time_interval=lambda *args, **kwargs: lambda: None,
+    )
+
+    package = types.ModuleType("custom_components.swissinno_ble")
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules["custom_components"] = types.ModuleType("custom_components")
+    sys.modules["custom_components.swissinno_ble"] = package
+    for name in (
+        "capture",
+        "const",
+        "coordinator",
+        "decoder",
+        "dispatcher",
+        "identity",
+        "reset",
+        "services",
+        "stats",
+        "verification",
+    ):
+        sys.modules.pop(f"custom_components.swissinno_ble.{name}", None)
+    return importlib.import_module("custom_components.swissinno_ble.services")
+
+
+services = load_services()
+coordinator = sys.modules["custom_components.swissinno_ble.coordinator"]
+identity = sys.modules["custom_components.swissinno_ble.identity"]
+
+
+class FakeResetEngine:
+    """Reset engine whose traps advertise ready right after the write."""
+
+    def __init__(self, coordinator, failures=(), silent=(), early=()):
+        self.coordinator = coordinator
+        self.failures = set(failures)
+        self.silent = set(silent)
+        self.early = set(early)
+        self.reset = []
+        self.kept_alive = []
+        self.forgotten = []
+
+    async def async_reset(self, address, *, keep_alive=True):
+        await asyncio.sleep(0)
+        if address in self.failures:
+            raise RuntimeError("Bluetooth device not found")
+        self.reset.append(address)
+        self.kept_alive.append(keep_alive)
+        trap_id = address.replace(":", "").lower()
+        if address in self.early:
+            # Ready is advertised while the engine is still disconnecting.
+            self.coordinator.update(trap_id, observation(address, tripped=False))
+            await asyncio.sleep(0)
+        elif address not in self.silent:
+            asyncio.get_running_loop().call_soon(
+                self.coordinator.update, trap_id, observation(address, tripped=False)
+            )
+
+    def forget_characteristic(self, address):
+        self.forgotten.append(address)
+
+
+class FakeServices:
+    def __init__(self):
+        self.handlers = {}
+
+    def async_register(self, domain, service, handler, schema, supports_response):
+        self.handlers[(domain, service)] = handler
+
+    def async_remove(self, domain, service):
+        del self.handlers[(domain, service)]
+
+
+def observation(
+    address, *, tripped=True, supports_reset=True, connectable=True, source=None
+):
+    return coordinator.TrapObservation(
+        rssi=-67,
+        battery_v=3.08,
+        legacy_trap_ids=(),
+        address=address,
+        tripped=tripped,
+        supports_reset=supports_reset,
+        connectable=connectable,
+        source=source,
+    )
+
+
+class ResetTrapsServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.coordinator = coordinator.TrapObservationCoordinator()
+        self.coordinator.update("aa0000000001", observation("AA:00:00:00:00:01"))
+        self.coordinator.update("aa0000000002", observation("AA:00:00:00:00:02"))
+        self.coordinator.update(
+            "aa0000000003", observation("AA:00:00:00:00:03", tripped=False)
+        )
+        self.coordinator.update(
+            "aa0000000004", observation("AA:00:00:00:00:04", supports_reset=False)
+        )
+        self.engine = FakeResetEngine(
+            self.coordinator, failures={"AA:00:00:00:00:02"}
+        )
+        devices = {
+            "device-3": types.SimpleNamespace(
+                identifiers={("swissinno_ble", "aa0000000003"), ("other", "x")}
+            )
+        }
+        self.hass = types.SimpleNamespace(
+            data={
+                "swissinno_ble": {
+                    "coordinator": self.coordinator,
+                    "reset_engine": self.engine,
+                }
+            },
+            device_registry=types.SimpleNamespace(async_get=devices.get),
+            services=FakeServices(),
+        )
+        self.entry = types.SimpleNamespace(options={"reset_confirm_timeout": 1})
+        services.async_setup_services(self.hass, self.entry)
+        self.handler = self.hass.services.handlers[("swissinno_ble", "reset_traps")]
+
+    def call(self, **data):
+        call = types.SimpleNamespace(
+            data={"device_id": [], "all_tripped": False, **data}
+        )
+        return asyncio.run(self.handler(call))
+
+    def test_resets_all_tripped_traps_with_per_trap_results(self):
+        results = self.call(all_tripped=True)["results"]
+
+        self.assertEqual(self.engine.reset, ["AA:00:00:00:00:01"])
+        result = results["aa0000000001"]
+        self.assertEqual(result["address"], "AA:00:00:00:00:01")
+        self.assertTrue(result["success"])
+        self.assertIsNone(result["error"])
+        self.assertGreaterEqual(result["confirm_seconds"], 0)
+        self.assertFalse(results["aa0000000002"]["success"])
+        self.assertIn("not found", results["aa0000000002"]["error"])
+        self.assertFalse(results["aa0000000004"]["success"])
+        self.assertNotIn("aa0000000003", results)
+        # The connection is closed after the write so the trap can advertise.
+        self.assertEqual(self.engine.kept_alive, [False])
+
+    def test_confirms_ready_advertised_before_the_reset_returns(self):
+        self.engine.early.add("AA:00:00:00:00:01")
+
+        result = self.call(all_tripped=True)["results"]["aa0000000001"]
+        self.assertTrue(result["success"])
+        self.assertEqual(result["confirm_seconds"], 0)
+        self.assertEqual(self.engine.forgotten, [])
+        self.assertFalse(self.coordinator.has_waiters("aa0000000001"))
+
+    def test_resets_selected_devices(self):
+        results = self.call(device_id=["device-3"])["results"]
+        self.assertEqual(list(results), ["aa0000000003"])
+        self.assertEqual(self.engine.reset, ["AA:00:00:00:00:03"])
+
+    def test_unconfirmed_reset_is_reported(self):
+        self.engine.silent.add("AA:00:00:00:00:01")
+        services.async_unload_services(self.hass)
+        services.async_setup_services(
+            self.hass, types.SimpleNamespace(options={"reset_confirm_timeout": 0.05})
+        )
+        self.handler = self.hass.services.handlers[("swissinno_ble", "reset_traps")]
+
+        result = self.call(all_tripped=True)["results"]["aa0000000001"]
+        self.assertFalse(result["success"])
+        self.assertIn("did not report ready", result["error"])
+        self.assertEqual(self.engine.forgotten, ["AA:00:00:00:00:01"])
+
+    def test_resets_trap_last_relayed_by_a_passive_scanner(self):
+        address = "AA:00:00:00:00:05"
+        trap_id = "aa0000000005"
+        self.coordinator.add_identity(identity.build_trap_identity(address, ()))
+        self.coordinator.update(
+            trap_id, observation(address, source="active-proxy")
+        )
+        self.coordinator.update(
+            trap_id,
+            observation(address, connectable=False, source="passive-proxy"),
+        )
+
+        result = self.call(all_tripped=True)["results"][trap_id]
+        self.assertTrue(result["success"])
+        self.assertIn(address, self.engine.reset)
+
+    def test_rejects_trap_never_heard_by_a_connectable_scanner(self):
+        address = "AA:00:00:00:00:05"
+        trap_id = "aa0000000005"
+        self.coordinator.add_identity(identity.build_trap_identity(address, ()))
+        self.coordinator.update(
+            trap_id,
+            observation(address, connectable=False, source="passive-proxy"),
+        )
+
+        result = self.call(all_tripped=True)["results"][trap_id]
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "no connectable scanner has seen this trap")
+        self.assertNotIn(address, self.engine.reset)
+
+    def test_requires_a_selection(self):
+        with self.assertRaises(FakeServiceValidationError):
+            self.call()
+        with self.assertRaises(FakeServiceValidationError):
+            self.call(device_id=["missing"])
+
+    def test_unload_removes_service(self):
+        services.async_unload_services(self.hass)
+        self.assertEqual(self.hass.services.handlers, {})
+
+
+class CaptureAdvertisementsServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = types.SimpleNamespace(
+            capturing=False, started=[], async_start_capture=None
+        )
+
+        def start(recorder, duration):
+            self.dispatcher.capturing = True
+            self.dispatcher.started.append((recorder, duration))
+
+        self.dispatcher.async_start_capture = start
+        self.hass = types.SimpleNamespace(
+            config=types.SimpleNamespace(path=lambda name: f"/config/{name}"),
+            data={"swissinno_ble": {"dispatcher": self.dispatcher}},
+            services=FakeServices(),
+        )
+        services.async_setup_services(self.hass, types.SimpleNamespace(options={}))
+        self.handler = self.hass.services.handlers[
+            ("swissinno_ble", "capture_advertisements")
+        ]
+
+    def call(self, duration=60):
+        call = types.SimpleNamespace(data={"duration": duration})
+        return asyncio.run(self.handler(call))
+
+    def test_starts_one_capture_at_a_time(self):
+        path = self.call(120)["path"]
+
+        self.assertRegex(path, r"^/config/swissinno_ble_capture_\d{8}_\d{6}\.bin$")
+        recorder, duration = self.dispatcher.started[0]
+        self.assertEqual(str(recorder.path), path)
+        self.assertEqual(duration, 120)
+        with self.assertRaises(FakeServiceValidationError):
+            self.call()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Smoke tests for the trap fleet simulator."""
+
+import types
+import unittest
+
+import simulate_fleet
+
+
+def advertisement(address, manufacturer_data):
+    return types.SimpleNamespace(
+        address=address,
+        manufacturer_data=manufacturer_data,
+        service_uuids=[simulate_fleet.const.SERVICE_UUID],
+        connectable=False,
+    )
+
+
+class FakeBluetoothManagerTests(unittest.TestCase):
+    def test_applies_the_integration_matcher(self):
+        manager = simulate_fleet.FakeBluetoothManager()
+        received = []
+        manager.async_register_callback(
+            None,
+            lambda service_info, change: received.append(service_info),
+            simulate_fleet.const.ADVERTISEMENT_MATCHER,
+            "passive",
+        )
+        trap = advertisement("C8:AE:DC:73:80:48", {3003: b"\x00"})
+        manager.async_deliver(trap)
+        manager.async_deliver(
+            types.SimpleNamespace(
+                address="F0:00:00:00:00:01",
+                manufacturer_data={76: b"\x02"},
+                service_uuids=[],
+                connectable=True,
+            )
+        )
+        self.assertEqual(received, [trap])
+        self.assertEqual((manager.delivered, manager.filtered), (1, 1))
+
+    def test_remembers_but_does_not_forward_unchanged_advertisements(self):
+        manager = simulate_fleet.FakeBluetoothManager(now=iter(range(10)).__next__)
+        received = []
+        manager.async_register_callback(
+            None,
+            lambda service_info, change: received.append(service_info),
+            simulate_fleet.const.ADVERTISEMENT_MATCHER,
+            "passive",
+        )
+        address = "C8:AE:DC:73:80:48"
+        for payload in (b"\x00", b"\x00", b"\x01"):
+            manager.async_deliver(advertisement(address, {3003: payload}))
+        repeated = advertisement(address, {3003: b"\x01"})
+        manager.async_deliver(repeated)
+
+        self.assertEqual(len(received), 2)
+        self.assertEqual(manager.unchanged, 2)
+        self.assertIs(manager.async_last_service_info(None, address, False), repeated)
+        self.assertEqual(repeated.time, 3)
+
+
+class FleetSimulationTests(unittest.TestCase):
+    def test_small_fleet_reports_writes_and_lag(self):
+        result = simulate_fleet.run(
+            simulate_fleet.FleetConfig(
+                traps=9,
+                minutes=3,
+                trip_rate=60,
+                trip_seconds=30,
+                outage_rate=20,
+                outage_seconds=90,
+                foreign=3,
+                speed=600,
+            )
+        )
+
+        self.assertEqual(result.traps, 9)
+        self.assertGreater(result.advertisements + result.unchanged, 9 * 60)
+        # Only changed advertisements reach the integration.
+        self.assertGreater(result.unchanged, result.advertisements)
+        self.assertGreater(result.lost, 0)
+        self.assertGreater(result.foreign, 0)
+        self.assertGreater(result.trips, 0)
+        self.assertGreater(result.outages, 0)
+        # Outages outlast the shortest unavailable timeout.
+        self.assertGreater(result.unavailable, 0)
+        self.assertGreaterEqual(result.entities, 18)
+        self.assertGreater(result.state_writes, 0)
+        self.assertGreaterEqual(result.lag_max_ms, result.lag_p99_ms)
+        self.assertIn("per trap-hour", simulate_fleet.format_result(result))
+
+
+if __name__ == "__main__":
+    unittest.main()
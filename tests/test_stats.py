@@ -0,0 +1,63 @@
+"""Tests for SWISSINNO hot-path counters."""
+
+import importlib
+import json
+import sys
+import types
+import unittest
+from pathlib import Path
+
+COMPONENT_DIR = (
+    Path(__file__).parents[1] / "custom_components" / "swissinno_ble"
+)
+
+
+def load_stats():
+    package = types.ModuleType("custom_components.swissinno_ble")
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules["custom_components"] = types.ModuleType("custom_components")
+    sys.modules["custom_components.swissinno_ble"] = package
+    for name in ("decoder", "stats"):
+        sys.modules.pop(f"custom_components.swissinno_ble.{name}", None)
+    return importlib.import_module("custom_components.swissinno_ble.stats")
+
+
+stats = load_stats()
+
+
+class TimingHistogramTests(unittest.TestCase):
+    def test_records_into_microsecond_buckets(self):
+        histogram = stats.TimingHistogram()
+        for elapsed_ns in (5_000, 10_000, 10_001, 2_000_000, 9_000_000):
+            histogram.record(elapsed_ns)
+
+        summary = histogram.as_dict()
+        self.assertEqual(summary["count"], 5)
+        self.assertEqual(summary["max_us"], 9000)
+        self.assertEqual(summary["mean_us"], 2205.0)
+        self.assertEqual(summary["buckets"]["<=10us"], 2)
+        self.assertEqual(summary["buckets"]["<=25us"], 1)
+        self.assertEqual(summary["buckets"]["<=5000us"], 1)
+        self.assertEqual(summary["buckets"][">5000us"], 1)
+
+    def test_empty_histogram_has_no_mean(self):
+        self.assertIsNone(stats.TimingHistogram().as_dict()["mean_us"])
+
+
+class HotPathStatsTests(unittest.TestCase):
+    def test_snapshot_is_json_serializable(self):
+        counters = stats.HotPathStats()
+        counters.advertisements = 3
+        counters.per_trap.update(["a", "b", "a"])
+        counters.callback_time.record(12_000)
+
+        snapshot = counters.as_dict(busiest=1)
+        self.assertEqual(snapshot["advertisements"], 3)
+        self.assertEqual(snapshot["traps"], 2)
+        self.assertEqual(snapshot["busiest_traps"], {"a": 2})
+        self.assertEqual(snapshot["decode_cache"]["max_size"], 1024)
+        json.dumps(snapshot)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""Tests for persisted SWISSINNO trap state."""
+
+import asyncio
+import importlib
+import sys
+import time
+import types
+import unittest
+from pathlib import Path
+
+COMPONENT_DIR = (
+    Path(__file__).parents[1] / "custom_components" / "swissinno_ble"
+)
+
+
+class FakeStore:
+    """In-memory stand-in for ``homeassistant.helpers.storage.Store``."""
+
+    def __init__(self, hass, version, key):
+        self.key = key
+        self.data = hass.stored.get(key)
+        self.delayed = []
+
+    async def async_load(self):
+        return self.data
+
+    def async_delay_save(self, data_func, delay):
+        self.delayed.append((data_func, delay))
+
+    async def async_save(self, data):
+        self.data = data
+
+
+def load_store():
+    def module(name, **attributes):
+        stub = types.ModuleType(name)
+        stub.__dict__.update(attributes)
+        sys.modules[name] = stub
+        return stub
+
+    module("homeassistant")
+    module("homeassistant.core", HomeAssistant=object, callback=lambda func: func)
+    module("homeassistant.helpers")
+    module("homeassistant.helpers.entity", DeviceInfo=dict)
+    module("homeassistant.helpers.storage", Store=FakeStore)
+
+    package = types.ModuleType("custom_components.swissinno_ble")
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules["custom_components"] = types.ModuleType("custom_components")
+    sys.modules["custom_components.swissinno_ble"] = package
+    for name in ("const", "coordinator", "identity", "store"):
+        sys.modules.pop(f"custom_components.swissinno_ble.{name}", None)
+    return importlib.import_module("custom_components.swissinno_ble.store")
+
+
+store = load_store()
+coordinator = sys.modules["custom_components.swissinno_ble.coordinator"]
+identity = sys.modules["custom_components.swissinno_ble.identity"]
+
+ADDRESS = "C8:AE:DC:73:80:48"
+
+
+class FakeCharacteristicCache:
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+
+    def as_dict(self):
+        return dict(self.entries)
+
+    def restore(self, data):
+        self.entries.update(data)
+
+
+def observation(**changes):
+    values = {
+        "rssi": -67,
+        "battery_v": 3.08,
+        "legacy_trap_ids": ("CE030400", "3FCE03"),
+        "address": ADDRESS,
+        "tripped": True,
+        "family": "connect",
+        "supports_reset": True,
+        "connectable": True,
+        "last_seen": time.time(),
+    }
+    values.update(changes)
+    return coordinator.TrapObservation(**values)
+
+
+class TrapStateStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.hass = types.SimpleNamespace(stored={})
+        self.characteristics = FakeCharacteristicCache(
+            {ADDRESS: {"handle": 42, "response": False}}
+        )
+
+    def saved_state(self, *observations):
+        source = coordinator.TrapObservationCoordinator()
+        trap_store = store.TrapStateStore(self.hass, source, self.characteristics)
+        trap = identity.build_trap_identity(ADDRESS, ("CE030400", "3FCE03"))
+        source.add_identity(trap)
+        for item in observations:
+            source.update(trap.trap_id, item)
+        asyncio.run(trap_store.async_save())
+        self.hass.stored[store.STORAGE_KEY] = trap_store._store.data
+
+    def restore(self):
+        target = coordinator.TrapObservationCoordinator()
+        self.restored_characteristics = FakeCharacteristicCache()
+        restored = asyncio.run(
+            store.TrapStateStore(
+                self.hass, target, self.restored_characteristics
+            ).async_restore()
+        )
+        return target, restored
+
+    def test_round_trip_restores_identity_and_values(self):
+        saved = observation()
+        self.saved_state(saved)
+
+        target, restored = self.restore()
+        self.assertEqual(restored, ["c8aedc738048"])
+        self.assertEqual(
+            target.identity_for_address(ADDRESS).unique_id,
+            "swissinno_trap_c8aedc738048",
+        )
+        received = []
+        target.register_listener(lambda trap_id, value: received.append(value))
+        value = received[0]
+        self.assertTrue(value.restored)
+        self.assertTrue(value.available)
+        for field in ("rssi", "battery_v", "legacy_trap_ids", "tripped", "family"):
+            self.assertEqual(getattr(value, field), getattr(saved, field))
+        self.assertEqual(value.last_seen, saved.last_seen)
+        self.assertEqual(
+            self.restored_characteristics.entries,
+            {ADDRESS: {"handle": 42, "response": False}},
+        )
+
+    def test_stale_state_is_restored_unavailable(self):
+        self.saved_state(observation(last_seen=time.time() - 2 * 3600))
+
+        target, restored = self.restore()
+        self.assertEqual(restored, [])
+        value = dict(target.observations())["c8aedc738048"]
+        self.assertFalse(value.available)
+
+    def test_invalid_entries_are_skipped(self):
+        self.hass.stored[store.STORAGE_KEY] = {
+            "traps": {"broken": {"address": None}, "partial": {"rssi": -60}}
+        }
+        target, restored = self.restore()
+        self.assertEqual(restored, [])
+        self.assertEqual(list(target.observations()), [])
+
+    def test_schedules_one_delayed_write_per_save(self):
+        source = coordinator.TrapObservationCoordinator()
+        trap_store = store.TrapStateStore(self.hass, source, self.characteristics)
+        source.register_listener(trap_store.async_schedule_save)
+        for _ in range(100):
+            source.update("c8aedc738048", observation())
+        self.assertEqual(len(trap_store._store.delayed), 1)
+        data_func, delay = trap_store._store.delayed[0]
+        self.assertEqual(delay, store.SAVE_DELAY)
+
+        self.assertIn("c8aedc738048", data_func()["traps"])
+        source.update("c8aedc738048", observation())
+        self.assertEqual(len(trap_store._store.delayed), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()